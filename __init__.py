@@ -1,10 +1,23 @@
+from inspect import isawaitable
+from time import perf_counter
+from typing import Any, Awaitable, Callable
+
+from starlette.requests import Request
+from starlette.responses import PlainTextResponse
+from starlette.routing import Route
+
 from core.application import Application
 from core.plugins.plugin import Plugin
 from core.types import ControllerModule
+from plugins.liveapi.admission import AdmissionPolicy
 from plugins.liveapi.decorators.event import LiveEvent
 from plugins.liveapi.engines.base import BaseEngine
 from plugins.liveapi.error import ErrorHandler
+from plugins.liveapi.executors import ExecutorPools
 from plugins.liveapi.handler import SIOHandler
+from plugins.liveapi.logs import LogSampling, QueueLogging
+from plugins.liveapi.metrics import MetricsRegistry
+from plugins.liveapi.serializers.base import BaseSerializer
 
 
 class LiveAPIPlugin(Plugin):
@@ -14,33 +27,98 @@ class LiveAPIPlugin(Plugin):
     def __init__(self, use_identity: bool, location: str = "/ws",
                  engine: str = "socketio", cors_allowed_origins: list[str] = ["*"],
                  main_controller: str = "main",
+                 serializer: str = "json",
+                 admission: AdmissionPolicy | None = None,
+                 thread_workers: int | None = None,
+                 process_workers: int | None = None,
+                 metrics: bool = False,
+                 metrics_path: str | None = None,
+                 metrics_auth: Callable[[Request], bool | Awaitable[bool]] | None = None,
+                 async_logging: bool = False,
+                 log_sampling: dict[str, float] | float | None = None,
+                 error_log_interval: float = 1.0,
                  **additional_configurations) -> None:
         self.use_identity = use_identity
         self.location = location
         self.engine = engine
         self.cors_allowed_origins = cors_allowed_origins
         self.main_controller = main_controller
+        self.serializer = serializer
+        self.admission = admission
+        self.executors = ExecutorPools(thread_workers, process_workers)
+        # NOTE: Prometheus-text metrics endpoint is mounted alongside socket.io location only if metrics are enabled,
+        # it exposes namespaces, event names and amount of clients, so it can be guarded by `metrics_auth`
+        self.metrics = MetricsRegistry() if metrics else None
+        self.metrics_path = metrics_path or f"{location.rstrip('/')}/metrics"
+        self.metrics_auth = metrics_auth
+
+        # NOTE: Rate of `received` log lines, either single rate of every event or rates of specific events (`*` is rate of the rest)
+        if isinstance(log_sampling, dict):
+            rates = dict(log_sampling)
+            self.log_sampling = LogSampling(rates.pop("*", 1.0), rates)
+        else:
+            self.log_sampling = LogSampling(log_sampling) if log_sampling is not None else None
+        self.async_logging = async_logging
+        self.error_log_interval = error_log_interval
+        self._queue_logging: QueueLogging | None = None
 
         self.additional_configurations = additional_configurations
 
+        # NOTE: Time in seconds spent by each phase of startup, reported once listeners are running
+        self.startup_timings: dict[str, float] = dict.fromkeys(("engine_mount", "discovery", "validation_warmup",
+                                                               "listener_binding"), 0.0)
+        self.discovered_listeners = 0
+
     def install(self, application: Application, *args, **kwargs):
         self.logger.info(
             "Running live-api plugin, mounting SocketIO into Ascender Framework's Core...")
         self._application = application
         self._application.app.add_event_handler(
             "startup", self.on_server_start)
+        self._application.app.add_event_handler(
+            "shutdown", self.executors.shutdown)
+        self._application.app.add_event_handler(
+            "shutdown", self.stop_logging)
 
+        started = perf_counter()
         self.initialize_engine()
+        self.startup_timings["engine_mount"] = perf_counter() - started
+        if self.metrics is not None:
+            self.metrics.gauges.append(lambda: {
+                "liveapi_startup_seconds": ("Time spent by each phase of LiveAPI startup",
+                                            {(("phase", phase),): seconds for phase, seconds in self.startup_timings.items()}),
+            })
         self.logger.info(
             "[green]Successfully mounted Socket IO engine into Ascender Framework's core [/green]")
 
+    def initialize_serializer(self) -> BaseSerializer:
+        match self.serializer:
+            case "json":
+                from plugins.liveapi.serializers.json_serializer import JSONSerializer
+                return JSONSerializer()
+
+            case "orjson":
+                from plugins.liveapi.serializers.orjson_serializer import ORJSONSerializer
+                return ORJSONSerializer()
+
+            case "msgpack":
+                from plugins.liveapi.serializers.msgpack_serializer import MsgPackSerializer
+                return MsgPackSerializer()
+
+            case _:
+                raise TypeError(
+                    f"LiveAPI serializer `{self.serializer}` was not found")
+
     def initialize_engine(self):
+        serializer = self.initialize_serializer()
+
         match self.engine:
             case "socketio":
                 from plugins.liveapi.engines.socketio import SocketIOEngine
                 engine = SocketIOEngine(app=self._application.app,
                                         location=self.location,
                                         cors_allowed_origins=self.cors_allowed_origins,
+                                        serializer=serializer,
                                         **self.additional_configurations)
 
             case "socketio-redis":
@@ -48,8 +126,25 @@ class LiveAPIPlugin(Plugin):
                 engine = SocketIORedisEngine(app=self._application.app,
                                              location=self.location,
                                              cors_allowed_origins=self.cors_allowed_origins,
+                                             serializer=serializer,
                                              **self.additional_configurations)
 
+            case "socketio-local-cluster":
+                from plugins.liveapi.engines.socketio_local_cluster import SocketIOLocalClusterEngine
+                engine = SocketIOLocalClusterEngine(app=self._application.app,
+                                                    location=self.location,
+                                                    cors_allowed_origins=self.cors_allowed_origins,
+                                                    serializer=serializer,
+                                                    **self.additional_configurations)
+
+            case "websocket":
+                from plugins.liveapi.engines.websocket import WebSocketEngine
+                engine = WebSocketEngine(app=self._application.app,
+                                         location=self.location,
+                                         cors_allowed_origins=self.cors_allowed_origins,
+                                         serializer=serializer,
+                                         **self.additional_configurations)
+
             case _:
                 raise TypeError(
                     f"LiveAPI engine module `{self.engine}` was not found")
@@ -59,29 +154,85 @@ class LiveAPIPlugin(Plugin):
         self.logger.info("Mounting SocketIO with `{location}` location".format(
             location=self.location))
         self._application.service_registry.add_singletone(
-            ErrorHandler, ErrorHandler(self.logger))
-
-        self.handler = SIOHandler(engine, logger=self.logger)
+            ErrorHandler, ErrorHandler(self.logger, error_log_interval=self.error_log_interval))
+
+        self.handler = SIOHandler(engine, logger=self.logger, admission=self.admission,
+                                  executors=self.executors, metrics=self.metrics,
+                                  log_sampling=self.log_sampling)
+
+        if self.metrics is not None:
+            engine.use_metrics(self.metrics)
+            self.mount_metrics()
+
+    def mount_metrics(self):
+        metrics = self.metrics
+        auth = self.metrics_auth
+
+        async def render_metrics(request: Request):
+            if auth is not None:
+                allowed: Any = auth(request)
+                if isawaitable(allowed):
+                    allowed = await allowed
+                if not allowed:
+                    return PlainTextResponse("Forbidden", status_code=403)
+            return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+        # NOTE: Route is placed before socket.io mount, otherwise mount of the same location would shadow it
+        self._application.app.router.routes.insert(0, Route(self.metrics_path, render_metrics, methods=["GET"]))
+        self.logger.info(f"Mounting LiveAPI metrics with `{self.metrics_path}` location")
+
+    def start_logging(self):
+        """
+        Moves handlers of plugin's logger to background thread, so logging of events never blocks event loop.
+        Enabled by `async_logging`, handlers of parent loggers are left untouched
+        """
+        if self.async_logging and self._queue_logging is None:
+            self._queue_logging = QueueLogging(self.logger)
+            self._queue_logging.start()
+
+    def stop_logging(self):
+        if self._queue_logging is not None:
+            self._queue_logging.stop()
+            self._queue_logging = None
 
     def on_server_start(self):
+        # NOTE: Handlers of logger are configured by application by now
+        self.start_logging()
+        started = perf_counter()
         self.handler.run_listeners()
+        self.startup_timings["listener_binding"] = perf_counter() - started
+        self.report_startup()
+
+    def report_startup(self):
+        timings = self.startup_timings
+        self.logger.info(f"LiveAPI startup: engine mount {timings['engine_mount'] * 1000:.1f} ms, "
+                         f"discovery of {self.discovered_listeners} listeners {timings['discovery'] * 1000:.1f} ms, "
+                         f"validation warmup {timings['validation_warmup'] * 1000:.1f} ms, "
+                         f"listener binding {timings['listener_binding'] * 1000:.1f} ms")
 
     def after_controller_load(self, name: str, instance: object, configuration: ControllerModule):
-        methods = [func for func in dir(instance) if callable(
-            getattr(instance, func)) and not func.startswith("__")]
-        _has_listener = False
-
-        for method in methods:
-            func = getattr(instance, method)
-            # Check if it's an instance of the decorator class
-            if getattr(func, "_listener_metadata", None):
-                if not _has_listener:
-                    _has_listener = True
-
-                metadata = func._listener_metadata
-                self.handler.add_listener(
-                    func, metadata["event_name"], metadata["dependencies"], metadata["namespace"])
-
-        if _has_listener:
+        # NOTE: Listeners are looked up in registry filled by `LiveEvent` at decoration time, attributes of controller aren't scanned
+        started = perf_counter()
+        listeners = []
+        for method in LiveEvent.listeners_of(type(instance)):
+            func = getattr(instance, method, None)
+            # NOTE: Method could be overridden in subclass without being decorated
+            if (metadata := getattr(func, "_listener_metadata", None)) is not None:
+                listeners.append((func, metadata))
+        discovered = perf_counter()
+
+        # NOTE: Invocation plans (and validators of parameters) are compiled while listeners are added
+        for func, metadata in listeners:
+            self.handler.add_listener(
+                func, metadata["event_name"], metadata["dependencies"], metadata["namespace"],
+                admission=metadata.get("admission"),
+                execution=metadata.get("execution"),
+                executor_concurrency=metadata.get("executor_concurrency"))
+
+        self.startup_timings["discovery"] += discovered - started
+        self.startup_timings["validation_warmup"] += perf_counter() - discovered
+        self.discovered_listeners += len(listeners)
+
+        if listeners:
             self.logger.info(
                 f"Controller [green]{name}[/green] has been successfully mounted to SocketIO")
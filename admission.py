@@ -0,0 +1,260 @@
+import asyncio
+from collections import deque
+from typing import Any
+
+from fastapi import HTTPException
+
+
+OVERFLOW_POLICIES = ("queue", "drop-oldest", "reject")
+
+
+class AdmissionRejected(HTTPException):
+    """
+    Raised when event of the client exceeds it's limits and overflow policy rejects it.
+    Handled by `ErrorHandler` as any other `HTTPException`.
+    """
+    def __init__(self, detail: str = "Too Many Requests") -> None:
+        super().__init__(429, detail)
+
+
+class AdmissionDropped(Exception):
+    """
+    Raised for queued event which was dropped by `drop-oldest` overflow policy, such events are dropped silently
+    """
+    ...
+
+
+class AdmissionPolicy:
+    """
+    ## Admission Policy
+
+    Limits of inbound events of a single client (session ID).
+
+    Args:
+        max_concurrency (int | None, optional): Maximal amount of handlers of the client running concurrently. Defaults to None (unlimited).
+        rate (float | None, optional): Token bucket refill rate, events per second. Defaults to None (unlimited).
+        burst (int | None, optional): Token bucket capacity. Defaults to `rate` rounded up.
+        overflow (str, optional): What happens with event over the limits, `queue` waits for free slot, `drop-oldest` waits as well
+            but drops the oldest waiting event when queue is full, `reject` replies with 429 error. Defaults to `queue`.
+        max_queue (int, optional): Maximal amount of waiting events of the client. Defaults to 32.
+        rate_limits (dict[str, float | tuple[float, int]] | None, optional): Token bucket rate (and burst) of specific event names.
+    """
+
+    def __init__(self, max_concurrency: int | None = None,
+                 rate: float | None = None, burst: int | None = None,
+                 overflow: str = "queue", max_queue: int = 32,
+                 rate_limits: dict[str, float | tuple[float, int]] | None = None) -> None:
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Overflow policy `{overflow}` is not supported, use one of {OVERFLOW_POLICIES}")
+
+        self.max_concurrency = max_concurrency
+        self.rate = rate
+        self.burst = burst
+        self.overflow = overflow
+        self.max_queue = max_queue
+        self.rate_limits = rate_limits or {}
+
+    def merge(self, max_concurrency: int | None = None,
+              rate_limit: float | tuple[float, int] | None = None,
+              overflow: str | None = None) -> "AdmissionPolicy":
+        """
+        Creates policy of specific listener, options which are not given are taken from this policy
+        """
+        rate, burst = rate_limit if isinstance(rate_limit, tuple) else (rate_limit, None)
+        return AdmissionPolicy(max_concurrency=max_concurrency if max_concurrency is not None else self.max_concurrency,
+                               rate=rate if rate is not None else self.rate,
+                               burst=burst if rate is not None else self.burst,
+                               overflow=overflow or self.overflow,
+                               max_queue=self.max_queue,
+                               rate_limits=self.rate_limits)
+
+    def rate_of(self, event_name: str) -> tuple[float, int] | None:
+        if (limit := self.rate_limits.get(event_name)) is not None:
+            rate, burst = limit if isinstance(limit, tuple) else (limit, None)
+        elif self.rate is not None:
+            rate, burst = self.rate, self.burst
+        else:
+            return None
+        return rate, burst if burst is not None else max(int(rate + 0.999), 1)
+
+    @property
+    def is_unlimited(self) -> bool:
+        return self.max_concurrency is None and self.rate is None and not self.rate_limits
+
+
+class TokenBucket:
+    __slots__ = ("rate", "capacity", "tokens", "updated")
+
+    def __init__(self, rate: float, capacity: int, now: float) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """
+        Takes token, returns delay in seconds after which reserved token becomes available (`0` if it's available now).
+        Tokens may go negative, so each waiting event gets it's own moment in time.
+        """
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+
+    def refund(self):
+        self.tokens += 1
+
+
+class Slots:
+    """
+    Concurrency slots of client, waiting events are stored in FIFO order
+    """
+    __slots__ = ("active", "waiters")
+
+    def __init__(self) -> None:
+        self.active = 0
+        self.waiters: deque[asyncio.Future] = deque()
+
+
+class SessionAdmission:
+    """
+    Admission state of a single client, it's size is bounded by amount of listeners and is dropped when client disconnects
+    """
+    __slots__ = ("slots", "buckets", "waiting")
+
+    def __init__(self) -> None:
+        self.slots: dict[str | None, Slots] = {}
+        self.buckets: dict[str, TokenBucket] = {}
+        self.waiting = 0
+
+
+class AdmissionController:
+    """
+    ## Admission Controller
+
+    Per-connection admission control of inbound events: bounded concurrency of handlers and token bucket rate limits per event name.
+    """
+
+    def __init__(self, policy: AdmissionPolicy) -> None:
+        self.policy = policy
+        self._sessions: dict[str, SessionAdmission] = {}
+
+    def forget(self, sid: str, namespace: str | None = None):
+        """
+        Drops state of the client, called when client disconnects. Waiting events of the client are dropped
+        """
+        if (state := self._sessions.pop(sid, None)) is None:
+            return
+
+        for slots in state.slots.values():
+            while slots.waiters:
+                if not (waiter := slots.waiters.popleft()).done():
+                    waiter.set_exception(AdmissionDropped())
+
+    async def acquire(self, sid: str, event_name: str, policy: AdmissionPolicy,
+                      key: str | None = None) -> Slots | None:
+        """
+        Admits event of the client, waits or raises if the client is over it's limits depending on overflow policy.
+
+        Args:
+            key (str | None, optional): Key of concurrency slots, `None` for slots shared by every event of the client,
+                name of the listener for listeners with their own concurrency limit.
+
+        Returns:
+            Slots | None: Slots which should be released by `release` after handler has finished
+        """
+        if (state := self._sessions.get(sid)) is None:
+            state = self._sessions[sid] = SessionAdmission()
+
+        if (rate := policy.rate_of(event_name)) is not None:
+            await self._throttle(state, event_name, rate, policy)
+
+        if policy.max_concurrency is None:
+            return None
+
+        if (slots := state.slots.get(key)) is None:
+            slots = state.slots[key] = Slots()
+
+        if slots.active < policy.max_concurrency:
+            slots.active += 1
+            return slots
+
+        future = self._enqueue(state, slots.waiters, policy)
+        try:
+            # NOTE: Slot is handed over by `release`, so `active` is already incremented when waiter is woken up
+            await future
+        except asyncio.CancelledError:
+            # NOTE: Slot could be handed over right before waiter was cancelled, passing it to the next one
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self.release(slots)
+            raise
+        finally:
+            state.waiting -= 1
+
+        return slots
+
+    def release(self, slots: Slots | None):
+        if slots is None:
+            return
+
+        while slots.waiters:
+            waiter = slots.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+
+        slots.active -= 1
+
+    async def _throttle(self, state: SessionAdmission, event_name: str,
+                        rate: tuple[float, int], policy: AdmissionPolicy):
+        loop = asyncio.get_running_loop()
+        now = loop.time()
+
+        if (bucket := state.buckets.get(event_name)) is None:
+            bucket = state.buckets[event_name] = TokenBucket(rate[0], rate[1], now)
+
+        if not (delay := bucket.reserve(now)):
+            return
+
+        if policy.overflow == "reject":
+            bucket.refund()
+            raise AdmissionRejected(f"Rate limit of `{event_name}` event exceeded")
+
+        waiters: deque[asyncio.Future] = state.slots.setdefault(f"rate:{event_name}", Slots()).waiters
+        try:
+            future = self._enqueue(state, waiters, policy)
+        except AdmissionRejected:
+            bucket.refund()
+            raise
+
+        handle = loop.call_later(delay, lambda: future.done() or future.set_result(None))
+        try:
+            await future
+        except AdmissionDropped:
+            bucket.refund()
+            raise
+        finally:
+            handle.cancel()
+            state.waiting -= 1
+            if future in waiters:
+                waiters.remove(future)
+
+    def _enqueue(self, state: SessionAdmission, waiters: deque[asyncio.Future],
+                 policy: AdmissionPolicy) -> asyncio.Future:
+        if policy.overflow == "reject":
+            raise AdmissionRejected()
+
+        if state.waiting >= policy.max_queue:
+            if policy.overflow == "queue" or not waiters:
+                raise AdmissionRejected()
+
+            # NOTE: `drop-oldest` policy, the oldest waiting event gives it's place to the new one
+            while waiters:
+                if not (oldest := waiters.popleft()).done():
+                    oldest.set_exception(AdmissionDropped())
+                    break
+
+        future: asyncio.Future[Any] = asyncio.get_running_loop().create_future()
+        waiters.append(future)
+        state.waiting += 1
+        return future
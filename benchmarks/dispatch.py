@@ -0,0 +1,70 @@
+"""
+Micro-benchmark of event dispatch in `Listener`.
+
+Compares per-event reflection (the plan is compiled on every event, as `Listener` did before)
+with invocation plan compiled once at registration time.
+
+Run from the root of Ascender Framework's project:
+
+    python -m plugins.liveapi.benchmarks.dispatch
+"""
+import asyncio
+import time
+from typing import Any
+
+from fastapi import Depends
+from pydantic import BaseModel
+
+from core.registries.service import ServiceRegistry
+from plugins.liveapi.benchmarks.fake import FakeEngine
+from plugins.liveapi.context import SIOContext
+from plugins.liveapi.engines.base import BaseEngine
+from plugins.liveapi.error import ErrorHandler
+from plugins.liveapi.listener import Listener
+
+
+class Message(BaseModel):
+    text: str
+    priority: int
+
+
+async def current_user(ctx: SIOContext) -> str:
+    return ctx.session_id
+
+
+async def on_message(ctx: SIOContext, message: Message, user: str = Depends(current_user)):
+    return message
+
+
+class ReflectingListener(Listener):
+    """
+    Listener which compiles it's plans on every event, replicates per-event reflection.
+    """
+    async def __call__(self, sid: str, data: Any = None, *args, **kwargs):
+        self.compile()
+        return await super().__call__(sid, data, *args, **kwargs)
+
+
+async def measure(listener: Listener, events: int) -> float:
+    data = Message(text="hello", priority=1).model_dump_json()
+    started = time.perf_counter()
+    for _ in range(events):
+        await listener("sid", data)
+    return events / (time.perf_counter() - started)
+
+
+def main(events: int = 20_000):
+    registry = ServiceRegistry()
+    registry.add_singletone(BaseEngine, FakeEngine())
+    registry.add_singletone(ErrorHandler, ErrorHandler())
+
+    before = asyncio.run(measure(ReflectingListener("message", on_message, [], "/bench"), events))
+    after = asyncio.run(measure(Listener("message", on_message, [], "/bench").compile(), events))
+
+    print(f"per-event reflection: {before:>12,.0f} events/sec")
+    print(f"compiled plan:        {after:>12,.0f} events/sec")
+    print(f"speedup:              {after / before:>12.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+"""
+In-process fake engine of LiveAPI benchmarks.
+
+Implements `BaseEngine` entirely in memory: clients, rooms and sessions are plain dictionaries
+and sent frames are only counted, so benchmarks run offline and measure LiveAPI itself, not network or socket.io server.
+"""
+from typing import Any, Awaitable, Callable
+
+from plugins.liveapi.engines.base import BaseEngine
+from plugins.liveapi.engines.exclusions import ExclusionIndex
+from plugins.liveapi.engines.packet import EncodedPacket
+from plugins.liveapi.serializers.base import BaseSerializer
+from plugins.liveapi.serializers.json_serializer import JSONSerializer
+
+
+class FakeManager:
+    """
+    Room table with the same layout as socket.io client manager (`rooms[namespace][room][sid] = eio_sid`)
+    """
+
+    def __init__(self) -> None:
+        self.rooms: dict[str, dict[str | None, dict[str, str]]] = {}
+        self.exclusions = ExclusionIndex()
+        self.disconnect_callbacks: list[Callable[[str, str], None]] = []
+        self.metrics = None
+
+    def connect(self, sid: str, namespace: str = "/"):
+        self.enter_room(sid, namespace, None)
+        self.enter_room(sid, namespace, sid)
+
+    def enter_room(self, sid: str, namespace: str, room: str | None):
+        self.rooms.setdefault(namespace, {}).setdefault(room, {})[sid] = sid
+
+    def leave_room(self, sid: str, namespace: str, room: str | None):
+        self.rooms.get(namespace, {}).get(room, {}).pop(sid, None)
+
+    def is_connected(self, sid: str, namespace: str) -> bool:
+        return sid in self.rooms.get(namespace, {}).get(None, {})
+
+    def get_participants(self, namespace: str, room: str | list[str] | None):
+        rooms = self.rooms.get(namespace, {})
+        if not isinstance(room, list):
+            yield from rooms.get(room, {}).items()
+            return
+
+        participants: dict[str, str] = {}
+        for room_name in room:
+            participants.update(rooms.get(room_name, {}))
+        yield from participants.items()
+
+
+class FakeServer:
+    def __init__(self, manager: FakeManager) -> None:
+        self.manager = manager
+        self.sessions: dict[tuple[str, str], dict[str, Any]] = {}
+
+    async def get_session(self, sid: str, namespace: str | None = None) -> dict[str, Any]:
+        return self.sessions.setdefault((sid, namespace or "/"), {})
+
+    async def save_session(self, sid: str, session: dict[str, Any], namespace: str | None = None):
+        self.sessions[(sid, namespace or "/")] = session
+
+
+class FakeSocketManager:
+    def __init__(self, server: FakeServer) -> None:
+        self._sio = server
+
+
+class FakeEngine(BaseEngine):
+    """
+    ## Fake Engine
+
+    Offline `BaseEngine`, delivery mirrors `SocketIOEngine`: payload is encoded once and the same frame is handed to every recipient.
+    """
+
+    def __init__(self, serializer: BaseSerializer | None = None) -> None:
+        self.serializer = serializer or JSONSerializer()
+        self._manager = FakeManager()
+        self._client = FakeSocketManager(FakeServer(self._manager))
+
+        self.frames = 0
+        self.bytes = 0
+
+    def connect(self, sid: str, namespace: str = "/"):
+        self._manager.connect(sid, namespace)
+
+    def reset(self):
+        self.frames = 0
+        self.bytes = 0
+
+    def deliver(self, packet: EncodedPacket, event_name: str,
+                to: str | None = None, namespace: str | None = None,
+                skip_sid: str | list[str] | None = None):
+        namespace = namespace or "/"
+        skip_sid = self._manager.exclusions.skip(namespace, event_name, to, skip_sid,
+                                                 self._manager.rooms.get(namespace, {}))
+        skip = set(skip_sid) if isinstance(skip_sid, list) else {skip_sid}
+
+        size = len(packet.payload) if hasattr(packet.payload, "__len__") else 0
+        for sid, _ in self._manager.get_participants(namespace, to):
+            if sid not in skip:
+                self.frames += 1
+                self.bytes += size
+
+    async def send_event(self, event_name, data, to=None, namespace=None, **additional_arguments):
+        self.deliver(self.encode(data), event_name, to, namespace, additional_arguments.get("skip_sid"))
+
+    def receive_event(self, event_name: str, handler: Callable[..., None | Awaitable[None]], namespace: str | None):
+        ...
+
+    async def send_message(self, data, to=None, namespace=None, **additional_arguments):
+        self.deliver(self.encode(data), "message", to, namespace)
+
+    async def broadcast(self, data, event_name="broadcast", skip_sid=None, exclude_rooms=[], namespaces=["/"]):
+        packet = self.encode(data)
+        for namespace in namespaces:
+            self.deliver(packet, event_name, None, namespace,
+                         self._skip_sids(namespace, skip_sid, exclude_rooms))
+
+    async def send_r2r(self, event_name, data, to=None, namespace=None, timeout=60, **additional_arguments):
+        self.deliver(self.encode(data), event_name, to, namespace)
+
+    async def subscribe(self, sid, room_name, namespace=None, exclude_events=[]):
+        self._manager.exclusions.add(namespace or "/", room_name, sid, exclude_events)
+        self._manager.enter_room(sid, namespace or "/", room_name)
+
+    async def unsubscribe(self, sid, room_name, namespace=None):
+        self._manager.exclusions.discard(namespace or "/", room_name, sid)
+        self._manager.leave_room(sid, namespace or "/", room_name)
+
+    async def disconnect(self, sid, namespace=None):
+        namespace = namespace or "/"
+        self._manager.exclusions.discard_sid(namespace, sid)
+        for room in self._manager.rooms.get(namespace, {}).values():
+            room.pop(sid, None)
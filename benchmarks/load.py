@@ -0,0 +1,362 @@
+"""
+Load generator of LiveAPI applications.
+
+Spins up many socket.io clients (asyncio clients spread over several processes) against LiveAPI application running on localhost,
+replays weighted mix of events into namespaces of controllers and measures:
+
+- connect time of clients
+- round-trip latency percentiles of every event (time until acknowledgement of the event),
+  events which call `send_r2r` are answered by clients, so their round trip includes the request-to-response
+- delivery skew of broadcasts, time between the first and the last client which received the same broadcast.
+  Broadcasts are told apart by their `broadcast_id` field (`id` by default), events which trigger broadcasts can pass `{seq}`
+  placeholder (unique for every sent event) to the server for it. Broadcasts without the field are grouped by payload
+  and by time of arrival, deliveries of the same payload within `--broadcast-window` seconds are the same broadcast
+
+Run from the root of Ascender Framework's project while application is running:
+
+    python -m plugins.liveapi.benchmarks.load --clients 2000 --processes 4 --duration 30 --controllers controllers.chat.endpoints
+    python -m plugins.liveapi.benchmarks.load --scenario scenario.json --output liveapi-load.json
+
+Scenario file describes events of the run, every string in payloads may use `{client}`, `{room}` and `{seq}` placeholders:
+
+    {
+        "setup": [{"event": "join", "namespace": "/chat", "payload": {"room": "room-{room}"}}],
+        "mix": [{"event": "message", "namespace": "/chat", "weight": 5, "payload": {"text": "hello", "id": "{seq}"}},
+                {"event": "confirm", "namespace": "/chat", "weight": 1}],
+        "respond": ["confirmation"],
+        "broadcast": ["broadcast"],
+        "broadcast_id": "id"
+    }
+
+Socket.io client needs `aiohttp` (`pip install "python-socketio[asyncio_client]"`).
+"""
+import argparse
+import asyncio
+import importlib
+import inspect
+import ipaddress
+import json
+import platform
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Any
+from urllib.parse import urlparse
+
+import socketio
+
+
+SCHEMA_VERSION = 1
+PERCENTILES = (50, 90, 95, 99, 99.9)
+
+
+class Scenario:
+    """
+    Events replayed by every simulated client
+    """
+
+    def __init__(self, mix: list[dict[str, Any]],
+                 setup: list[dict[str, Any]] | None = None,
+                 respond: list[str] | None = None,
+                 broadcast: list[str] | None = None,
+                 broadcast_id: str = "id") -> None:
+        self.mix = [{"namespace": "/", "weight": 1, "payload": None, **entry} for entry in mix]
+        self.setup = [{"namespace": "/", "payload": None, **entry} for entry in setup or []]
+        self.respond = respond or []
+        self.broadcast = broadcast or ["broadcast"]
+        self.broadcast_id = broadcast_id
+
+        if not self.mix:
+            raise ValueError("Scenario has no events, give `--scenario` file or `--controllers` with LiveAPI events")
+
+    @property
+    def namespaces(self) -> list[str]:
+        return sorted({entry["namespace"] for entry in [*self.mix, *self.setup]})
+
+    @classmethod
+    def load(cls, path: str) -> "Scenario":
+        with open(path) as file:
+            return cls(**json.load(file))
+
+    @classmethod
+    def discover(cls, modules: list[str]) -> "Scenario":
+        """
+        Builds mix of every LiveAPI event of controller modules, namespaces are the same as ones given by `LiveEvent.get_namespace`
+        """
+        mix = []
+        for module_name in modules:
+            module = importlib.import_module(module_name)
+            for _, owner in inspect.getmembers(module, inspect.isclass):
+                if owner.__module__ != module.__name__:
+                    continue
+
+                for _, function in inspect.getmembers(owner, callable):
+                    if (metadata := getattr(function, "_listener_metadata", None)) is None:
+                        continue
+                    if metadata["event_name"] in ("connect", "disconnect"):
+                        continue
+                    mix.append({"event": metadata["event_name"], "namespace": f"/{metadata['namespace']}"})
+
+        return cls(mix)
+
+
+def ensure_localhost(url: str):
+    """
+    Load generator is allowed to run only against application on the same host
+    """
+    host = urlparse(url).hostname or ""
+    if host == "localhost":
+        return
+
+    try:
+        if ipaddress.ip_address(host).is_loopback:
+            return
+    except ValueError:
+        pass
+
+    raise ValueError(f"Load generator runs only against localhost, `{host}` is not a loopback address")
+
+
+def render(value: Any, client: int, rooms: int, seq: str = "") -> Any:
+    if isinstance(value, str):
+        return value.format(client=client, room=client % rooms, seq=seq)
+    if isinstance(value, dict):
+        return {key: render(item, client, rooms, seq) for key, item in value.items()}
+    if isinstance(value, list):
+        return [render(item, client, rooms, seq) for item in value]
+    return value
+
+
+def broadcast_key(data: Any, id_field: str) -> str:
+    """
+    Key of received broadcast, `id:<id>` if broadcast has ID field, otherwise `payload:<JSON of payload>`
+    which is split into separate broadcasts by time of arrival (see `split_broadcasts`)
+    """
+    if isinstance(data, dict) and id_field in data:
+        return f"id:{data[id_field]}"
+    return f"payload:{json.dumps(data, sort_keys=True, default=str)}"
+
+
+def split_broadcasts(received: list[float], window: float) -> list[list[float]]:
+    """
+    Splits deliveries of the same payload into broadcasts, delivery belongs to the broadcast whose first delivery arrived less than `window` seconds before it
+    """
+    groups: list[list[float]] = []
+    for arrived in sorted(received):
+        if groups and arrived - groups[-1][0] < window:
+            groups[-1].append(arrived)
+        else:
+            groups.append([arrived])
+    return groups
+
+
+class Recorder:
+    """
+    Measurements of clients of a single worker process
+    """
+
+    def __init__(self) -> None:
+        self.connect: list[float] = []
+        self.connect_errors = 0
+        self.rtt: dict[str, list[float]] = {}
+        self.errors: dict[str, int] = {}
+        self.server_errors = 0
+        self.responses = 0
+        # NOTE: Wall-clock time of every received broadcast, comparable between processes of the same host
+        self.broadcasts: dict[str, list[float]] = {}
+
+    def export(self) -> dict[str, Any]:
+        return vars(self)
+
+
+async def simulate_client(index: int, args: argparse.Namespace, scenario: Scenario,
+                          recorder: Recorder, connecting: asyncio.Semaphore, deadline: float):
+    client = socketio.AsyncClient(reconnection=False)
+    generator = random.Random(args.seed + index)
+    weights = [entry["weight"] for entry in scenario.mix]
+
+    async def respond(data=None):
+        recorder.responses += 1
+        return data
+
+    for namespace in scenario.namespaces:
+        for event_name in scenario.respond:
+            client.on(event_name, respond, namespace=namespace)
+        for event_name in scenario.broadcast:
+            client.on(event_name,
+                      lambda data=None: recorder.broadcasts.setdefault(broadcast_key(data, scenario.broadcast_id), []).append(time.time()),
+                      namespace=namespace)
+        client.on("error", lambda data=None: setattr(recorder, "server_errors", recorder.server_errors + 1),
+                  namespace=namespace)
+
+    async with connecting:
+        started = time.perf_counter()
+        try:
+            await client.connect(args.url, namespaces=scenario.namespaces,
+                                 socketio_path=args.socketio_path, transports=["websocket"],
+                                 wait_timeout=args.timeout)
+        except Exception:
+            recorder.connect_errors += 1
+            return
+        recorder.connect.append(time.perf_counter() - started)
+
+    try:
+        for entry in scenario.setup:
+            await client.call(entry["event"], render(entry["payload"], index, args.rooms),
+                              namespace=entry["namespace"], timeout=args.timeout)
+
+        interval = 1 / args.rate if args.rate else 0
+        scheduled = time.perf_counter()
+        sent = 0
+        while time.perf_counter() < deadline:
+            entry = generator.choices(scenario.mix, weights)[0]
+            name = f"{entry['namespace']}:{entry['event']}"
+            sent += 1
+
+            started = time.perf_counter()
+            try:
+                await client.call(entry["event"], render(entry["payload"], index, args.rooms, f"{index}-{sent}"),
+                                  namespace=entry["namespace"], timeout=args.timeout)
+                recorder.rtt.setdefault(name, []).append(time.perf_counter() - started)
+            except Exception:
+                recorder.errors[name] = recorder.errors.get(name, 0) + 1
+
+            # NOTE: Open loop pacing, the next event is scheduled independently of latency of the previous one
+            if interval:
+                scheduled += interval
+                if (delay := scheduled - time.perf_counter()) > 0:
+                    await asyncio.sleep(delay)
+    finally:
+        # NOTE: Broadcasts sent right before the end of the run are still delivered
+        await asyncio.sleep(args.drain)
+        await client.disconnect()
+
+
+async def run_worker(first: int, amount: int, args: argparse.Namespace, scenario: Scenario) -> dict[str, Any]:
+    recorder = Recorder()
+    connecting = asyncio.Semaphore(args.connect_concurrency)
+    deadline = time.perf_counter() + args.ramp + args.duration
+
+    await asyncio.gather(*(simulate_client(index, args, scenario, recorder, connecting, deadline)
+                           for index in range(first, first + amount)))
+    return recorder.export()
+
+
+def worker(first: int, amount: int, args: argparse.Namespace, scenario: Scenario) -> dict[str, Any]:
+    return asyncio.run(run_worker(first, amount, args, scenario))
+
+
+def percentiles(values: list[float]) -> dict[str, float]:
+    if not values:
+        return {}
+
+    values = sorted(values)
+    summary = {f"p{percentile:g}": values[min(int(len(values) * percentile / 100), len(values) - 1)] * 1000
+               for percentile in PERCENTILES}
+    summary["mean"] = sum(values) / len(values) * 1000
+    summary["max"] = values[-1] * 1000
+    return summary
+
+
+def aggregate(reports: list[dict[str, Any]], args: argparse.Namespace) -> dict[str, Any]:
+    connect: list[float] = []
+    rtt: dict[str, list[float]] = {}
+    errors: dict[str, int] = {}
+    received: dict[str, list[float]] = {}
+
+    for report in reports:
+        connect.extend(report["connect"])
+        for name, values in report["rtt"].items():
+            rtt.setdefault(name, []).extend(values)
+        for name, count in report["errors"].items():
+            errors[name] = errors.get(name, 0) + count
+        for key, arrivals in report["broadcasts"].items():
+            received.setdefault(key, []).extend(arrivals)
+
+    broadcasts: list[list[float]] = []
+    for key, arrivals in received.items():
+        if key.startswith("id:"):
+            broadcasts.append(arrivals)
+        else:
+            broadcasts.extend(split_broadcasts(arrivals, args.broadcast_window))
+
+    events = {name: {"count": len(values), "errors": errors.get(name, 0),
+                     "per_second": len(values) / args.duration, "latency_ms": percentiles(values)}
+              for name, values in sorted(rtt.items())}
+    for name in errors.keys() - rtt.keys():
+        events[name] = {"count": 0, "errors": errors[name], "per_second": 0.0, "latency_ms": {}}
+
+    return {
+        "clients": args.clients,
+        "connected": len(connect),
+        "connect_errors": sum(report["connect_errors"] for report in reports),
+        "connect_ms": percentiles(connect),
+        "events": events,
+        "total_per_second": sum(len(values) for values in rtt.values()) / args.duration,
+        "server_errors": sum(report["server_errors"] for report in reports),
+        "r2r_responses": sum(report["responses"] for report in reports),
+        "broadcasts": {
+            "messages": len(broadcasts),
+            "deliveries": sum(len(arrivals) for arrivals in broadcasts),
+            "skew_ms": percentiles([max(arrivals) - min(arrivals) for arrivals in broadcasts]),
+        },
+    }
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="LiveAPI load generator, runs only against localhost")
+    parser.add_argument("--url", default="http://127.0.0.1:8000", help="URL of the application")
+    parser.add_argument("--location", default="/ws", help="Location of LiveAPI (the same as `location` of LiveAPIPlugin)")
+    parser.add_argument("--clients", type=int, default=100, help="Amount of simulated clients")
+    parser.add_argument("--processes", type=int, default=1, help="Amount of worker processes, clients are split between them")
+    parser.add_argument("--duration", type=float, default=10.0, help="Duration of measured run in seconds")
+    parser.add_argument("--ramp", type=float, default=0.0, help="Extra seconds given to clients to connect before deadline counts")
+    parser.add_argument("--rate", type=float, default=1.0, help="Events per second of every client, 0 sends events back-to-back")
+    parser.add_argument("--rooms", type=int, default=10, help="Amount of rooms, client is given `{room}` of `client % rooms`")
+    parser.add_argument("--scenario", help="JSON file of scenario")
+    parser.add_argument("--controllers", nargs="*", default=[], help="Controller modules, their LiveAPI events are replayed with empty payloads")
+    parser.add_argument("--connect-concurrency", type=int, default=100, help="Amount of clients connecting at once in every process")
+    parser.add_argument("--timeout", type=float, default=10.0, help="Timeout of connect and of every event in seconds")
+    parser.add_argument("--drain", type=float, default=1.0, help="Seconds clients wait for broadcasts before disconnecting")
+    parser.add_argument("--broadcast-window", type=float, default=1.0,
+                        help="Seconds within which deliveries of the same payload without ID are the same broadcast")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of event mix")
+    parser.add_argument("--output", "-o", help="File of JSON report, printed to stdout if not given")
+    args = parser.parse_args(argv)
+
+    ensure_localhost(args.url)
+    args.socketio_path = f"{args.location.rstrip('/')}/socket.io"
+
+    scenario = Scenario.load(args.scenario) if args.scenario else Scenario.discover(args.controllers)
+    processes = max(min(args.processes, args.clients), 1)
+    shares = [args.clients // processes + (index < args.clients % processes) for index in range(processes)]
+    firsts = [sum(shares[:index]) for index in range(processes)]
+
+    print(f"Running {args.clients} clients in {processes} processes for {args.duration}s against {args.url}", file=sys.stderr)
+    if processes == 1:
+        reports = [worker(0, args.clients, args, scenario)]
+    else:
+        with ProcessPoolExecutor(max_workers=processes) as executor:
+            reports = list(executor.map(worker, firsts, shares, [args] * processes, [scenario] * processes))
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "options": {name: value for name, value in vars(args).items() if name != "output"},
+        "results": aggregate(reports, args),
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,261 @@
+"""
+Benchmark suite of LiveAPI hot paths.
+
+Runs offline against in-process `FakeEngine` and covers event dispatch, validation strategies,
+broadcast fan-out and streaming responses. Results are printed (or written) as JSON,
+so they can be stored and compared release over release.
+
+Run from the root of Ascender Framework's project:
+
+    python -m plugins.liveapi.benchmarks.suite --output liveapi-bench.json
+    python -m plugins.liveapi.benchmarks.suite --filter broadcast --quick
+"""
+import argparse
+import asyncio
+import inspect
+import json
+import platform
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Any, Awaitable, Callable
+
+from fastapi import Depends, Header
+from pydantic import BaseModel
+
+from core.registries.service import ServiceRegistry
+from plugins.liveapi.benchmarks.fake import FakeEngine
+from plugins.liveapi.context import SIOContext
+from plugins.liveapi.engines.base import BaseEngine
+from plugins.liveapi.error import ErrorHandler
+from plugins.liveapi.listener import Listener
+from plugins.liveapi.plan import compile_resolver
+from plugins.liveapi.types.authorization import SIOAuthorization
+from plugins.liveapi.validation.payload import EventPayload
+
+
+SCHEMA_VERSION = 1
+
+
+class Item(BaseModel):
+    id: int
+    name: str
+    tags: list[str]
+
+
+class Message(BaseModel):
+    text: str
+    priority: int
+
+
+class Batch(BaseModel):
+    items: list[Item]
+
+
+class Case:
+    """
+    Single benchmark case, `run` executes `iterations` operations and is repeated `repeats` times, the best repeat is reported
+    """
+
+    def __init__(self, group: str, name: str, run: Callable[[int], Awaitable[Any]],
+                 iterations: int, **params: Any) -> None:
+        self.group = group
+        self.name = name
+        self.run = run
+        self.iterations = iterations
+        self.params = params
+
+    async def measure(self, repeats: int, scale: float) -> dict[str, Any]:
+        iterations = max(int(self.iterations * scale), 1)
+        # NOTE: Warm up run, first event compiles lazy state (type adapters, cached packets)
+        await self.run(1)
+
+        timings = []
+        for _ in range(repeats):
+            started = time.perf_counter()
+            await self.run(iterations)
+            timings.append(time.perf_counter() - started)
+
+        best = min(timings)
+        return {
+            "group": self.group,
+            "name": self.name,
+            "params": self.params,
+            "iterations": iterations,
+            "repeats": repeats,
+            "best_seconds": best,
+            "mean_seconds": sum(timings) / len(timings),
+            "ops_per_second": iterations / best,
+            "microseconds_per_op": best / iterations * 1_000_000,
+        }
+
+
+def dependency_chain(amount: int) -> Callable[..., Awaitable[Any]]:
+    """
+    Builds listener callback with `amount` distinct parameter dependencies
+    """
+    def dependency_of(index: int):
+        async def dependency(ctx: SIOContext) -> str:
+            return ctx.session_id
+        dependency.__qualname__ = f"dependency_{index}"
+        return dependency
+
+    async def callback(ctx: SIOContext, message: Message, **dependencies: str):
+        return message
+
+    parameters = [inspect.Parameter("ctx", inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=SIOContext),
+                  inspect.Parameter("message", inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=Message)]
+    parameters += [inspect.Parameter(f"dependency_{index}", inspect.Parameter.KEYWORD_ONLY,
+                                     annotation=str, default=Depends(dependency_of(index)))
+                   for index in range(amount)]
+    callback.__signature__ = inspect.Signature(parameters)
+    return callback
+
+
+def dispatch_cases(engine: FakeEngine) -> list[Case]:
+    data = Message(text="hello", priority=1).model_dump_json()
+    engine.connect("sid", "/bench")
+
+    def case(amount: int) -> Case:
+        listener = Listener("message", dependency_chain(amount), [], "/bench").compile()
+
+        async def run(iterations: int):
+            for _ in range(iterations):
+                await listener("sid", data)
+
+        return Case("dispatch", f"dispatch[{amount} dependencies]", run, 20_000, dependencies=amount)
+
+    return [case(amount) for amount in (0, 1, 5)]
+
+
+def validation_cases(engine: FakeEngine) -> list[Case]:
+    ctx = SIOContext(engine, "/bench", "message", "sid")
+
+    def parameter(name: str, annotation: Any, default: Any = inspect.Parameter.empty) -> inspect.Parameter:
+        return inspect.Parameter(name, inspect.Parameter.POSITIONAL_OR_KEYWORD, annotation=annotation, default=default)
+
+    def case(strategy: str, size: str, param: inspect.Parameter, data: Any,
+             headers: dict[str, str] | None = None, iterations: int = 20_000) -> Case:
+        resolver = compile_resolver(param.name, param)
+        assert resolver.kind == strategy, f"`{param.name}` is resolved by `{resolver.kind}` strategy instead of `{strategy}`"
+
+        async def run(iterations: int):
+            for _ in range(iterations):
+                # NOTE: Every event gets new payload, so decoding is measured as well
+                resolver.resolve(EventPayload(data, engine.serializer.loads), headers, ctx)
+
+        return Case("validation", f"{strategy}[{size}]", run, iterations, strategy=strategy, size=size,
+                    payload_bytes=len(data) if isinstance(data, str) else None)
+
+    items = [Item(id=index, name=f"item-{index}", tags=["a", "b", "c"]).model_dump() for index in range(1_000)]
+    small_headers = {"host": "localhost", "user-agent": "bench", "x-request-id": "1"}
+    large_headers = {**{f"x-header-{index}": "value" * 10 for index in range(200)}, "x-request-id": "1"}
+    token = "x" * 4096
+
+    return [
+        case("general", "small", parameter("values", list[int]), json.dumps(list(range(10)))),
+        case("general", "large", parameter("values", list[int]), json.dumps(list(range(10_000))), iterations=500),
+        case("json", "small", parameter("message", Message), Message(text="hello", priority=1).model_dump_json()),
+        case("json", "large", parameter("batch", Batch), json.dumps({"items": items}), iterations=200),
+        case("header", "small", parameter("x_request_id", str, Header()), None, headers=small_headers),
+        case("header", "large", parameter("x_request_id", str, Header()), None, headers=large_headers),
+        case("authorization", "small", parameter("authorization", SIOAuthorization),
+             {"HTTP_AUTHORIZATION": "Bearer token"}),
+        case("authorization", "large", parameter("authorization", SIOAuthorization),
+             {"HTTP_AUTHORIZATION": f"Bearer {token}"}),
+    ]
+
+
+def broadcast_cases() -> list[Case]:
+    payload = Message(text="hello", priority=1)
+
+    def case(rooms: int) -> Case:
+        # NOTE: Every client is a member of it's own room, 1% of rooms are excluded from broadcast
+        engine = FakeEngine()
+        for index in range(rooms):
+            engine.connect(f"sid-{index}")
+            engine._manager.enter_room(f"sid-{index}", "/", f"room-{index}")
+        exclude_rooms = [f"room-{index}" for index in range(0, rooms, 100)]
+
+        async def run(iterations: int):
+            for _ in range(iterations):
+                await engine.broadcast(payload, "broadcast", exclude_rooms=exclude_rooms)
+
+        return Case("broadcast", f"broadcast[{rooms} rooms]", run, max(1_000_000 // rooms, 5),
+                    rooms=rooms, recipients=rooms - len(exclude_rooms))
+
+    return [case(rooms) for rooms in (1_000, 10_000, 100_000)]
+
+
+def streaming_cases(engine: FakeEngine) -> list[Case]:
+    engine.connect("sid", "/bench")
+    ctx = SIOContext(engine, "/bench", "stream", "sid")
+    items = [Item(id=index, name=f"item-{index}", tags=["a"]) for index in range(1_000)]
+
+    def case(batch_size: int, asynchronous: bool) -> Case:
+        async def contents():
+            for item in items:
+                yield item
+
+        async def run(iterations: int):
+            for _ in range(iterations):
+                await ctx.streaming_response(contents() if asynchronous else items, batch_size=batch_size)
+
+        source = "async" if asynchronous else "sync"
+        return Case("streaming", f"streaming[{source}, batch {batch_size}]", run, 20,
+                    items=len(items), batch_size=batch_size, source=source)
+
+    return [case(batch_size, asynchronous) for asynchronous in (False, True) for batch_size in (1, 100)]
+
+
+def collect_cases() -> list[Case]:
+    engine = FakeEngine()
+    registry = ServiceRegistry()
+    registry.add_singletone(BaseEngine, engine)
+    registry.add_singletone(ErrorHandler, ErrorHandler())
+
+    return [*dispatch_cases(engine), *validation_cases(engine),
+            *broadcast_cases(), *streaming_cases(engine)]
+
+
+async def run_suite(cases: list[Case], repeats: int, scale: float) -> list[dict[str, Any]]:
+    results = []
+    for case in cases:
+        result = await case.measure(repeats, scale)
+        print(f"{case.name:<40} {result['ops_per_second']:>14,.1f} ops/sec", file=sys.stderr)
+        results.append(result)
+    return results
+
+
+def main(argv: list[str] | None = None):
+    parser = argparse.ArgumentParser(description="LiveAPI benchmark suite")
+    parser.add_argument("--output", "-o", help="File of JSON report, printed to stdout if not given")
+    parser.add_argument("--filter", "-k", default="", help="Runs only cases which name contains given text")
+    parser.add_argument("--repeats", type=int, default=3, help="Repeats of every case, the best one is reported")
+    parser.add_argument("--quick", action="store_true", help="Runs 10% of iterations of every case")
+    args = parser.parse_args(argv)
+
+    cases = [case for case in collect_cases() if args.filter in case.name]
+    scale = 0.1 if args.quick else 1.0
+    results = asyncio.run(run_suite(cases, args.repeats, scale))
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "scale": scale,
+        "results": results,
+    }
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+        print()
+
+
+if __name__ == "__main__":
+    main()
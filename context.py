@@ -1,11 +1,16 @@
-from typing import Any, Iterable
+import asyncio
+from typing import Any, AsyncIterable, AsyncIterator, Callable, Iterable
 from pydantic import RootModel
 from core.optionals.base.dto import BaseDTO
 from core.optionals.base.response import BaseResponse
 from plugins.liveapi.engines.base import BaseEngine
+from plugins.liveapi.validation.depends import ConnectionDepends
 
 
 class SIOContext:
+    # NOTE: Interval in seconds of connection checks of idle streaming responses
+    stream_idle_check: float = 1.0
+
     def __init__(self, engine: BaseEngine, namespace: str,
                  event_name: str, sid: str) -> None:
         self.engine = engine
@@ -15,19 +20,119 @@ class SIOContext:
     
     async def reply(self, event_name: str | None, 
                     data: BaseDTO | BaseResponse | RootModel | Any,
-                    to: str | None = None, **additional_arguments):
+                    to: str | list[str] | None = None, **additional_arguments):
         if to is None:
             to = self.session_id
         if event_name is None:
             event_name = self.event_name
 
+        # NOTE: Replying to many rooms or clients is a single emit, so client which is in several of them receives the event once
+        if isinstance(to, list):
+            data = self.engine.encode(data)
+
         return await self.send_event(event_name,
                                         data, to, self.namespace, **additional_arguments)
     
-    async def streaming_response(self, contents: Iterable[BaseDTO | BaseResponse | RootModel | Any],
-                                 to: str | None = None, **additional_arguments):
-        for content in contents:
-            await self.reply(content, to, **additional_arguments)
+    async def streaming_response(self, contents: Iterable[BaseDTO | BaseResponse | RootModel | Any] | AsyncIterable[BaseDTO | BaseResponse | RootModel | Any],
+                                 to: str | None = None,
+                                 event_name: str | None = None,
+                                 batch_size: int = 1,
+                                 batch_interval: float | None = None,
+                                 max_in_flight: int = 64,
+                                 **additional_arguments) -> int:
+        """
+        ## Streaming Response
+
+        Streams items of sync or async iterable (or generator) to the client.
+
+        Args:
+            contents (Iterable | AsyncIterable): Items to stream
+            to (str | None, optional): Client Session ID or name of the room. Defaults to current client.
+            event_name (str | None, optional): Name of event of every frame. Defaults to current event.
+            batch_size (int, optional): Maximal amount of items coalesced into single frame, frames of many items are sent as lists. Defaults to 1.
+            batch_interval (float | None, optional): Maximal time in seconds frame waits for more items before being sent. Defaults to None (waits until `batch_size` is collected).
+            max_in_flight (int, optional): Maximal amount of items produced, but not sent yet. Producer is suspended when it's reached. Defaults to 64.
+
+        Producer is cancelled when the client disconnects.
+
+        Returns:
+            int: Amount of sent items
+        """
+        batching = batch_size > 1 or batch_interval is not None
+        queue: asyncio.Queue = asyncio.Queue(maxsize=max(max_in_flight, batch_size))
+        _end = object()
+
+        async def produce():
+            try:
+                if isinstance(contents, AsyncIterable):
+                    async for content in contents:
+                        await queue.put(content)
+                else:
+                    for content in contents:
+                        await queue.put(content)
+            except asyncio.CancelledError:
+                # NOTE: Producer is cancelled only when consumer is gone, so nobody would receive the end marker
+                raise
+            except Exception:
+                await queue.put(_end)
+                raise
+            await queue.put(_end)
+
+        producer = asyncio.create_task(produce())
+        sent = 0
+        finished = False
+        disconnected = False
+
+        try:
+            while not finished:
+                # NOTE: Idle stream (e.g. log tail) still checks periodically if the client is connected
+                try:
+                    batch = [await asyncio.wait_for(queue.get(), self.stream_idle_check)]
+                except asyncio.TimeoutError:
+                    if to is None and not self.engine.is_connected(self.session_id, self.namespace):
+                        disconnected = True
+                        break
+                    continue
+
+                if batch[0] is _end:
+                    break
+
+                loop = asyncio.get_running_loop()
+                deadline = loop.time() + batch_interval if batch_interval is not None else None
+                while len(batch) < batch_size:
+                    try:
+                        if deadline is None:
+                            content = await queue.get()
+                        else:
+                            content = await asyncio.wait_for(queue.get(), max(deadline - loop.time(), 0))
+                    except asyncio.TimeoutError:
+                        break
+
+                    if content is _end:
+                        finished = True
+                        break
+                    batch.append(content)
+
+                # NOTE: Stream is owned by the client which requested it, so it's stopped once the client is gone
+                if to is None and not self.engine.is_connected(self.session_id, self.namespace):
+                    disconnected = True
+                    break
+
+                if batching:
+                    await self.reply(event_name, self.engine.serializer.encode_batch(batch), to, **additional_arguments)
+                else:
+                    await self.reply(event_name, batch[0], to, **additional_arguments)
+                sent += len(batch)
+
+            if not disconnected:
+                # NOTE: Raises exception of producer if iteration of contents failed
+                await producer
+        finally:
+            if not producer.done():
+                producer.cancel()
+                await asyncio.gather(producer, return_exceptions=True)
+
+        return sent
     
     async def disconnect_client(self, sid: str, namespace: str | None = None):
         if namespace is None:
@@ -49,7 +154,31 @@ class SIOContext:
         if namespace is None:
             namespace = self.namespace
 
-        return self.engine._client._sio.session(sid, namespace)
+        return self.engine.session(sid, namespace)
+
+    async def refresh_dependencies(self, *dependencies: Callable[..., Any],
+                                   sid: str | None = None,
+                                   namespace: str | None = None):
+        """
+        ## Refresh Dependencies
+
+        Drops results of connection-scoped dependencies (`ConnectionDepends`) stored in session,
+        so they are resolved again on the next event. If no dependencies are given, drops results of every connection-scoped dependency.
+        """
+        if sid is None:
+            sid = self.session_id
+        if namespace is None:
+            namespace = self.namespace
+
+        session = await self.engine.get_session(sid, namespace)
+        if dependencies:
+            keys = [ConnectionDepends.session_key(dependency) for dependency in dependencies]
+        else:
+            keys = [key for key in session if key.startswith(ConnectionDepends.session_prefix)]
+
+        for key in keys:
+            session.pop(key, None)
+        await self.engine.save_session(sid, session, namespace)
 
     @property
     def send_event(self):
@@ -67,6 +196,28 @@ class SIOContext:
     def send_r2r(self):
         return self.engine.send_r2r
     
+    async def gather_r2r(self, event_name: str,
+                         data: BaseDTO | BaseResponse | RootModel | Any,
+                         to: str | list[str],
+                         namespace: str | None = None, timeout: float = 60,
+                         max_in_flight: int = 100) -> dict[str, Any]:
+        if namespace is None:
+            namespace = self.namespace
+
+        return await self.engine.gather_r2r(event_name, data, to, namespace,
+                                            timeout=timeout, max_in_flight=max_in_flight)
+
+    def iter_r2r(self, event_name: str,
+                 data: BaseDTO | BaseResponse | RootModel | Any,
+                 to: str | list[str],
+                 namespace: str | None = None, timeout: float = 60,
+                 max_in_flight: int = 100) -> AsyncIterator[tuple[str, Any]]:
+        if namespace is None:
+            namespace = self.namespace
+
+        return self.engine.iter_r2r(event_name, data, to, namespace,
+                                    timeout=timeout, max_in_flight=max_in_flight)
+
     async def subscribe(
             self, 
             room_name: str,
@@ -1,4 +1,5 @@
-from functools import wraps
+from functools import lru_cache, wraps
+import inspect
 import os
 from typing import Any
 
@@ -7,31 +8,84 @@ from fastapi import Depends
 from core.registries.service import ServiceRegistry
 
 
+@lru_cache(maxsize=None)
+def namespace_of(file_path: str) -> str:
+    # NOTE: The name of each controller is tied to the first parent folder where three (endpoints.py, service.py and repository.py) are located in
+    # So in LiveAPI Plugin, we use name of controller as a name of namespace and to get the name of controller, we get the name of first parent folder
+    return os.path.basename(os.path.dirname(os.path.abspath(file_path)))
+
+
 class LiveEvent:
-    def __init__(self, event_name: str) -> None:
+    # NOTE: Listeners are recorded when they are decorated, (module, qualified name of class) -> names of decorated methods
+    registry: dict[tuple[str, str], list[str]] = {}
+
+    def __init__(self, event_name: str,
+                 max_concurrency: int | None = None,
+                 rate_limit: float | tuple[float, int] | None = None,
+                 overflow: str | None = None,
+                 execution: str | None = None,
+                 executor_concurrency: int | None = None) -> None:
+        """
+        Args:
+            event_name (str): Name of event or pattern of event names, e.g. `orders.*` (see `EventRouter`)
+            max_concurrency (int | None, optional): Maximal amount of handlers of this event running concurrently for a single client. Defaults to plugin-wide limit.
+            rate_limit (float | tuple[float, int] | None, optional): Token bucket rate (events per second) and optionally burst of this event for a single client. Defaults to plugin-wide limit.
+            overflow (str | None, optional): Overflow policy (`queue`, `drop-oldest` or `reject`). Defaults to plugin-wide policy.
+            execution (str | None, optional): Where handler is executed, `loop` (event loop), `thread` (thread pool) or `process` (process pool).
+                Only sync handlers can be offloaded to pools. Defaults to `loop` for coroutines and `thread` for sync handlers.
+            executor_concurrency (int | None, optional): Maximal amount of handlers of this event running in pool at once. Defaults to None (limited by pool only).
+        """
         self.event_name = event_name
         self.service_registry = ServiceRegistry()
+
+        # NOTE: Only given options override plugin-wide admission policy
+        self.admission = {name: value for name, value in (("max_concurrency", max_concurrency),
+                                                          ("rate_limit", rate_limit),
+                                                          ("overflow", overflow)) if value is not None}
+        self.execution = execution
+        self.executor_concurrency = executor_concurrency
     
+    @classmethod
+    def listeners_of(cls, owner: type) -> list[str]:
+        """
+        Names of methods decorated by `LiveEvent` in class and it's base classes
+        """
+        names: dict[str, None] = {}
+        for klass in owner.__mro__:
+            names.update(dict.fromkeys(cls.registry.get((klass.__module__, klass.__qualname__), ())))
+        return list(names)
+
     def get_namespace(self, executable):
         # Unwrapping function if it was wrapped by multiple decorators
         original_func = executable
         while hasattr(original_func, '__wrapped__'):
             original_func = original_func.__wrapped__
 
-        # NOTE: The name of each controller is tied to the first parent folder where three (endpoints.py, service.py and repository.py) are located in
-        # So in LiveAPI Plugin, we use name of controller as a name of namespace and to get the name of controller, we get the name of first parent folder
-        file_path = original_func.__code__.co_filename
-
-        folder_name = os.path.basename(os.path.dirname(os.path.abspath(file_path)))
-        
-        return folder_name
+        return namespace_of(original_func.__code__.co_filename)
 
     def __call__(self, executable) -> Any:
         
         dependencies: list[Depends] = getattr(executable, "_dependencies", [])
         executable._listener_metadata = {"event_name": self.event_name,
                                          "namespace": self.get_namespace(executable),
-                                         "dependencies": dependencies}
+                                         "dependencies": dependencies,
+                                         "admission": self.admission,
+                                         "execution": self.execution,
+                                         "executor_concurrency": self.executor_concurrency}
+
+        owner, _, name = executable.__qualname__.rpartition(".")
+        if owner:
+            names = LiveEvent.registry.setdefault((executable.__module__, owner), [])
+            if name not in names:
+                names.append(name)
+
+        # NOTE: Sync handlers stay sync, so they can be offloaded to executor pools
+        if not inspect.iscoroutinefunction(executable):
+            @wraps(executable)
+            def sync_wrapper(*args, **kwargs):
+                return executable(*args, **kwargs)
+
+            return sync_wrapper
 
         @wraps(executable)
         async def wrapper(*args, **kwargs):
@@ -5,8 +5,15 @@ from core.registries.service import ServiceRegistry
 
 
 class ParaGuard:
-    def __init__(self, name: str | None = None) -> None:
+    def __init__(self, name: str | None = None, scope: str = "event") -> None:
+        """
+        Args:
+            name (str | None, optional): Name of parameter guarded by this guard. Defaults to name of the method.
+            scope (str, optional): `event` runs guard on every event, `connection` runs it once per connection
+                and reuses result stored in session until client disconnects. Defaults to `event`.
+        """
         self.name = name
+        self.scope = scope
     
     def _define_singletones(self, instance: object):
         """
@@ -26,6 +33,7 @@ class ParaGuard:
             executable._name = executable.__name__
         else:
             executable._name = self.name
+        executable._scope = self.scope
 
         @wraps(executable)
         async def wrapper(*args, **kwargs):
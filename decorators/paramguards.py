@@ -3,6 +3,8 @@ from typing import Any, Callable
 
 from fastapi import Depends
 
+from plugins.liveapi.validation.depends import ConnectionDepends
+
 
 class ParamGuards:
 
@@ -22,8 +24,11 @@ class ParamGuards:
 
         for name, param in sig.parameters.items():
             if name + "_guard" in methods and param.default == Parameter.empty:
+                guard = getattr(self, f"{name}_guard")
+                # NOTE: Guards of `connection` scope are resolved once per connection, see `ParaGuard`
+                depends = ConnectionDepends if getattr(guard, "_scope", "event") == "connection" else Depends
                 new_parameters.append(
-                    Parameter(name, param.kind, annotation=param.annotation, default=Depends(getattr(self, f"{name}_guard"))))
+                    Parameter(name, param.kind, annotation=param.annotation, default=depends(guard)))
             else:
                 new_parameters.append(param)
 
@@ -1,15 +1,212 @@
+import asyncio
 from abc import ABC, abstractmethod
-from typing import Any, Awaitable, Callable
-from fastapi_socketio import SocketManager
+from typing import TYPE_CHECKING, Any, AsyncIterator, Awaitable, Callable, Iterable
 
 from core.optionals import BaseDTO, BaseResponse
 from pydantic import RootModel
 
+from plugins.liveapi.engines.packet import EncodedPacket
+from plugins.liveapi.metrics import MetricsRegistry
+from plugins.liveapi.serializers.base import BaseSerializer
+
+# NOTE: socket.io is imported only by engines which use it
+if TYPE_CHECKING:
+    from fastapi_socketio import SocketManager
+
 
 class BaseEngine(ABC):
-    _client: SocketManager
+    _client: "SocketManager"
     _manager: Any | None = None
-    _scope: dict[str, dict[str, Any]] | dict[str, Any]
+    serializer: BaseSerializer
+
+    def encode(self, data: BaseDTO | BaseResponse | RootModel | Any) -> EncodedPacket:
+        """
+        ## Encode
+
+        Encodes payload once into reusable packet.
+        Packet can be passed as `data` to `send_event`, `send_message` and `broadcast` any amount of times without being encoded again.
+        """
+        if isinstance(data, EncodedPacket):
+            return data
+        return EncodedPacket(self.serializer.encode(data))
+
+    def on_disconnect(self, callback: Callable[[str, str], None]):
+        """
+        ## On Disconnect
+
+        Registers callback called with session ID and namespace of every disconnected client,
+        used to drop per-connection state.
+        """
+        self._manager.disconnect_callbacks.append(callback)
+
+    def is_connected(self, sid: str, namespace: str | None = None) -> bool:
+        """
+        ## Is Connected
+
+        Checks whether client given in `sid` is still connected to the namespace
+        """
+        return self._manager.is_connected(sid, namespace or "/")
+
+    async def get_session(self, sid: str, namespace: str | None = None) -> dict[str, Any]:
+        """
+        ## Get Session
+
+        Returns user session of client given in `sid`, session lives while client is connected
+        """
+        return await self._client._sio.get_session(sid, namespace)
+
+    async def save_session(self, sid: str, session: dict[str, Any], namespace: str | None = None):
+        """
+        ## Save Session
+
+        Stores user session of client given in `sid`
+        """
+        return await self._client._sio.save_session(sid, session, namespace)
+
+    def session(self, sid: str, namespace: str | None = None):
+        """
+        ## Session
+
+        Returns async context manager of user session, session is stored when context manager exits
+        """
+        return self._client._sio.session(sid, namespace)
+
+    def namespace_stats(self) -> dict[str, tuple[int, int]]:
+        """
+        ## Namespace Stats
+
+        Returns amount of connected clients and amount of rooms (except of private rooms of clients) of every namespace
+        """
+        stats = {}
+        for namespace, rooms in self._manager.rooms.items():
+            clients = len(rooms.get(None, {}))
+            stats[namespace] = (clients, max(len(rooms) - clients - (None in rooms), 0))
+        return stats
+
+    def use_metrics(self, metrics: MetricsRegistry):
+        """
+        ## Use Metrics
+
+        Enables recording of outbound messages and namespace gauges into metrics registry
+        """
+        self._manager.metrics = metrics
+
+        def collect():
+            stats = self.namespace_stats()
+            return {
+                "liveapi_connected_clients": ("Connected clients of namespace",
+                                              {(("namespace", namespace),): clients for namespace, (clients, _) in stats.items()}),
+                "liveapi_rooms": ("Rooms of namespace",
+                                  {(("namespace", namespace),): rooms for namespace, (_, rooms) in stats.items()}),
+            }
+
+        metrics.gauges.append(collect)
+
+    async def iter_r2r(self, event_name: str,
+                       data: BaseDTO | BaseResponse | RootModel | Any,
+                       to: str | list[str],
+                       namespace: str | None = None, timeout: float = 60,
+                       max_in_flight: int = 100) -> AsyncIterator[tuple[str, Any]]:
+        """
+        ## Iterate Request-to-Response
+
+        Sends request to every member of the room (or of every room and client given in list) concurrently
+        and yields `(sid, response)` pairs as soon as responses arrive.
+
+        Every request shares the same deadline of `timeout` seconds and at most `max_in_flight` requests are awaited at once.
+        Clients which didn't respond until deadline are yielded with `TimeoutError`, clients which failed with their exception.
+        """
+        from socketio.exceptions import TimeoutError as SocketIOTimeoutError
+
+        namespace = namespace or "/"
+        packet = self.encode(data)
+        sids = await self._r2r_targets(to, namespace)
+
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        in_flight = asyncio.Semaphore(max(max_in_flight, 1))
+
+        async def request(sid: str) -> tuple[str, Any]:
+            async with in_flight:
+                # NOTE: Requests which waited for a slot until deadline aren't sent at all
+                if (remaining := deadline - loop.time()) <= 0:
+                    return sid, TimeoutError(f"Client `{sid}` didn't respond in {timeout} seconds")
+                try:
+                    return sid, await self.send_r2r(event_name, packet, to=sid, namespace=namespace, timeout=remaining)
+                except (asyncio.TimeoutError, SocketIOTimeoutError):
+                    return sid, TimeoutError(f"Client `{sid}` didn't respond in {timeout} seconds")
+                except Exception as e:
+                    return sid, e
+
+        tasks = [asyncio.ensure_future(request(sid)) for sid in sids]
+        try:
+            for response in asyncio.as_completed(tasks):
+                yield await response
+        finally:
+            # NOTE: Requests are dropped if caller stops iterating early
+            for task in tasks:
+                task.cancel()
+
+    async def gather_r2r(self, event_name: str,
+                         data: BaseDTO | BaseResponse | RootModel | Any,
+                         to: str | list[str],
+                         namespace: str | None = None, timeout: float = 60,
+                         max_in_flight: int = 100) -> dict[str, Any]:
+        """
+        ## Gather Request-to-Response
+
+        The same as `iter_r2r`, but returns map of session ID to response (or to `TimeoutError` and exception of failed client) once every request is done
+        """
+        return {sid: response async for sid, response in self.iter_r2r(event_name, data, to, namespace,
+                                                                         timeout, max_in_flight)}
+
+    async def _r2r_targets(self, to: str | list[str], namespace: str) -> list[str]:
+        """
+        Session IDs of request-to-response targets, rooms are expanded into their members.
+        Target which is neither a room with members nor a connected client (e.g. empty room) has no targets
+        """
+        sids: dict[str, None] = {}
+        for target in [to] if isinstance(to, str) else to:
+            if members := await self._room_members(target, namespace):
+                sids.update(dict.fromkeys(members))
+            elif await self._is_online(target, namespace):
+                sids[target] = None
+        return list(sids)
+
+    async def _room_members(self, room: str, namespace: str) -> Iterable[str]:
+        """
+        Session IDs of members of the room, overridden by engines which know members of rooms of other nodes
+        """
+        return self._manager.rooms.get(namespace, {}).get(room, {}).keys()
+
+    async def _is_online(self, sid: str, namespace: str) -> bool:
+        """
+        Checks whether client is connected, overridden by engines which know clients of other nodes
+        """
+        return self.is_connected(sid, namespace)
+
+    def _prepare(self, data: BaseDTO | BaseResponse | RootModel | EncodedPacket | Any) -> Any:
+        if isinstance(data, EncodedPacket):
+            return data.payload
+        # NOTE: Payload is encoded before emit, so socket.io only splices it into packet and size of payload is known
+        return self.serializer.encode(data)
+
+    def _skip_sids(self, namespace: str, skip_sid: str | list[str] | None,
+                   exclude_rooms: list[str]) -> list[str] | None:
+        """
+        Collects session IDs which should be skipped during broadcast into the namespace,
+        session IDs of every member of excluded room are joined to `skip_sid`.
+        """
+        if isinstance(skip_sid, list):
+            skip = set(skip_sid)
+        else:
+            skip = {skip_sid} if skip_sid is not None else set()
+
+        rooms = self._manager.rooms.get(namespace, {})
+        for room_name in exclude_rooms:
+            skip |= rooms.get(room_name, {}).keys()
+
+        return list(skip) or None
 
     @abstractmethod
     async def send_event(self, event_name: str,
@@ -68,6 +265,7 @@ class BaseEngine(ABC):
 
         Broadcast some event to every single connection.
         Sends to all connected clients the event data you wish.
+        Every client receives event only once, even if it's a member of many rooms.
         """
         ...
     
@@ -0,0 +1,128 @@
+import zlib
+from typing import Callable
+
+
+# NOTE: JSON documents never start with zero byte, so compressed messages are told apart from plain ones by this prefix
+MAGIC = b"\x00LC"
+
+
+class Codec:
+    __slots__ = ("name", "id", "compress", "decompress")
+
+    def __init__(self, name: str, id: int,
+                 compress: Callable[[bytes], bytes],
+                 decompress: Callable[[bytes], bytes]) -> None:
+        self.name = name
+        self.id = id
+        self.compress = compress
+        self.decompress = decompress
+
+
+def load_codec(name: str, level: int | None = None) -> Codec:
+    """
+    Loads compression codec, `lz4` and `zstd` codecs require `lz4` and `zstandard` packages
+    """
+    match name:
+        case "zlib":
+            return Codec("zlib", 1, lambda data: zlib.compress(data, level if level is not None else 6),
+                         zlib.decompress)
+
+        case "lz4":
+            import lz4.frame
+            return Codec("lz4", 2, lambda data: lz4.frame.compress(data, compression_level=level or 0),
+                         lz4.frame.decompress)
+
+        case "zstd":
+            import zstandard
+            compressor = zstandard.ZstdCompressor(level=level if level is not None else 3)
+            decompressor = zstandard.ZstdDecompressor()
+            return Codec("zstd", 3, compressor.compress, decompressor.decompress)
+
+        case _:
+            raise ValueError(f"Compression codec `{name}` is not supported, use one of `zlib`, `lz4`, `zstd` or `auto`")
+
+
+CODEC_IDS = {1: "zlib", 2: "lz4", 3: "zstd"}
+
+
+def best_codec(level: int | None = None) -> Codec:
+    """
+    The fastest available codec, `zstd` and `lz4` are used if they are installed
+    """
+    for name in ("zstd", "lz4"):
+        try:
+            return load_codec(name, level)
+        except ImportError:
+            continue
+    return load_codec("zlib", level)
+
+
+class CompressionStats:
+    __slots__ = ("compressed", "skipped", "decompressed", "raw_bytes", "compressed_bytes")
+
+    def __init__(self) -> None:
+        self.compressed = 0
+        self.skipped = 0
+        self.decompressed = 0
+        # NOTE: Sizes of compressed messages only, before and after compression
+        self.raw_bytes = 0
+        self.compressed_bytes = 0
+
+    @property
+    def ratio(self) -> float:
+        return self.compressed_bytes / self.raw_bytes if self.raw_bytes else 1.0
+
+
+class MessageCompressor:
+    """
+    ## Message Compressor
+
+    Compresses inter-node messages above `threshold` bytes.
+    Compressed message is `MAGIC + codec id + compressed document`, every other message is sent as is,
+    so messages of nodes without compression are still readable.
+
+    Args:
+        codec (str | None, optional): `zlib`, `lz4`, `zstd` or `auto` (the fastest installed). Defaults to None (messages are only decompressed).
+        threshold (int, optional): Minimal size of message in bytes to be compressed. Defaults to 1024.
+        level (int | None, optional): Compression level of codec. Defaults to codec's default.
+    """
+
+    def __init__(self, codec: str | None = None, threshold: int = 1024,
+                 level: int | None = None) -> None:
+        self.threshold = threshold
+        self.level = level
+        self.codec: Codec | None = None
+        if codec is not None:
+            self.codec = best_codec(level) if codec == "auto" else load_codec(codec, level)
+
+        self.stats = CompressionStats()
+        self._decoders: dict[int, Codec] = {self.codec.id: self.codec} if self.codec else {}
+
+    def compress(self, message: str | bytes) -> str | bytes:
+        if self.codec is None or len(message) < self.threshold:
+            return message
+
+        data = message.encode() if isinstance(message, str) else message
+        compressed = self.codec.compress(data)
+        # NOTE: Incompressible documents (e.g. already compressed binary) are sent as is
+        if len(compressed) + len(MAGIC) + 1 >= len(data):
+            self.stats.skipped += 1
+            return message
+
+        self.stats.compressed += 1
+        self.stats.raw_bytes += len(data)
+        self.stats.compressed_bytes += len(compressed) + len(MAGIC) + 1
+        return MAGIC + bytes((self.codec.id,)) + compressed
+
+    def decompress(self, message: str | bytes) -> str | bytes:
+        if not isinstance(message, (bytes, bytearray)) or not message.startswith(MAGIC):
+            return message
+
+        codec_id = message[len(MAGIC)]
+        if (codec := self._decoders.get(codec_id)) is None:
+            if (name := CODEC_IDS.get(codec_id)) is None:
+                raise ValueError(f"Message is compressed by unknown codec `{codec_id}`")
+            codec = self._decoders[codec_id] = load_codec(name)
+
+        self.stats.decompressed += 1
+        return codec.decompress(bytes(message[len(MAGIC) + 1:]))
@@ -0,0 +1,96 @@
+from typing import Container, Iterable, Mapping
+
+_EMPTY: frozenset[str] = frozenset()
+
+
+class ExclusionIndex:
+    """
+    ## Exclusion Index
+
+    Index of events which clients excluded when they subscribed to rooms (`subscribe(..., exclude_events=[...])`).
+
+    Index is keyed by `(namespace, event_name)`, so finding clients which should be skipped during emit is a single lookup.
+    """
+
+    def __init__(self) -> None:
+        # (namespace, event_name) -> room_name -> session IDs which excluded the event in the room
+        self._rooms: dict[tuple[str, str], dict[str, set[str]]] = {}
+        # (namespace, sid) -> room_name -> excluded events, used to keep index consistent on unsubscribe and disconnect
+        self._subscriptions: dict[tuple[str, str], dict[str, tuple[str, ...]]] = {}
+
+    def __bool__(self) -> bool:
+        return bool(self._subscriptions)
+
+    def add(self, namespace: str, room_name: str, sid: str, events: Iterable[str]):
+        # NOTE: Subscribing again to the same room replaces excluded events of previous subscription
+        self.discard(namespace, room_name, sid)
+
+        if not (events := tuple(set(events))):
+            return
+
+        self._subscriptions.setdefault((namespace, sid), {})[room_name] = events
+        for event_name in events:
+            self._rooms.setdefault((namespace, event_name), {}).setdefault(room_name, set()).add(sid)
+
+    def discard(self, namespace: str, room_name: str, sid: str):
+        if not (subscriptions := self._subscriptions.get((namespace, sid))):
+            return
+        if (events := subscriptions.pop(room_name, None)) is None:
+            return
+        if not subscriptions:
+            del self._subscriptions[(namespace, sid)]
+
+        for event_name in events:
+            key = (namespace, event_name)
+            rooms = self._rooms[key]
+            rooms[room_name].discard(sid)
+            if not rooms[room_name]:
+                del rooms[room_name]
+            if not rooms:
+                del self._rooms[key]
+
+    def discard_sid(self, namespace: str, sid: str):
+        """
+        Removes every subscription of the client in namespace, called when client disconnects
+        """
+        for room_name in list(self._subscriptions.get((namespace, sid), ())):
+            self.discard(namespace, room_name, sid)
+
+    def excluded(self, namespace: str, event_name: str,
+                 room_name: str | list[str] | None = None,
+                 members: Mapping[str, Container[str]] | None = None) -> set[str] | frozenset[str]:
+        """
+        Returns session IDs which excluded the event in the room.
+
+        If list of rooms is given, client is excluded only if it excluded the event in every listed room it's member of,
+        `members` is the room table of namespace (`room -> session IDs`), which is needed to find clients which receive the event through another listed room.
+
+        NOTE: Events are excluded per room, so emit to whole namespace (`room_name` is `None`) is never filtered
+        """
+        if room_name is None or (rooms := self._rooms.get((namespace, event_name))) is None:
+            return _EMPTY
+        if not isinstance(room_name, list):
+            return rooms.get(room_name, _EMPTY)
+
+        excluded = set().union(*(rooms.get(room, _EMPTY) for room in room_name))
+        if excluded and members is not None:
+            for room in room_name:
+                if (room_members := members.get(room)) is not None:
+                    room_excluded = rooms.get(room, _EMPTY)
+                    excluded = {sid for sid in excluded if sid in room_excluded or sid not in room_members}
+        return excluded
+
+    def skip(self, namespace: str, event_name: str, room_name: str | list[str] | None,
+             skip_sid: str | list[str] | None,
+             members: Mapping[str, Container[str]] | None = None) -> str | list[str] | None:
+        """
+        Joins clients which excluded the event to `skip_sid` argument of socket.io emit
+        """
+        if not self._subscriptions or not (excluded := self.excluded(namespace, event_name, room_name, members)):
+            return skip_sid
+
+        if isinstance(skip_sid, list):
+            return list(excluded | set(skip_sid))
+        if skip_sid is not None:
+            return list(excluded | {skip_sid})
+        return list(excluded)
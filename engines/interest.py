@@ -0,0 +1,58 @@
+class RoomInterest:
+    """
+    ## Room Interest
+
+    Index of nodes which host members of each room, used to publish emits into a room only to nodes which have it's members.
+
+    Nodes announce their own rooms when the first local member enters the room and when the last one leaves it.
+    Every announcement carries sequence number of announcing node, so announcements delivered out of order don't override newer ones.
+    """
+
+    def __init__(self, host_id: str) -> None:
+        self.host_id = host_id
+        # NOTE: Index is incomplete until states of other nodes are received, rooms are treated as remote until then
+        self.ready = False
+
+        self._hosts: dict[tuple[str, str], set[str]] = {}
+        self._sequences: dict[tuple[str, str, str], int] = {}
+        self._sequence = 0
+
+    def next_sequence(self) -> int:
+        self._sequence += 1
+        return self._sequence
+
+    def update(self, host_id: str, namespace: str, room: str, active: bool, sequence: int = 0) -> bool:
+        """
+        Applies announcement of the node, returns `False` if it's older than the last applied one
+        """
+        key = (host_id, namespace, room)
+        if sequence and self._sequences.get(key, 0) >= sequence:
+            return False
+        if sequence:
+            self._sequences[key] = sequence
+
+        if active:
+            self._hosts.setdefault((namespace, room), set()).add(host_id)
+            return True
+
+        if (hosts := self._hosts.get((namespace, room))) is not None:
+            hosts.discard(host_id)
+            if not hosts:
+                del self._hosts[(namespace, room)]
+        return True
+
+    def replace(self, host_id: str, rooms: list[tuple[str, str]], sequence: int):
+        """
+        Applies full state of the node, rooms of the node which are not in the state are dropped
+        """
+        rooms = {tuple(room) for room in rooms}
+        for namespace, room in set(self.rooms_of(host_id)) - rooms:
+            self.update(host_id, namespace, room, False, sequence)
+        for namespace, room in rooms:
+            self.update(host_id, namespace, room, True, sequence)
+
+    def hosts(self, namespace: str, room: str) -> set[str]:
+        return self._hosts.get((namespace, room), set())
+
+    def rooms_of(self, host_id: str) -> list[tuple[str, str]]:
+        return [room for room, hosts in self._hosts.items() if host_id in hosts]
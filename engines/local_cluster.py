@@ -0,0 +1,289 @@
+import asyncio
+import fcntl
+import os
+import struct
+from logging import Logger, getLogger
+from typing import Callable, Iterable
+
+
+# NOTE: Frame is `length of body, length of targets, targets, body`, targets are comma separated host IDs (empty for every worker)
+HEADER = struct.Struct("!IH")
+
+
+def pack_frame(body: bytes, targets: Iterable[str] | None = None) -> bytes:
+    targets = ",".join(targets).encode() if targets else b""
+    return HEADER.pack(len(body), len(targets)) + targets + body
+
+
+async def read_frame(reader: asyncio.StreamReader) -> tuple[bytes, list[str], bytes]:
+    """
+    Reads single frame, returns the whole frame (so it can be forwarded as is), it's targets and body
+    """
+    header = await reader.readexactly(HEADER.size)
+    body_size, targets_size = HEADER.unpack(header)
+    rest = await reader.readexactly(targets_size + body_size)
+    targets = rest[:targets_size].decode().split(",") if targets_size else []
+    return header + rest, targets, rest[targets_size:]
+
+
+class ClusterMembership:
+    """
+    ## Cluster Membership
+
+    Replica of room membership of every worker of the host.
+    Workers send every change of their rooms to each other, the room of `None` holds connected clients of namespace (as in socket.io client manager).
+    """
+
+    def __init__(self, host_id: str) -> None:
+        self.host_id = host_id
+        # NOTE: Replica is incomplete until states of other workers are received, routing falls back to every worker until then
+        self.ready = False
+
+        # (namespace, room) -> session ID -> host ID
+        self._rooms: dict[tuple[str, str | None], dict[str, str]] = {}
+        # host ID -> (namespace, room, session ID) of every membership of the host
+        self._hosts: dict[str, set[tuple[str, str | None, str]]] = {}
+
+    def update(self, host_id: str, namespace: str, room: str | None, sid: str, active: bool) -> bool:
+        """
+        Applies change of membership, returns `False` if nothing was changed
+        """
+        entry = (namespace, room, sid)
+        entries = self._hosts.setdefault(host_id, set())
+        if active == (entry in entries):
+            return False
+
+        if active:
+            entries.add(entry)
+            self._rooms.setdefault((namespace, room), {})[sid] = host_id
+            return True
+
+        entries.discard(entry)
+        members = self._rooms.get((namespace, room), {})
+        members.pop(sid, None)
+        if not members:
+            self._rooms.pop((namespace, room), None)
+        return True
+
+    def replace(self, host_id: str, entries: Iterable[Iterable[str | None]]):
+        """
+        Applies full state of the worker, memberships of the worker which are not in the state are dropped
+        """
+        entries = {tuple(entry) for entry in entries}
+        for namespace, room, sid in self._hosts.get(host_id, set()) - entries:
+            self.update(host_id, namespace, room, sid, False)
+        for namespace, room, sid in entries:
+            self.update(host_id, namespace, room, sid, True)
+
+    def drop(self, host_id: str):
+        self.replace(host_id, [])
+        self._hosts.pop(host_id, None)
+
+    def reset(self):
+        """
+        Drops memberships of every other worker, they are collected again by the next sync
+        """
+        for host_id in [host_id for host_id in self._hosts if host_id != self.host_id]:
+            self.drop(host_id)
+
+    def entries_of(self, host_id: str) -> list[tuple[str, str | None, str]]:
+        return list(self._hosts.get(host_id, set()))
+
+    def members(self, room: str | None, namespace: str = "/") -> dict[str, str]:
+        """
+        Session IDs of every member of the room and IDs of their workers
+        """
+        return self._rooms.get((namespace, room), {})
+
+    def rooms(self, namespace: str = "/") -> set[str]:
+        return {room for ns, room in self._rooms if ns == namespace and room is not None}
+
+    def host_of(self, sid: str, namespace: str = "/") -> str | None:
+        return self._rooms.get((namespace, None), {}).get(sid)
+
+    def is_online(self, sid: str, namespace: str = "/") -> bool:
+        return self.host_of(sid, namespace) is not None
+
+    def online_count(self, namespace: str = "/") -> int:
+        return len(self.members(None, namespace))
+
+    def hosts(self, room: str | None, namespace: str = "/") -> set[str]:
+        return set(self.members(room, namespace).values())
+
+
+class LocalBus:
+    """
+    ## Local Bus
+
+    Message bus of worker processes of the same host over Unix domain socket.
+
+    The first worker which takes exclusive lock of `<path>.lock` becomes the hub: it listens on `path` and relays frames
+    between workers, every other worker connects to it. Lock is released by the OS when the hub exits,
+    so workers which lost connection elect a new hub among themselves.
+
+    Frames can be addressed to specific workers, hub forwards them only to those.
+    """
+
+    def __init__(self, path: str, host_id: str,
+                 on_connect: Callable[[], None] | None = None,
+                 max_pending: int = 10_000,
+                 retry_interval: float = 0.05,
+                 logger: Logger = getLogger("ascender-plugins")) -> None:
+        self.path = path
+        self.host_id = host_id
+        self.on_connect = on_connect
+        self.max_pending = max_pending
+        self.retry_interval = retry_interval
+        self.logger = logger
+
+        self.inbox: asyncio.Queue[bytes] = asyncio.Queue()
+        self.is_hub = False
+
+        self._lock: int | None = None
+        self._writer: asyncio.StreamWriter | None = None
+        self._peers: dict[str, asyncio.StreamWriter] = {}
+        # NOTE: Frames sent while worker isn't connected to the hub, they are sent once connection is established
+        self._pending: list[bytes] = []
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+        if self._lock is not None:
+            os.close(self._lock)
+            self._lock = None
+
+    def send(self, body: bytes, targets: Iterable[str] | None = None):
+        """
+        Sends frame without waiting, frames of the same worker are delivered in the same order they were sent
+        """
+        targets = list(targets) if targets else []
+        frame = pack_frame(body, targets)
+        if self.is_hub:
+            self._relay(frame, targets, self.host_id)
+        elif self._writer is not None:
+            self._writer.write(frame)
+        else:
+            self._pending.append(frame)
+            if len(self._pending) > self.max_pending:
+                self._pending.pop(0)
+
+    async def publish(self, body: bytes, targets: Iterable[str] | None = None):
+        """
+        Sends frame and waits until it's written to the socket
+        """
+        self.send(body, targets)
+        writers = list(self._peers.values()) if self.is_hub else [self._writer] if self._writer is not None else []
+        for writer in writers:
+            try:
+                await writer.drain()
+            except ConnectionError:
+                continue
+
+    async def _run(self):
+        while True:
+            try:
+                if self._elect():
+                    await self._serve()
+                else:
+                    await self._connect()
+            except asyncio.CancelledError:
+                raise
+            except (OSError, asyncio.IncompleteReadError) as e:
+                self.logger.debug(f"Local cluster bus `{self.path}` is unavailable: {e}")
+            await asyncio.sleep(self.retry_interval)
+
+    def _elect(self) -> bool:
+        if self._lock is not None:
+            return True
+
+        lock = os.open(f"{self.path}.lock", os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(lock, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(lock)
+            return False
+
+        self._lock = lock
+        return True
+
+    # Hub
+
+    async def _serve(self):
+        # NOTE: Socket file of previous hub is left on disk if it was killed
+        if os.path.exists(self.path):
+            os.unlink(self.path)
+        server = await asyncio.start_unix_server(self._handle_peer, self.path)
+
+        self.is_hub = True
+        self._pending.clear()
+        self.logger.info(f"Local cluster hub is listening on `{self.path}`")
+        if self.on_connect is not None:
+            self.on_connect()
+
+        async with server:
+            await server.serve_forever()
+
+    def _relay(self, frame: bytes, targets: list[str], sender: str):
+        _, targets_size = HEADER.unpack_from(frame)
+        body = frame[HEADER.size + targets_size:]
+        if not targets:
+            if sender != self.host_id:
+                self.inbox.put_nowait(body)
+            for host_id, writer in self._peers.items():
+                if host_id != sender:
+                    writer.write(frame)
+            return
+
+        for host_id in targets:
+            if host_id == self.host_id:
+                self.inbox.put_nowait(body)
+            elif host_id != sender and (writer := self._peers.get(host_id)) is not None:
+                writer.write(frame)
+
+    async def _handle_peer(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        host_id = None
+        try:
+            # NOTE: The first frame of every worker is it's host ID
+            _, _, body = await read_frame(reader)
+            host_id = body.decode()
+            self._peers[host_id] = writer
+
+            while True:
+                frame, targets, _ = await read_frame(reader)
+                self._relay(frame, targets, host_id)
+        except (OSError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            if host_id is not None and self._peers.get(host_id) is writer:
+                del self._peers[host_id]
+                # NOTE: Every worker (including the hub) drops state of the worker which is gone
+                message = b'{"method":"host_down","host_id":"%s"}' % host_id.encode()
+                self.send(message)
+                self.inbox.put_nowait(message)
+            writer.close()
+
+    # Worker
+
+    async def _connect(self):
+        reader, writer = await asyncio.open_unix_connection(self.path)
+        writer.write(pack_frame(self.host_id.encode()))
+
+        pending, self._pending = self._pending, []
+        for frame in pending:
+            writer.write(frame)
+        self._writer = writer
+        if self.on_connect is not None:
+            self.on_connect()
+
+        try:
+            while True:
+                _, _, body = await read_frame(reader)
+                self.inbox.put_nowait(body)
+        finally:
+            self._writer = None
+            writer.close()
@@ -0,0 +1,483 @@
+import asyncio
+import os
+import tempfile
+from itertools import groupby
+from operator import itemgetter
+from time import perf_counter
+from typing import Any, Callable
+
+import socketio
+from socketio.async_pubsub_manager import AsyncPubSubManager
+
+from plugins.liveapi.engines.compression import MessageCompressor
+from plugins.liveapi.engines.exclusions import ExclusionIndex
+from plugins.liveapi.engines.interest import RoomInterest
+from plugins.liveapi.engines.local_cluster import ClusterMembership, LocalBus
+from plugins.liveapi.engines.registry import ClusterRegistry
+from plugins.liveapi.engines.packet import payload_size
+from plugins.liveapi.metrics import MetricsRegistry
+
+
+class LiveAPIManagerMixin:
+    """
+    Applies excluded events of room subscriptions during local delivery of every emit of client manager
+    and notifies LiveAPI about disconnected clients.
+    """
+    exclusions: ExclusionIndex
+    disconnect_callbacks: list[Callable[[str, str], None]]
+    metrics: MetricsRegistry | None
+
+    def _init_liveapi(self):
+        self.exclusions = ExclusionIndex()
+        self.disconnect_callbacks = []
+        self.metrics = None
+
+    async def _measured_emit(self, emit, event, data, namespace, **kwargs):
+        if self.metrics is None:
+            return await emit(event, data, namespace, **kwargs)
+
+        started = perf_counter()
+        try:
+            return await emit(event, data, namespace, **kwargs)
+        finally:
+            self.metrics.emitted(namespace or "/", event, payload_size(data), perf_counter() - started)
+
+    async def disconnect(self, sid, namespace, **kwargs):
+        namespace = namespace or "/"
+        self.exclusions.discard_sid(namespace, sid)
+        for callback in self.disconnect_callbacks:
+            callback(sid, namespace)
+        return await super().disconnect(sid, namespace, **kwargs)
+
+
+class LiveAPIManager(LiveAPIManagerMixin, socketio.AsyncManager):
+    def __init__(self) -> None:
+        super().__init__()
+        self._init_liveapi()
+
+    async def emit(self, event, data, namespace, room=None, skip_sid=None,
+                   callback=None, **kwargs):
+        skip_sid = self.exclusions.skip(namespace or "/", event, kwargs.get("to") or room, skip_sid,
+                                        self.rooms.get(namespace or "/", {}))
+        return await self._measured_emit(super().emit, event, data, namespace, room=room, skip_sid=skip_sid,
+                                         callback=callback, **kwargs)
+
+
+class LiveAPIRedisManager(LiveAPIManagerMixin, socketio.AsyncRedisManager):
+    """
+    Redis client manager of LiveAPI.
+
+    Outbound messages can be coalesced: messages published within `publish_window` seconds (or until `publish_batch_size` messages
+    are collected) are sent to Redis as a single `batch` message, which is unpacked by receiving nodes in one go.
+
+    Emits addressed only to clients of this node are delivered locally and never published.
+    With `room_interest` enabled, nodes also track which nodes host members of every room, and emits into a room are published
+    only to channels of those nodes (`<channel>:<host_id>`).
+
+    Args:
+        publish_window (float | None, optional): Latency budget of outbound messages in seconds. Defaults to None (every message is published immediately).
+        publish_batch_size (int, optional): Maximal amount of messages in a single batch, full batch is published without waiting for the window. Defaults to 100.
+        compressor (MessageCompressor | None, optional): Compression of messages above size threshold. Compressed messages of other nodes
+            are decompressed even if compression of this node is disabled. Defaults to None (no compression).
+        local_delivery (bool, optional): Skips publishing of emits addressed only to clients of this node. Defaults to True.
+        room_interest (bool, optional): Publishes emits into rooms only to nodes which host members of the room.
+            Every node of the cluster has to enable it. Defaults to False.
+        interest_sync_timeout (float, optional): Time in seconds given to other nodes to send their rooms after this node starts listening. Defaults to 1.
+        registry (ClusterRegistry | None, optional): Cluster-wide index of rooms and online clients, rooms and clients of this node are stored in it. Defaults to None.
+    """
+
+    def __init__(self, *args, publish_window: float | None = None,
+                 publish_batch_size: int = 100,
+                 compressor: MessageCompressor | None = None,
+                 local_delivery: bool = True,
+                 room_interest: bool = False,
+                 interest_sync_timeout: float = 1.0,
+                 registry: ClusterRegistry | None = None, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        self._init_liveapi()
+        self.compressor = compressor or MessageCompressor()
+
+        self.publish_window = publish_window
+        self.publish_batch_size = max(publish_batch_size, 1)
+        # NOTE: Single outbox of (channel, message) pairs, so order of messages is kept across channels
+        self._outbox: list[tuple[str, dict[str, Any]]] = []
+        self._flusher: asyncio.Future | None = None
+        # NOTE: Batches are published one by one, so messages reach Redis in the same order they were produced
+        self._publishing = asyncio.Lock()
+
+        self.local_delivery = local_delivery
+        self.room_interest = room_interest
+        self.interest_sync_timeout = interest_sync_timeout
+        self.interest = RoomInterest(self.host_id)
+        self.node_channel = f"{self.channel}:{self.host_id}"
+        self.registry = registry
+
+    async def emit(self, event, data, namespace=None, room=None, skip_sid=None,
+                   callback=None, **kwargs):
+        # NOTE: Only emits originated on this node are measured, emits received from Redis are measured by their nodes
+        return await self._measured_emit(super().emit, event, data, namespace, room=room, skip_sid=skip_sid,
+                                         callback=callback, **kwargs)
+
+    async def _handle_emit(self, message):
+        # NOTE: Each node knows exclusions of it's own clients only, so they are applied when node receives emit from Redis
+        if self.exclusions:
+            namespace = message.get("namespace") or "/"
+            message["skip_sid"] = self.exclusions.skip(namespace, message["event"], message.get("room"),
+                                                       message.get("skip_sid"), self.rooms.get(namespace, {}))
+        return await super()._handle_emit(message)
+
+    def basic_enter_room(self, sid, namespace, room, eio_sid=None):
+        created = room is not None and room != sid and room not in self.rooms.get(namespace, {})
+        super().basic_enter_room(sid, namespace, room, eio_sid=eio_sid)
+        if created and self.room_interest:
+            self._announce(namespace, room, True)
+
+        # NOTE: Room of `None` holds every connected client of namespace, private rooms of clients aren't stored
+        if self.registry is not None and room != sid:
+            if room is None:
+                self.registry.connect(sid, namespace)
+            else:
+                self.registry.join(sid, room, namespace)
+
+    def basic_leave_room(self, sid, namespace, room):
+        existed = room is not None and room != sid and room in self.rooms.get(namespace, {})
+        super().basic_leave_room(sid, namespace, room)
+        if existed and self.room_interest and room not in self.rooms.get(namespace, {}):
+            self._announce(namespace, room, False)
+
+        if self.registry is not None and room != sid:
+            if room is None:
+                self.registry.disconnect(sid, namespace)
+            else:
+                self.registry.leave(sid, room, namespace)
+
+    def _announce(self, namespace: str, room: str, active: bool):
+        """
+        Announces that this node has the first member of the room or lost the last one
+        """
+        sequence = self.interest.next_sequence()
+        self.interest.update(self.host_id, namespace, room, active, sequence)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return
+        loop.create_task(self._publish({"method": "interest", "namespace": namespace, "room": room,
+                                        "active": active, "sequence": sequence, "host_id": self.host_id}))
+
+    def _route(self, message: dict[str, Any]) -> list[str]:
+        """
+        Channels the message should be published to, empty if every recipient of the message is a client of this node
+        """
+        if not self.local_delivery or message.get("method") != "emit" or message.get("room") is None:
+            return [self.channel]
+
+        namespace = message.get("namespace") or "/"
+        rooms = message["room"] if isinstance(message["room"], list) else [message["room"]]
+
+        hosts: set[str] = set()
+        for room in rooms:
+            # NOTE: Session ID of local client, nobody else has members in this room
+            if self.is_connected(room, namespace):
+                continue
+
+            # NOTE: Room which isn't known to be hosted by any node may be a client of other node, it's published to everyone
+            if not self.room_interest or not self.interest.ready or not (room_hosts := self.interest.hosts(namespace, room)):
+                return [self.channel]
+            hosts |= room_hosts
+
+        hosts.discard(self.host_id)
+        return [f"{self.channel}:{host_id}" for host_id in sorted(hosts)]
+
+    async def _publish(self, data):
+        for channel in self._route(data):
+            await self._enqueue(channel, data)
+
+    async def _enqueue(self, channel: str, data):
+        if not self.publish_window:
+            return await self._send(data, channel)
+
+        self._outbox.append((channel, data))
+        if len(self._outbox) >= self.publish_batch_size:
+            return await self.flush()
+
+        if self._flusher is None or self._flusher.done():
+            self._flusher = asyncio.ensure_future(self._flush_later(self.publish_window))
+
+    async def _flush_later(self, delay: float):
+        await asyncio.sleep(delay)
+        await self.flush()
+
+    async def flush(self):
+        """
+        Publishes every coalesced message right away.
+        Consecutive messages of the same channel are published as single batch, so node subscribed to several channels
+        (shared one and it's own) receives messages in the same order they were produced
+        """
+        async with self._publishing:
+            outbox, self._outbox = self._outbox, []
+            for channel, messages in groupby(outbox, key=itemgetter(0)):
+                messages = [message for _, message in messages]
+                if len(messages) == 1:
+                    await self._send(messages[0], channel)
+                else:
+                    await self._send({"method": "batch", "messages": messages,
+                                      "host_id": self.host_id}, channel)
+
+    async def _send(self, data, channel: str | None = None):
+        channel = channel or self.channel
+        if self.compressor.codec is None and channel == self.channel:
+            return await super()._publish(data)
+
+        message = self.compressor.compress(self.json.dumps(data))
+        # NOTE: The same retries as `AsyncRedisManager._publish` does, but message is already encoded
+        for retries_left in (1, 0):
+            try:
+                if not self.connected:
+                    self._redis_connect()
+                return await self.redis.publish(channel, message)
+            except Exception as exc:
+                self._get_logger().error(f"Cannot publish to redis... {'retrying' if retries_left else 'giving up'}",
+                                         extra={"redis_exception": str(exc)})
+                self.connected = False
+
+    async def _subscribe(self):
+        """
+        Yields raw messages of cluster channel and of channel of this node, resubscribes if connection to Redis is lost
+        """
+        channels = [self.channel, self.node_channel] if self.room_interest else [self.channel]
+        accepted = {channel.encode() for channel in channels}
+        retry_sleep = 1
+        subscribed = False
+        while True:
+            try:
+                if not subscribed:
+                    self._redis_connect()
+                    await self.pubsub.subscribe(*channels)
+                    subscribed = True
+                    retry_sleep = 1
+                    if self.room_interest:
+                        await self._sync_interest()
+
+                async for message in self.pubsub.listen():
+                    if message["channel"] in accepted and message["type"] == "message" and "data" in message:
+                        yield message["data"]
+            except Exception as exc:
+                self._get_logger().error(f"Cannot receive from redis... retrying in {retry_sleep} secs",
+                                         extra={"redis_exception": str(exc)})
+                subscribed = False
+                await asyncio.sleep(retry_sleep)
+                retry_sleep = min(retry_sleep * 2, 60)
+
+    async def _sync_interest(self):
+        """
+        Requests rooms of every other node, index is considered complete after `interest_sync_timeout`
+        """
+        self.interest.ready = False
+        await self._send({"method": "interest_sync", "host_id": self.host_id})
+        asyncio.get_running_loop().call_later(self.interest_sync_timeout, setattr, self.interest, "ready", True)
+
+    async def _handle_interest(self, message: dict[str, Any]):
+        host_id = message.get("host_id")
+        if host_id == self.host_id:
+            return
+
+        match message["method"]:
+            case "interest":
+                self.interest.update(host_id, message["namespace"], message["room"],
+                                     message["active"], message.get("sequence", 0))
+
+            case "interest_sync":
+                await self._send({"method": "interest_state", "host_id": self.host_id,
+                                  "rooms": self.interest.rooms_of(self.host_id),
+                                  "sequence": self.interest.next_sequence()},
+                                 f"{self.channel}:{host_id}")
+
+            case "interest_state":
+                self.interest.replace(host_id, message["rooms"], message["sequence"])
+
+    async def _listen(self):
+        # NOTE: Messages are decoded here, so batches can be unpacked before they reach listening thread of client manager
+        async for message in self._subscribe():
+            if not isinstance(message, dict):
+                try:
+                    message = self.json.loads(self.compressor.decompress(message))
+                except Exception:
+                    continue
+
+            if not isinstance(message, dict):
+                continue
+
+            if message.get("method") == "batch":
+                # NOTE: Messages of this node were already handled locally when they were published
+                if message.get("host_id") == self.host_id:
+                    continue
+                messages = message.get("messages", [])
+            else:
+                messages = [message]
+
+            for item in messages:
+                if item.get("method") == "registry":
+                    if self.registry is not None and item.get("host_id") != self.host_id:
+                        self.registry.invalidate(item.get("keys", []))
+                    continue
+
+                if not str(item.get("method")).startswith("interest"):
+                    yield item
+                    continue
+
+                try:
+                    await self._handle_interest(item)
+                except Exception:
+                    self._get_logger().exception("Cannot handle room interest message")
+
+
+class LiveAPILocalClusterManager(LiveAPIManagerMixin, AsyncPubSubManager):
+    """
+    Client manager of worker processes of the same host, workers exchange messages over Unix domain socket (`LocalBus`) instead of Redis.
+
+    Every worker keeps replica of room membership of the whole host (`ClusterMembership`), so emits into rooms and to clients
+    are sent only to workers which host their recipients, and emits to clients of this worker are never sent at all.
+
+    Args:
+        channel (str, optional): Name of the cluster, workers of the same cluster share socket. Defaults to "liveapi".
+        socket_path (str | None, optional): Path of Unix domain socket. Defaults to `<temporary directory>/<channel>.sock`.
+        local_delivery (bool, optional): Sends emits only to workers which host their recipients. Defaults to True.
+        membership_sync_timeout (float, optional): Time in seconds given to other workers to send their memberships after this worker connects. Defaults to 0.5.
+    """
+    name = "liveapi-local-cluster"
+
+    def __init__(self, channel: str = "liveapi", socket_path: str | None = None,
+                 write_only: bool = False, logger=None, json=None,
+                 local_delivery: bool = True,
+                 membership_sync_timeout: float = 0.5) -> None:
+        super().__init__(channel=channel, write_only=write_only, logger=logger, json=json)
+        self._init_liveapi()
+
+        self.local_delivery = local_delivery
+        self.membership_sync_timeout = membership_sync_timeout
+        self.membership = ClusterMembership(self.host_id)
+        self.socket_path = socket_path or os.path.join(tempfile.gettempdir(), f"{channel}.sock")
+        self.bus = LocalBus(self.socket_path, self.host_id, on_connect=self._sync_membership)
+        self._ready_timer: asyncio.TimerHandle | None = None
+
+    async def emit(self, event, data, namespace=None, room=None, skip_sid=None,
+                   callback=None, **kwargs):
+        return await self._measured_emit(super().emit, event, data, namespace, room=room, skip_sid=skip_sid,
+                                         callback=callback, **kwargs)
+
+    async def _handle_emit(self, message):
+        # NOTE: Each worker knows exclusions of it's own clients only, so they are applied when worker receives emit
+        if self.exclusions:
+            namespace = message.get("namespace") or "/"
+            message["skip_sid"] = self.exclusions.skip(namespace, message["event"], message.get("room"),
+                                                       message.get("skip_sid"), self.rooms.get(namespace, {}))
+        return await super()._handle_emit(message)
+
+    def basic_enter_room(self, sid, namespace, room, eio_sid=None):
+        super().basic_enter_room(sid, namespace, room, eio_sid=eio_sid)
+        self._share(sid, namespace, room, True)
+
+    def basic_leave_room(self, sid, namespace, room):
+        super().basic_leave_room(sid, namespace, room)
+        self._share(sid, namespace, room, False)
+
+    def _share(self, sid: str, namespace: str, room: str | None, active: bool):
+        # NOTE: Private rooms of clients aren't shared, worker of the client is known from the room of `None`
+        if room == sid or not self.membership.update(self.host_id, namespace, room, sid, active):
+            return
+        self.bus.send(self._encode({"method": "membership", "namespace": namespace, "room": room,
+                                    "sid": sid, "active": active, "host_id": self.host_id}))
+
+    def _encode(self, data: dict[str, Any]) -> bytes:
+        message = self.json.dumps(data)
+        return message.encode() if isinstance(message, str) else message
+
+    def _route(self, message: dict[str, Any]) -> list[str] | None:
+        """
+        Workers the message should be sent to, `None` for every worker and empty if message shouldn't be sent at all
+        """
+        method = message.get("method")
+        # NOTE: Response to emit with callback is needed only by the worker which emitted it
+        if method == "callback":
+            return [message["host_id"]]
+        if not self.local_delivery or not self.membership.ready:
+            return None
+
+        namespace = message.get("namespace") or "/"
+        if method in ("disconnect", "enter_room", "leave_room"):
+            if (host_id := self.membership.host_of(message["sid"], namespace)) is None:
+                return None
+            return [] if host_id == self.host_id else [host_id]
+
+        if method != "emit" or message.get("room") is None:
+            return None
+
+        rooms = message["room"] if isinstance(message["room"], list) else [message["room"]]
+        hosts: set[str] = set()
+        for room in rooms:
+            if self.is_connected(room, namespace):
+                continue
+            if (host_id := self.membership.host_of(room, namespace)) is not None:
+                hosts.add(host_id)
+            hosts |= self.membership.hosts(room, namespace)
+
+        hosts.discard(self.host_id)
+        return sorted(hosts)
+
+    async def _publish(self, data):
+        if (targets := self._route(data)) is not None and not targets:
+            return
+        self.bus.start()
+        await self.bus.publish(self._encode(data), targets)
+
+    def _sync_membership(self):
+        """
+        Sends memberships of this worker to every other worker and requests theirs, called every time worker connects to the hub
+        """
+        self.membership.ready = False
+        # NOTE: Workers which were gone while this worker was disconnected don't send their state, so the replica is collected from scratch
+        self.membership.reset()
+        self.bus.send(self._encode({"method": "membership_sync", "host_id": self.host_id,
+                                    "entries": self.membership.entries_of(self.host_id)}))
+
+        if self._ready_timer is not None:
+            self._ready_timer.cancel()
+        self._ready_timer = asyncio.get_running_loop().call_later(self.membership_sync_timeout,
+                                                                  setattr, self.membership, "ready", True)
+
+    def _handle_membership(self, message: dict[str, Any]):
+        host_id = message.get("host_id")
+        if host_id == self.host_id:
+            return
+
+        match message["method"]:
+            case "membership":
+                self.membership.update(host_id, message["namespace"], message["room"],
+                                       message["sid"], message["active"])
+
+            case "membership_sync":
+                self.membership.replace(host_id, message["entries"])
+                self.bus.send(self._encode({"method": "membership_state", "host_id": self.host_id,
+                                            "entries": self.membership.entries_of(self.host_id)}), [host_id])
+
+            case "membership_state":
+                self.membership.replace(host_id, message["entries"])
+
+            case "host_down":
+                self.membership.drop(host_id)
+
+    async def _listen(self):
+        self.bus.start()
+        while True:
+            try:
+                message = self.json.loads(await self.bus.inbox.get())
+            except Exception:
+                continue
+
+            if not isinstance(message, dict):
+                continue
+
+            if message.get("method") in ("membership", "membership_sync", "membership_state", "host_down"):
+                self._handle_membership(message)
+                continue
+            yield message
@@ -0,0 +1,58 @@
+from typing import Any, Callable
+
+from plugins.liveapi.serializers.base import RawJSON
+
+
+def payload_size(data: Any) -> int:
+    """
+    Size of encoded payload, known only for payloads encoded by JSON serializers
+    """
+    return len(data) if isinstance(data, RawJSON) else 0
+
+
+class EncodedPacket:
+    """
+    ## Encoded Packet
+
+    Payload encoded once by `BaseEngine.encode` and reusable for any amount of recipients.
+    socket.io packets built from it are cached per event name and namespace,
+    so fan-out of the same payload to many clients sends the same encoded frames to every transport.
+    """
+    __slots__ = ("payload", "_packets")
+
+    def __init__(self, payload: Any) -> None:
+        self.payload = payload
+        self._packets: dict[tuple[str, ...], Any] = {}
+
+    def cached(self, key: tuple[str, ...], build: Callable[[], Any]) -> Any:
+        """
+        Returns frame of the payload built by `build`, frame is built only on first call with the same key.
+        """
+        if (frame := self._packets.get(key)) is None:
+            frame = self._packets[key] = build()
+        return frame
+
+    def eio_packets(self, server: Any, event_name: str, namespace: str) -> list[Any]:
+        """
+        Returns Engine.IO packets of the event for the server, packets are encoded only on first call.
+        """
+        key = (event_name, namespace)
+        if (packets := self._packets.get(key)) is None:
+            # NOTE: Imported here, so engines which don't use socket.io don't import it
+            from engineio import packet as eio_packet
+            from socketio import packet as sio_packet
+
+            # NOTE: Arguments of event are built the same way as `AsyncServer.emit` does, tuple is many arguments and `None` is none
+            if self.payload is None:
+                data = [event_name]
+            elif isinstance(self.payload, tuple):
+                data = [event_name, *self.payload]
+            else:
+                data = [event_name, self.payload]
+            encoded = server.packet_class(sio_packet.EVENT, namespace=namespace, data=data).encode()
+            if not isinstance(encoded, list):
+                encoded = [encoded]
+
+            packets = self._packets[key] = [eio_packet.Packet(eio_packet.MESSAGE, p) for p in encoded]
+
+        return packets
@@ -0,0 +1,275 @@
+import asyncio
+from logging import Logger, getLogger
+from typing import Any, Awaitable, Callable
+
+
+class MemoryRedis:
+    """
+    In-memory stand-in of `redis.asyncio.Redis`, implements only commands used by `ClusterRegistry`.
+    Registries sharing the same instance behave as nodes of the same cluster, so it can be used in tests and local development.
+    """
+
+    def __init__(self) -> None:
+        self.sets: dict[str, set[str]] = {}
+        self.hashes: dict[str, dict[str, str]] = {}
+
+    async def sadd(self, key: str, *members: str) -> int:
+        values = self.sets.setdefault(key, set())
+        added = len(set(members) - values)
+        values.update(members)
+        return added
+
+    async def srem(self, key: str, *members: str) -> int:
+        values = self.sets.get(key, set())
+        removed = len(values & set(members))
+        values.difference_update(members)
+        if not values:
+            self.sets.pop(key, None)
+        return removed
+
+    async def smembers(self, key: str) -> set[str]:
+        return set(self.sets.get(key, set()))
+
+    async def scard(self, key: str) -> int:
+        return len(self.sets.get(key, set()))
+
+    async def sismember(self, key: str, member: str) -> bool:
+        return member in self.sets.get(key, set())
+
+    async def hset(self, key: str, field: str, value: str) -> int:
+        values = self.hashes.setdefault(key, {})
+        added = field not in values
+        values[field] = value
+        return int(added)
+
+    async def hdel(self, key: str, *fields: str) -> int:
+        values = self.hashes.get(key, {})
+        removed = sum(values.pop(field, None) is not None for field in fields)
+        if not values:
+            self.hashes.pop(key, None)
+        return removed
+
+    async def hexists(self, key: str, field: str) -> bool:
+        return field in self.hashes.get(key, {})
+
+    async def hlen(self, key: str) -> int:
+        return len(self.hashes.get(key, {}))
+
+    async def hgetall(self, key: str) -> dict[str, str]:
+        return dict(self.hashes.get(key, {}))
+
+    def pipeline(self, transaction: bool = False) -> "MemoryPipeline":
+        return MemoryPipeline(self)
+
+
+class MemoryPipeline:
+    def __init__(self, redis: MemoryRedis) -> None:
+        self.redis = redis
+        self.commands: list[Awaitable[Any]] = []
+
+    def __getattr__(self, name: str):
+        command = getattr(self.redis, name)
+
+        def queue(*args):
+            self.commands.append(command(*args))
+            return self
+        return queue
+
+    async def execute(self) -> list[Any]:
+        commands, self.commands = self.commands, []
+        return [await command for command in commands]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        for command in self.commands:
+            command.close()
+        self.commands = []
+
+
+def _decode(value: str | bytes) -> str:
+    return value.decode() if isinstance(value, bytes) else value
+
+
+class ClusterRegistry:
+    """
+    ## Cluster Registry
+
+    Cluster-wide index of rooms and online clients stored in Redis:
+
+    - `<prefix>:members:<namespace>:<room>`, set of session IDs of room members
+    - `<prefix>:rooms:<namespace>`, set of rooms with at least one member
+    - `<prefix>:online:<namespace>`, hash of session IDs of connected clients and IDs of their nodes
+
+    Members and rooms are cached by every node (read-through), cached entries are invalidated by `registry` messages
+    published by the node which changed them. Writes are queued and applied in order, `sync` waits until they are stored.
+
+    Args:
+        connection (Callable[[], Any]): Returns Redis client (`redis.asyncio.Redis` or `MemoryRedis`).
+        host_id (str): ID of this node.
+        prefix (str, optional): Prefix of Redis keys. Defaults to "liveapi:registry".
+        publish (Callable[[dict], Awaitable[Any]] | None, optional): Publishes invalidation message to other nodes. Defaults to None (single node).
+        cache_size (int, optional): Maximal amount of cached entries. Defaults to 10000.
+    """
+
+    def __init__(self, connection: Callable[[], Any], host_id: str,
+                 prefix: str = "liveapi:registry",
+                 publish: Callable[[dict[str, Any]], Awaitable[Any]] | None = None,
+                 cache_size: int = 10_000,
+                 logger: Logger = getLogger("ascender-plugins")) -> None:
+        self.connection = connection
+        self.host_id = host_id
+        self.prefix = prefix
+        self.publish = publish
+        self.cache_size = cache_size
+        self.logger = logger
+
+        self._cache: dict[tuple[str, ...], set[str]] = {}
+        # NOTE: Incremented by every invalidation, so values fetched before invalidation aren't cached
+        self._version = 0
+        self._writes: asyncio.Queue | None = None
+        self._writer: asyncio.Task | None = None
+
+    @classmethod
+    def in_memory(cls, host_id: str = "local", redis: MemoryRedis | None = None, **kwargs) -> "ClusterRegistry":
+        redis = redis or MemoryRedis()
+        return cls(lambda: redis, host_id, **kwargs)
+
+    def _key(self, *parts: str) -> str:
+        return ":".join((self.prefix, *parts))
+
+    # Queries
+
+    async def members(self, room: str, namespace: str = "/") -> set[str]:
+        """
+        Session IDs of every member of the room in the cluster
+        """
+        return await self._cached(("members", namespace, room), lambda redis: redis.smembers(self._key("members", namespace, room)))
+
+    async def rooms(self, namespace: str = "/") -> set[str]:
+        """
+        Rooms of namespace which have at least one member in the cluster
+        """
+        return await self._cached(("rooms", namespace), lambda redis: redis.smembers(self._key("rooms", namespace)))
+
+    async def room_count(self, namespace: str = "/") -> int:
+        return len(await self.rooms(namespace))
+
+    async def is_online(self, sid: str, namespace: str = "/") -> bool:
+        """
+        Whether client is connected to any node of the cluster
+        """
+        return bool(await self.connection().hexists(self._key("online", namespace), sid))
+
+    async def online_count(self, namespace: str = "/") -> int:
+        return await self.connection().hlen(self._key("online", namespace))
+
+    async def _cached(self, key: tuple[str, ...], fetch: Callable[[Any], Awaitable[Any]]) -> set[str]:
+        if (values := self._cache.get(key)) is not None:
+            return values
+
+        version = self._version
+        values = {_decode(value) for value in await fetch(self.connection())}
+        if version != self._version:
+            return values
+
+        if len(self._cache) >= self.cache_size:
+            # NOTE: Dictionaries keep insertion order, so the oldest entry is dropped
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[key] = values
+        return values
+
+    def invalidate(self, keys: list[list[str]] | list[tuple[str, ...]]):
+        self._version += 1
+        for key in keys:
+            self._cache.pop(tuple(key), None)
+
+    # Writes
+
+    def join(self, sid: str, room: str, namespace: str = "/"):
+        self._submit(self._join, sid, room, namespace)
+
+    def leave(self, sid: str, room: str, namespace: str = "/"):
+        self._submit(self._leave, sid, room, namespace)
+
+    def connect(self, sid: str, namespace: str = "/"):
+        self._submit(self._connect, sid, namespace)
+
+    def disconnect(self, sid: str, namespace: str = "/"):
+        self._submit(self._disconnect, sid, namespace)
+
+    async def sync(self):
+        """
+        Waits until every queued write is stored
+        """
+        if self._writes is not None:
+            await self._writes.join()
+
+    def _submit(self, write: Callable[..., Awaitable[Any]], *args: Any):
+        # NOTE: Writes come from synchronous room bookkeeping of client manager, so they are queued and stored by a single task in order
+        if self._writes is None:
+            self._writes = asyncio.Queue()
+        if self._writer is None or self._writer.done():
+            self._writer = asyncio.get_running_loop().create_task(self._write())
+        self._writes.put_nowait((write, args))
+
+    async def _write(self):
+        while True:
+            write, args = await self._writes.get()
+            try:
+                await write(*args)
+            except Exception as e:
+                self.logger.error(f"Cluster registry write `{write.__name__}` failed: {e}")
+            finally:
+                self._writes.task_done()
+
+    async def _join(self, sid: str, room: str, namespace: str):
+        async with self.connection().pipeline(transaction=False) as pipe:
+            pipe.sadd(self._key("members", namespace, room), sid)
+            pipe.sadd(self._key("rooms", namespace), room)
+            await pipe.execute()
+        await self._changed([("members", namespace, room), ("rooms", namespace)])
+
+    async def _leave(self, sid: str, room: str, namespace: str):
+        redis = self.connection()
+        members = self._key("members", namespace, room)
+        async with redis.pipeline(transaction=False) as pipe:
+            pipe.srem(members, sid)
+            pipe.scard(members)
+            _, remaining = await pipe.execute()
+
+        if not remaining:
+            await redis.srem(self._key("rooms", namespace), room)
+            # NOTE: Member could join the room on other node meanwhile, the room is restored then
+            if await redis.scard(members):
+                await redis.sadd(self._key("rooms", namespace), room)
+        await self._changed([("members", namespace, room), ("rooms", namespace)])
+
+    async def _connect(self, sid: str, namespace: str):
+        await self.connection().hset(self._key("online", namespace), sid, self.host_id)
+
+    async def _disconnect(self, sid: str, namespace: str):
+        await self.connection().hdel(self._key("online", namespace), sid)
+
+    async def _changed(self, keys: list[tuple[str, ...]]):
+        self.invalidate(keys)
+        if self.publish is not None:
+            await self.publish({"method": "registry", "keys": [list(key) for key in keys], "host_id": self.host_id})
+
+    async def purge_host(self, host_id: str, namespace: str = "/"):
+        """
+        Removes clients of the node from the registry, used to clean up after node which was stopped without disconnecting it's clients
+        """
+        redis = self.connection()
+        online = await redis.hgetall(self._key("online", namespace))
+        sids = {_decode(sid) for sid, host in online.items() if _decode(host) == host_id}
+        if not sids:
+            return
+
+        for room in await self.rooms(namespace):
+            members = self._key("members", namespace, room)
+            if await redis.srem(members, *sids) and not await redis.scard(members):
+                await redis.srem(self._key("rooms", namespace), room)
+            await self._changed([("members", namespace, room), ("rooms", namespace)])
+        await redis.hdel(self._key("online", namespace), *sids)
@@ -1,4 +1,6 @@
+import asyncio
 from inspect import isclass
+from time import perf_counter
 from typing import Any, Awaitable, Callable
 from fastapi_socketio import SocketManager
 from pydantic import RootModel
@@ -6,15 +8,23 @@ from core.application import Application
 from core.optionals.base.dto import BaseDTO
 from core.optionals.base.response import BaseResponse
 from plugins.liveapi.engines.base import BaseEngine
+from plugins.liveapi.engines.managers import LiveAPIManager
+from plugins.liveapi.engines.packet import EncodedPacket, payload_size
+from plugins.liveapi.serializers.base import BaseSerializer
+from plugins.liveapi.serializers.json_serializer import JSONSerializer
 
 
 class SocketIOEngine(BaseEngine):
     def __init__(self, app: Application,
                  location: str = "/ws",
-                 cors_allowed_origins: str | list = '*') -> None:
+                 cors_allowed_origins: str | list = '*',
+                 serializer: BaseSerializer | None = None) -> None:
+        self.serializer = serializer or JSONSerializer()
+        self._manager = LiveAPIManager()
         self._client = SocketManager(app, location, 
-                                     cors_allowed_origins=cors_allowed_origins)
-        self._scope = {} # self._scope[room_name]["excluded_events"]
+                                     cors_allowed_origins=cors_allowed_origins,
+                                     client_manager=self._manager,
+                                     **self.serializer.server_options())
     
     async def send_event(self, event_name: str, 
                          data: BaseDTO | BaseResponse | RootModel | Any,
@@ -27,12 +37,14 @@ class SocketIOEngine(BaseEngine):
 
         Args:
             event_name (str): Name of event
-            data (BaseDTO | BaseResponse | RootModel | Any): Data which will be body of request
+            data (BaseDTO | BaseResponse | RootModel | EncodedPacket | Any): Data which will be body of request
             to (str | None, optional): Client Session ID or name of the room. Defaults to None.
             namespace (str | None, optional): Name of the namespace. Defaults to None.
         """
-        if isinstance(data, (BaseDTO, BaseResponse, RootModel)):
-            data = data.model_dump()
+        if isinstance(data, EncodedPacket) and additional_arguments.keys() <= {"skip_sid"}:
+            return await self._send_packet(data, event_name, to, namespace, **additional_arguments)
+
+        data = self._prepare(data)
         return await self._client.emit(event=event_name,
                                        data=data, to=to, 
                                        namespace=namespace, **additional_arguments)
@@ -61,8 +73,10 @@ class SocketIOEngine(BaseEngine):
             to (str | None, optional): _description_. Defaults to None.
             namespace (str | None, optional): _description_. Defaults to None.
         """
-        if isinstance(data, (BaseDTO, BaseResponse, RootModel)):
-            data = data.model_dump()
+        if isinstance(data, EncodedPacket):
+            return await self._send_packet(data, "message", to, namespace)
+
+        data = self._prepare(data)
 
         return await self._client.send(data=data, to=to, namespace=namespace)
     
@@ -71,16 +85,49 @@ class SocketIOEngine(BaseEngine):
                         skip_sid: str | None = None, 
                         exclude_rooms: list[str] = [],
                         namespaces: list[str] = ["/"]):
-        for namespace in namespaces:
-            if not (rooms := self._client._sio.manager.rooms.get(namespace, None)):
-                continue
+        """
+        ## Broadcast
+
+        Emits event once per namespace to every client of it, except of `skip_sid` and members of `exclude_rooms`.
+        Payload is encoded only once and namespaces are processed concurrently.
+        """
+        packet = self.encode(data)
+
+        await asyncio.gather(*(self._send_packet(packet, event_name, None, namespace,
+                                                 skip_sid=self._skip_sids(namespace, skip_sid, exclude_rooms))
+                               for namespace in namespaces))
+
+    async def _send_packet(self, packet: EncodedPacket, event_name: str,
+                           to: str | None = None, namespace: str | None = None,
+                           skip_sid: str | list[str] | None = None):
+        """
+        Sends already encoded packet straight to Engine.IO sockets of every recipient,
+        the same encoded frames are reused for every recipient.
+        """
+        sio = self._client._sio
+        namespace = namespace or "/"
+
+        # NOTE: Falling back to regular emit if server doesn't expose sending of raw Engine.IO packets
+        if not hasattr(sio, "_send_eio_packet"):
+            return await self._client.emit(event=event_name, data=packet.payload, to=to,
+                                           namespace=namespace, skip_sid=skip_sid)
+
+        # NOTE: Packet goes around client manager, so excluded events of subscriptions are applied here
+        skip_sid = self._manager.exclusions.skip(namespace, event_name, to, skip_sid,
+                                                 self._manager.rooms.get(namespace, {}))
+        if not isinstance(skip_sid, list):
+            skip_sid = [skip_sid]
+        skip = set(skip_sid)
 
-            for room_name in rooms.keys():
-                if room_name in exclude_rooms:
-                    continue
+        started = perf_counter()
+        eio_packets = packet.eio_packets(sio, event_name, namespace)
+        await asyncio.gather(*(sio._send_eio_packet(eio_sid, eio_pkt)
+                               for sid, eio_sid in sio.manager.get_participants(namespace, to)
+                               if sid not in skip
+                               for eio_pkt in eio_packets))
 
-                await self.send_event(event_name, data, room_name, namespace,
-                                      skip_sid=skip_sid)
+        if self._manager.metrics is not None:
+            self._manager.metrics.emitted(namespace, event_name, payload_size(packet.payload), perf_counter() - started)
     
     async def send_r2r(self, event_name: str,
                        data: BaseDTO | BaseResponse | RootModel | Any,
@@ -93,8 +140,7 @@ class SocketIOEngine(BaseEngine):
         Sends request that should return response just like it made in HTTP but allows to prefore lifetime API request-to-response method.
         Where server or client sends request and awaits response to this request from client, if not provided then timeout works out and raises `TimeoutError`
         """
-        if isinstance(data, (BaseDTO, BaseResponse, RootModel)):
-            data = data.model_dump()
+        data = self._prepare(data)
 
         return await self._client.call(event=event_name,
                                 data=data, to=to,
@@ -104,12 +150,13 @@ class SocketIOEngine(BaseEngine):
     async def subscribe(self, sid: str, room_name: str, 
                         namespace: str | None = None, 
                         exclude_events: list[str] = []):
-        self._scope[room_name] = {"excluded_events": exclude_events}
+        # NOTE: Excluded events are applied by client manager during every emit into the room
+        self._manager.exclusions.add(namespace or "/", room_name, sid, exclude_events)
         return await self._client.enter_room(sid, room_name, namespace)
     
     async def unsubscribe(self, sid: str, room_name: str,
                           namespace: str | None = None):
-        del self._scope[room_name]
+        self._manager.exclusions.discard(namespace or "/", room_name, sid)
         return await self._client.leave_room(sid, room_name, namespace)
     
     async def disconnect(self, sid: str, namespace: str | None = None):
@@ -0,0 +1,45 @@
+from typing import Iterable
+from core.application import Application
+from plugins.liveapi.engines.local_cluster import ClusterMembership
+from plugins.liveapi.engines.managers import LiveAPILocalClusterManager
+from plugins.liveapi.engines.socketio_pubsub import SocketIOPubSubEngine
+from plugins.liveapi.serializers.base import BaseSerializer
+
+
+class SocketIOLocalClusterEngine(SocketIOPubSubEngine):
+    """
+    ## Socket IO Local Cluster Engine
+
+    Shares rooms and emits between uvicorn workers of the same host without Redis,
+    workers exchange messages over Unix domain socket relayed by one of them (see `LocalBus`).
+
+    Args:
+        cluster_channel (str, optional): Name of the cluster, workers of the same application have to use the same one. Defaults to "liveapi".
+        socket_path (str | None, optional): Path of Unix domain socket. Defaults to `<temporary directory>/<cluster_channel>.sock`.
+        local_delivery (bool, optional): Sends emits only to workers which host their recipients. Defaults to True.
+    """
+
+    def __init__(self, app: Application,
+                 cluster_channel: str = "liveapi",
+                 socket_path: str | None = None,
+                 location: str = "/ws",
+                 cors_allowed_origins: str | list = '*',
+                 serializer: BaseSerializer | None = None,
+                 local_delivery: bool = True) -> None:
+        manager = LiveAPILocalClusterManager(channel=cluster_channel, socket_path=socket_path,
+                                             local_delivery=local_delivery)
+        super().__init__(app, manager, location, cors_allowed_origins, serializer)
+
+    @property
+    def membership(self) -> ClusterMembership:
+        """
+        Rooms and connected clients of every worker of the host
+        """
+        return self._manager.membership
+
+    async def _room_members(self, room: str, namespace: str) -> Iterable[str]:
+        return self.membership.members(room, namespace).keys()
+
+    async def _is_online(self, sid: str, namespace: str) -> bool:
+        # NOTE: Until states of other workers are received, targets which aren't known rooms are treated as session IDs
+        return not self.membership.ready or self.membership.is_online(sid, namespace)
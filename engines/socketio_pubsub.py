@@ -0,0 +1,159 @@
+import asyncio
+from typing import TYPE_CHECKING, Any, Awaitable, Callable
+from fastapi_socketio import SocketManager
+from pydantic import RootModel
+from core.application import Application
+from core.optionals.base.dto import BaseDTO
+from core.optionals.base.response import BaseResponse
+from plugins.liveapi.engines.base import BaseEngine
+from plugins.liveapi.serializers.base import BaseSerializer
+from plugins.liveapi.serializers.json_serializer import JSONSerializer
+
+if TYPE_CHECKING:
+    from socketio import AsyncManager
+
+
+class SocketIOPubSubEngine(BaseEngine):
+    """
+    ## Socket IO Pub/Sub Engine
+
+    Base of socket.io engines whose client manager shares emits between several servers (or workers).
+
+    Rooms of other servers are looked up by `_room_members` and `_is_online`, engines override them with lookups of their
+    cluster-wide membership (Redis registry, membership replica of local cluster).
+    """
+
+    def __init__(self, app: Application, manager: "AsyncManager",
+                 location: str = "/ws",
+                 cors_allowed_origins: str | list = '*',
+                 serializer: BaseSerializer | None = None) -> None:
+        self.serializer = serializer or JSONSerializer()
+        self._manager = manager
+        self._client = SocketManager(app, location,
+                                     cors_allowed_origins=cors_allowed_origins,
+                                     client_manager=self._manager,
+                                     **self.serializer.server_options())
+
+    async def _cluster_skip_sids(self, namespace: str, skip_sid: str | list[str] | None,
+                                 exclude_rooms: list[str]) -> list[str] | None:
+        """
+        The same as `_skip_sids`, but members of excluded rooms are taken from cluster-wide membership
+        """
+        if not exclude_rooms:
+            return self._skip_sids(namespace, skip_sid, exclude_rooms)
+
+        skip = set(skip_sid) if isinstance(skip_sid, list) else {skip_sid} - {None}
+        for members in await asyncio.gather(*(self._room_members(room, namespace) for room in exclude_rooms)):
+            skip.update(members)
+        return list(skip) or None
+
+    async def _sync_membership(self):
+        """
+        Called after client enters or leaves a room, engines which publish membership asynchronously wait for it to be published
+        """
+        return None
+
+    async def send_event(self, event_name: str,
+                         data: BaseDTO | BaseResponse | RootModel | Any,
+                         to: str | None = None,
+                         namespace: str | None = None, **additional_arguments):
+        """
+        ## Send Event
+
+        Send event into room or specific client
+
+        Args:
+            event_name (str): Name of event
+            data (BaseDTO | BaseResponse | RootModel | EncodedPacket | Any): Data which will be body of request
+            to (str | None, optional): Client Session ID or name of the room. Defaults to None.
+            namespace (str | None, optional): Name of the namespace. Defaults to None.
+        """
+        data = self._prepare(data)
+        return await self._client.emit(event=event_name,
+                                       data=data, to=to,
+                                       namespace=namespace, **additional_arguments)
+
+    def receive_event(self, event_name: str,
+                            handler: Callable[..., None | Awaitable[None]],
+                            namespace: str | None):
+        """
+        ## Receive Event
+
+        Args:
+            event_name (str): Name of event
+            handler (Callable[..., None  |  Awaitable[None]]): Callback function
+            namespace (str | None): Name of a namespace
+        """
+        return self._client.on(event_name, handler, namespace)
+
+    async def send_message(self, data: BaseDTO | BaseResponse | RootModel | Any,
+                         to: str | None = None,
+                         namespace: str | None = None, **additional_arguments):
+        """
+        ## Send Message
+
+        Sends socket.io `message` event into room or specific client
+
+        Args:
+            data (BaseDTO | BaseResponse | RootModel | Any): Data which will be body of message
+            to (str | None, optional): Client Session ID or name of the room. Defaults to None.
+            namespace (str | None, optional): Name of the namespace. Defaults to None.
+        """
+        data = self._prepare(data)
+
+        return await self._client.send(data=data, to=to, namespace=namespace)
+
+    async def broadcast(self, data: BaseDTO | BaseResponse | RootModel | Any,
+                        event_name: str = "broadcast",
+                        skip_sid: str | None = None,
+                        exclude_rooms: list[str] = [],
+                        namespaces: list[str] = ["/"]):
+        """
+        ## Broadcast
+
+        Emits event once per namespace to every client of it, except of `skip_sid` and members of `exclude_rooms`.
+        Payload is encoded only once and namespaces are processed concurrently.
+        """
+        data = self._prepare(self.encode(data))
+
+        # NOTE: Every server skips the same session IDs, so members of excluded rooms are collected from the whole cluster
+        skip_sids = await asyncio.gather(*(self._cluster_skip_sids(namespace, skip_sid, exclude_rooms)
+                                           for namespace in namespaces))
+        await asyncio.gather(*(self._client.emit(event=event_name, data=data, to=None,
+                                                 namespace=namespace, skip_sid=skip)
+                               for namespace, skip in zip(namespaces, skip_sids)))
+
+    async def send_r2r(self, event_name: str,
+                       data: BaseDTO | BaseResponse | RootModel | Any,
+                       to: str | None = None,
+                       namespace: str | None = None, timeout: int = 60,
+                       **additional_arguments):
+        """
+        ## Send Request-to-Response
+
+        Sends request that should return response just like it made in HTTP but allows to prefore lifetime API request-to-response method.
+        Where server or client sends request and awaits response to this request from client, if not provided then timeout works out and raises `TimeoutError`
+        """
+        data = self._prepare(data)
+
+        return await self._client.call(event=event_name,
+                                data=data, to=to,
+                                namespace=namespace,
+                                timeout=timeout)
+
+    async def subscribe(self, sid: str, room_name: str,
+                        namespace: str | None = None,
+                        exclude_events: list[str] = []):
+        # NOTE: Excluded events are applied by client manager during every emit into the room
+        self._manager.exclusions.add(namespace or "/", room_name, sid, exclude_events)
+        await self._client.enter_room(sid, room_name, namespace)
+        await self._sync_membership()
+
+    async def unsubscribe(self, sid: str, room_name: str,
+                          namespace: str | None = None):
+        self._manager.exclusions.discard(namespace or "/", room_name, sid)
+        await self._client.leave_room(sid, room_name, namespace)
+        await self._sync_membership()
+
+    async def disconnect(self, sid: str, namespace: str | None = None):
+        return await self._client.disconnect(sid, namespace)
@@ -1,122 +1,80 @@
-from typing import Any, Awaitable, Callable
-from fastapi_socketio import SocketManager
-from pydantic import RootModel
-import socketio
+from typing import Any, Iterable
 from core.application import Application
-from core.optionals.base.dto import BaseDTO
-from core.optionals.base.response import BaseResponse
-from plugins.liveapi.engines.base import BaseEngine
+from plugins.liveapi.engines.compression import MessageCompressor
+from plugins.liveapi.engines.managers import LiveAPIRedisManager
+from plugins.liveapi.engines.registry import ClusterRegistry
+from plugins.liveapi.engines.socketio_pubsub import SocketIOPubSubEngine
+from plugins.liveapi.metrics import MetricsRegistry
+from plugins.liveapi.serializers.base import BaseSerializer
 
 
-class SocketIORedisEngine(BaseEngine):
+class SocketIORedisEngine(SocketIOPubSubEngine):
     def __init__(self, app: Application,
                  redis_connection: str,
                  redis_channel: str = "socketio",
                  redis_options: dict[str, Any] | None = None,
                  location: str = "/ws",
-                 cors_allowed_origins: str | list = '*') -> None:
-        self._manager = socketio.AsyncRedisManager(url=redis_connection, channel=redis_channel,
-                                              redis_options=redis_options)
-        self._client = SocketManager(app, location, 
-                                     cors_allowed_origins=cors_allowed_origins,
-                                     client_manager=self._manager)
-        self._scope = {} # self._scope[room_name]["excluded_events"]
-    
-    async def send_event(self, event_name: str, 
-                         data: BaseDTO | BaseResponse | RootModel | Any,
-                         to: str | None = None, 
-                         namespace: str | None = None, **additional_arguments):
-        """
-        ## Send Event
-
-        Send event into room or specific client
+                 cors_allowed_origins: str | list = '*',
+                 serializer: BaseSerializer | None = None,
+                 publish_window: float | None = None,
+                 publish_batch_size: int = 100,
+                 compression: str | None = None,
+                 compression_threshold: int = 1024,
+                 compression_level: int | None = None,
+                 local_delivery: bool = True,
+                 room_interest: bool = False,
+                 cluster_registry: bool = False) -> None:
+        # NOTE: `publish_window` enables coalescing of outbound Redis messages, it's the latency budget of every message in seconds
+        manager = LiveAPIRedisManager(url=redis_connection, channel=redis_channel,
+                                      redis_options=redis_options,
+                                      publish_window=publish_window,
+                                      publish_batch_size=publish_batch_size,
+                                      compressor=MessageCompressor(compression, compression_threshold,
+                                                                   compression_level),
+                                      local_delivery=local_delivery,
+                                      room_interest=room_interest)
+        super().__init__(app, manager, location, cors_allowed_origins, serializer)
 
-        Args:
-            event_name (str): Name of event
-            data (BaseDTO | BaseResponse | RootModel | Any): Data which will be body of request
-            to (str | None, optional): Client Session ID or name of the room. Defaults to None.
-            namespace (str | None, optional): Name of the namespace. Defaults to None.
-        """
-        if isinstance(data, (BaseDTO, BaseResponse, RootModel)):
-            data = data.model_dump()
-        return await self._client.emit(event=event_name,
-                                       data=data, to=to, 
-                                       namespace=namespace, **additional_arguments)
+        # NOTE: Cluster-wide rooms and presence, without it rooms are known only for clients of this node
+        self.registry: ClusterRegistry | None = None
+        if cluster_registry:
+            self.registry = self._manager.registry = ClusterRegistry(self._redis, self._manager.host_id,
+                                                                     prefix=f"{redis_channel}:registry",
+                                                                     publish=self._manager._publish)
     
-    def receive_event(self, event_name: str,
-                            handler: Callable[..., None | Awaitable[None]],
-                            namespace: str | None):
-        """
-        ## Receive Event
+    def _redis(self):
+        if not self._manager.connected:
+            self._manager._redis_connect()
+        return self._manager.redis
 
-        Args:
-            event_name (str): Name of event
-            handler (Callable[..., None  |  Awaitable[None]]): Callback function
-            namespace (str | None): Name of a namespace
-        """
-        return self._client.on(event_name, handler, namespace)
-    
-    async def send_message(self, data: BaseDTO | BaseResponse | RootModel | Any,
-                         to: str | None = None, 
-                         namespace: str | None = None, **additional_arguments):
-        """
-        ## Send Message
+    async def _room_members(self, room: str, namespace: str) -> Iterable[str]:
+        if self.registry is None:
+            return await super()._room_members(room, namespace)
+        return await self.registry.members(room, namespace)
 
-        Args:
-            data (BaseDTO | BaseResponse | RootModel | Any): _description_
-            to (str | None, optional): _description_. Defaults to None.
-            namespace (str | None, optional): _description_. Defaults to None.
-        """
-        if isinstance(data, (BaseDTO, BaseResponse, RootModel)):
-            data = data.model_dump()
+    async def _is_online(self, sid: str, namespace: str) -> bool:
+        if self.registry is None:
+            # NOTE: Clients of other nodes are unknown without registry, so every target which isn't a local room is treated as session ID
+            return True
+        return await self.registry.is_online(sid, namespace)
 
-        return await self._client.send(data=data, to=to, namespace=namespace)
-    
-    async def broadcast(self, data: BaseDTO | BaseResponse | RootModel | Any,
-                        event_name: str = "broadcast",
-                        skip_sid: str | None = None, 
-                        exclude_rooms: list[str] = [],
-                        namespaces: list[str] = ["/"]):
-        for namespace in namespaces:
-            if not (rooms := self._client._sio.manager.rooms.get(namespace, None)):
-                continue
+    def use_metrics(self, metrics: MetricsRegistry):
+        super().use_metrics(metrics)
+        stats = self._manager.compressor.stats
 
-            for room_name in rooms.keys():
-                if room_name in exclude_rooms:
-                    continue
+        def collect():
+            return {
+                "liveapi_redis_compressed_messages_total": ("Messages compressed before publishing to Redis", {(): stats.compressed}, "counter"),
+                "liveapi_redis_incompressible_messages_total": ("Messages above threshold sent uncompressed, because compression didn't reduce their size",
+                                                                {(): stats.skipped}, "counter"),
+                "liveapi_redis_decompressed_messages_total": ("Compressed messages received from Redis", {(): stats.decompressed}, "counter"),
+                "liveapi_redis_compression_input_bytes_total": ("Size of compressed messages before compression", {(): stats.raw_bytes}, "counter"),
+                "liveapi_redis_compression_output_bytes_total": ("Size of compressed messages after compression", {(): stats.compressed_bytes}, "counter"),
+            }
 
-                await self.send_event(event_name, data, room_name, namespace,
-                                      skip_sid=skip_sid)
-    
-    async def send_r2r(self, event_name: str,
-                       data: BaseDTO | BaseResponse | RootModel | Any,
-                       to: str | None = None, 
-                       namespace: str | None = None, timeout: int = 60, 
-                       **additional_arguments):
-        """
-        ## Send Request-to-Response
+        metrics.gauges.append(collect)
 
-        Sends request that should return response just like it made in HTTP but allows to prefore lifetime API request-to-response method.
-        Where server or client sends request and awaits response to this request from client, if not provided then timeout works out and raises `TimeoutError`
-        """
-        if isinstance(data, (BaseDTO, BaseResponse, RootModel)):
-            data = data.model_dump()
-
-        return await self._client.call(event=event_name,
-                                data=data, to=to,
-                                namespace=namespace,
-                                timeout=timeout)
-    
-    async def subscribe(self, sid: str, room_name: str, 
-                        namespace: str | None = None, 
-                        exclude_events: list[str] = []):
-        self._scope[room_name] = {"excluded_events": exclude_events}
-        return await self._client.enter_room(sid, room_name, namespace)
-    
-    async def unsubscribe(self, sid: str, room_name: str,
-                          namespace: str | None = None):
-        del self._scope[room_name]
-        return await self._client.leave_room(sid, room_name, namespace)
-    
-    async def disconnect(self, sid: str, namespace: str | None = None):
-        return await self._client.disconnect(sid, namespace)
\ No newline at end of file
+    async def _sync_membership(self):
+        # NOTE: Membership of client of this node is visible to the whole cluster once subscribe (or unsubscribe) returns
+        if self.registry is not None:
+            await self.registry.sync()
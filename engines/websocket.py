@@ -0,0 +1,533 @@
+"""
+Native WebSocket engine of LiveAPI.
+
+Serves plain ASGI WebSocket connections without Engine.IO and socket.io layers, every frame is a single array:
+
+    [0, namespace, auth]                    client connects to namespace (`auth` is optional)
+    [0, namespace, sid]                     server accepted connection of namespace
+    [1, namespace]                          client or server disconnects from namespace
+    [2, namespace, event, data, ack_id]     event, `data` and `ack_id` are optional
+    [3, namespace, ack_id, data]            response to event sent with `ack_id`
+    [4, namespace, error]                   server refused connection of namespace
+
+Frames are JSON text frames, or msgpack binary frames if engine uses binary serializer.
+One connection can join any amount of namespaces and gets separate session ID in each of them.
+"""
+import asyncio
+import inspect
+import secrets
+from contextlib import asynccontextmanager
+from logging import Logger, getLogger
+from time import perf_counter
+from typing import Any, Awaitable, Callable
+
+from pydantic import RootModel
+from starlette.routing import WebSocketRoute
+from starlette.websockets import WebSocket
+
+from core.application import Application
+from core.optionals.base.dto import BaseDTO
+from core.optionals.base.response import BaseResponse
+from plugins.liveapi.engines.base import BaseEngine
+from plugins.liveapi.engines.exclusions import ExclusionIndex
+from plugins.liveapi.engines.packet import EncodedPacket, payload_size
+from plugins.liveapi.metrics import MetricsRegistry
+from plugins.liveapi.serializers.base import BaseSerializer
+from plugins.liveapi.serializers.json_serializer import JSONSerializer
+
+
+CONNECT = 0
+DISCONNECT = 1
+EVENT = 2
+ACK = 3
+CONNECT_ERROR = 4
+
+
+class WebSocketConnection:
+    """
+    Single WebSocket connection, outbound frames are queued and sent by it's own writer task,
+    so emits never wait for network and one slow client doesn't hold back the others.
+    """
+    __slots__ = ("websocket", "environ", "namespaces", "pending", "acks", "queue", "writer", "closed", "_ack_id")
+
+    def __init__(self, websocket: WebSocket, environ: dict[str, Any], max_queue: int) -> None:
+        self.websocket = websocket
+        self.environ = environ
+        # namespace -> session ID of the connection in namespace
+        self.namespaces: dict[str, str] = {}
+        # NOTE: Namespaces which `connect` handler is still running, disconnecting them refuses the connection
+        self.pending: set[str] = set()
+        self.acks: dict[int, asyncio.Future] = {}
+        self.queue: asyncio.Queue = asyncio.Queue(max_queue)
+        self.writer: asyncio.Task | None = None
+        self.closed = False
+        self._ack_id = 0
+
+    def next_ack(self) -> int:
+        self._ack_id += 1
+        return self._ack_id
+
+    def push(self, frame: str | bytes) -> bool:
+        """
+        Queues frame, returns `False` if the queue of the connection is full
+        """
+        try:
+            self.queue.put_nowait(frame)
+        except asyncio.QueueFull:
+            return False
+        return True
+
+
+class WebSocketManager:
+    """
+    Client manager of WebSocket engine, room table has the same layout as socket.io client manager (`rooms[namespace][room][sid]`),
+    but values are connections of clients.
+    """
+
+    def __init__(self) -> None:
+        self.rooms: dict[str, dict[str | None, dict[str, WebSocketConnection]]] = {}
+        self.sessions: dict[str, dict[str, Any]] = {}
+        self.exclusions = ExclusionIndex()
+        self.disconnect_callbacks: list[Callable[[str, str], None]] = []
+        self.metrics: MetricsRegistry | None = None
+
+    def connect(self, sid: str, namespace: str, connection: WebSocketConnection):
+        self.enter_room(sid, namespace, None, connection)
+        self.enter_room(sid, namespace, sid, connection)
+
+    def disconnect(self, sid: str, namespace: str):
+        self.exclusions.discard_sid(namespace, sid)
+        for callback in self.disconnect_callbacks:
+            callback(sid, namespace)
+
+        rooms = self.rooms.get(namespace, {})
+        for room_name in [room_name for room_name, members in rooms.items() if sid in members]:
+            self.leave_room(sid, namespace, room_name)
+        self.sessions.pop(sid, None)
+
+    def enter_room(self, sid: str, namespace: str, room: str | None, connection: WebSocketConnection):
+        self.rooms.setdefault(namespace, {}).setdefault(room, {})[sid] = connection
+
+    def leave_room(self, sid: str, namespace: str, room: str | None):
+        rooms = self.rooms.get(namespace, {})
+        if (members := rooms.get(room)) is None:
+            return
+        members.pop(sid, None)
+        if not members:
+            del rooms[room]
+
+    def connection(self, sid: str, namespace: str) -> WebSocketConnection | None:
+        return self.rooms.get(namespace, {}).get(sid, {}).get(sid)
+
+    def is_connected(self, sid: str, namespace: str) -> bool:
+        return sid in self.rooms.get(namespace, {}).get(None, {})
+
+    def get_participants(self, namespace: str, room: str | list[str] | None):
+        """
+        Members of the room, or of every listed room. Client which is a member of several listed rooms is returned once
+        """
+        rooms = self.rooms.get(namespace, {})
+        if not isinstance(room, list):
+            return rooms.get(room, {}).items()
+
+        participants: dict[str, WebSocketConnection] = {}
+        for room_name in room:
+            participants.update(rooms.get(room_name, {}))
+        return participants.items()
+
+
+def build_environ(websocket: WebSocket) -> dict[str, Any]:
+    """
+    WSGI-like environ of the connection, the same as socket.io passes to `connect` handlers
+    """
+    scope = websocket.scope
+    client = scope.get("client") or ("", 0)
+    server = scope.get("server") or ("", 0)
+    environ = {
+        "REQUEST_METHOD": "GET",
+        "PATH_INFO": scope.get("path", ""),
+        "QUERY_STRING": scope.get("query_string", b"").decode("latin1"),
+        "REMOTE_ADDR": client[0],
+        "REMOTE_PORT": client[1],
+        "SERVER_NAME": server[0],
+        "SERVER_PORT": server[1],
+        "asgi.scope": scope,
+    }
+    for name, value in scope.get("headers", []):
+        key = "HTTP_" + name.decode("latin1").upper().replace("-", "_")
+        value = value.decode("latin1")
+        environ[key] = f"{environ[key]},{value}" if key in environ else value
+
+    return environ
+
+
+class WebSocketEngine(BaseEngine):
+    """
+    ## WebSocket Engine
+
+    Lean engine for service-to-service clients, serves plain WebSocket connections with compact array framing
+    (see module documentation) instead of socket.io protocol.
+
+    Args:
+        app (Application): FastAPI application, WebSocket route is mounted into it.
+        location (str, optional): Path of WebSocket route. Defaults to "/ws".
+        cors_allowed_origins (str | list, optional): Allowed `Origin` headers of connections. Defaults to '*'.
+        serializer (BaseSerializer | None, optional): Serializer of frames. Defaults to `JSONSerializer`.
+        max_queue (int, optional): Maximal amount of frames queued for a single connection, connections which don't read
+            their frames are closed once it's exceeded. Defaults to 1024.
+    """
+
+    def __init__(self, app: Application,
+                 location: str = "/ws",
+                 cors_allowed_origins: str | list = '*',
+                 serializer: BaseSerializer | None = None,
+                 max_queue: int = 1024,
+                 logger: Logger = getLogger("ascender-plugins")) -> None:
+        self.serializer = serializer or JSONSerializer()
+        self.cors_allowed_origins = cors_allowed_origins
+        self.max_queue = max_queue
+        self.logger = logger
+
+        self._manager = WebSocketManager()
+        self._handlers: dict[str, dict[str, Callable[..., Any]]] = {}
+        # NOTE: References of running handler tasks, otherwise they could be garbage collected before they finish
+        self._tasks: set[asyncio.Task] = set()
+
+        self._dumps = self.serializer.dumps
+        if self.serializer.binary:
+            import msgpack
+            self._dumps = msgpack.packb
+
+        app.router.routes.append(WebSocketRoute(location, self._serve))
+
+    # Connections
+
+    def _origin_allowed(self, websocket: WebSocket) -> bool:
+        if self.cors_allowed_origins == "*" or self.cors_allowed_origins == ["*"]:
+            return True
+        if (origin := websocket.headers.get("origin")) is None:
+            return True
+
+        allowed = [self.cors_allowed_origins] if isinstance(self.cors_allowed_origins, str) else self.cors_allowed_origins
+        return origin in allowed
+
+    async def _serve(self, websocket: WebSocket):
+        if not self._origin_allowed(websocket):
+            await websocket.close(code=1008)
+            return
+
+        await websocket.accept()
+        connection = WebSocketConnection(websocket, build_environ(websocket), self.max_queue)
+        connection.writer = asyncio.create_task(self._write(connection))
+
+        try:
+            while True:
+                message = await websocket.receive()
+                if message["type"] == "websocket.disconnect":
+                    break
+
+                frame = message.get("text")
+                if frame is None:
+                    frame = message.get("bytes")
+                await self._receive(connection, frame)
+        finally:
+            await self._close(connection, "client disconnect")
+
+    async def _write(self, connection: WebSocketConnection):
+        websocket = connection.websocket
+        try:
+            while True:
+                frame = await connection.queue.get()
+                if isinstance(frame, str):
+                    await websocket.send_text(frame)
+                else:
+                    await websocket.send_bytes(frame)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.logger.debug("WebSocket connection is closed while sending frame: %s", e)
+
+    def _push(self, connection: WebSocketConnection, frame: str | bytes):
+        if connection.closed or connection.push(frame):
+            return
+
+        self.logger.warning(f"WebSocket client {connection.environ['REMOTE_ADDR']} doesn't read it's frames, closing connection")
+        self._spawn(self._drop(connection))
+
+    async def _drop(self, connection: WebSocketConnection):
+        await self._close(connection, "slow client")
+        try:
+            await connection.websocket.close(code=1013)
+        except Exception:
+            pass
+
+    async def _close(self, connection: WebSocketConnection, reason: str):
+        if connection.closed:
+            return
+        connection.closed = True
+
+        for namespace in list(connection.namespaces):
+            await self._leave(connection, namespace, reason, notify=False)
+
+        for future in connection.acks.values():
+            if not future.done():
+                future.set_exception(ConnectionError("Client disconnected before responding"))
+        connection.acks.clear()
+
+        if connection.writer is not None:
+            connection.writer.cancel()
+
+    async def _leave(self, connection: WebSocketConnection, namespace: str, reason: str, notify: bool = True):
+        if (sid := connection.namespaces.pop(namespace, None)) is None:
+            return
+
+        self._manager.disconnect(sid, namespace)
+        # NOTE: Refused connection is reported by `_connect`, `disconnect` handler isn't called for it
+        if namespace in connection.pending:
+            return
+
+        if notify:
+            self._push(connection, self._dumps([DISCONNECT, namespace]))
+        if (handler := self._handlers.get(namespace, {}).get("disconnect")) is not None:
+            try:
+                await self._call(handler, sid, reason)
+            except Exception as e:
+                self.logger.debug(f"([purple]{namespace}[/purple]) `disconnect` handler failed: {e}")
+
+    # Inbound frames
+
+    async def _receive(self, connection: WebSocketConnection, raw: str | bytes):
+        try:
+            frame = self.serializer.loads(raw)
+            kind, namespace = frame[0], frame[1] if len(frame) > 1 else "/"
+        except Exception as e:
+            self.logger.debug("Malformed WebSocket frame is dropped: %s", e)
+            return
+
+        if kind == CONNECT:
+            await self._connect(connection, namespace, frame[2] if len(frame) > 2 else None)
+
+        elif kind == DISCONNECT:
+            await self._leave(connection, namespace, "client disconnect", notify=False)
+
+        elif kind == EVENT:
+            if (sid := connection.namespaces.get(namespace)) is None or len(frame) < 3:
+                return
+            self._spawn(self._trigger(connection, sid, namespace, frame[2], frame[3:4], frame[4] if len(frame) > 4 else None))
+
+        elif kind == ACK:
+            if len(frame) > 2 and (future := connection.acks.pop(frame[2], None)) is not None and not future.done():
+                future.set_result(frame[3] if len(frame) > 3 else None)
+
+    async def _connect(self, connection: WebSocketConnection, namespace: str, auth: Any):
+        if namespace in connection.namespaces:
+            return
+        if namespace != "/" and namespace not in self._handlers:
+            self._push(connection, self._dumps([CONNECT_ERROR, namespace, {"message": "Unable to connect"}]))
+            return
+
+        sid = secrets.token_urlsafe(15)
+        connection.namespaces[namespace] = sid
+        connection.pending.add(namespace)
+        self._manager.connect(sid, namespace, connection)
+
+        accepted, error = True, "Connection rejected by server"
+        if (handler := self._handlers.get(namespace, {}).get("connect")) is not None:
+            try:
+                accepted = await self._call(handler, sid, connection.environ, auth) is not False
+            except ConnectionRefusedError as e:
+                accepted, error = False, str(e) or error
+            except Exception as e:
+                accepted = False
+                self.logger.debug(f"([purple]{namespace}[/purple]) `connect` handler failed: {e}")
+        connection.pending.discard(namespace)
+
+        # NOTE: Handler could also refuse connection by disconnecting the client (e.g. `ErrorHandler` does so)
+        if accepted and connection.namespaces.get(namespace) == sid:
+            self._push(connection, self._dumps([CONNECT, namespace, sid]))
+            return
+
+        if connection.namespaces.get(namespace) == sid:
+            del connection.namespaces[namespace]
+            self._manager.disconnect(sid, namespace)
+        self._push(connection, self._dumps([CONNECT_ERROR, namespace, {"message": error}]))
+
+    async def _trigger(self, connection: WebSocketConnection, sid: str, namespace: str,
+                       event_name: str, arguments: list[Any], ack_id: int | None):
+        handlers = self._handlers.get(namespace, {})
+        # NOTE: Events without handler of their own go to catch-all handler (`*`) as in socket.io, it gets name of event first
+        if (handler := handlers.get(event_name)) is not None:
+            arguments = [sid, *arguments]
+        elif (handler := handlers.get("*")) is not None and event_name not in ("connect", "disconnect"):
+            arguments = [event_name, sid, *arguments]
+        else:
+            return
+
+        try:
+            response = await self._call(handler, *arguments)
+        except Exception as e:
+            # NOTE: Listeners report their errors to client by themselves
+            self.logger.debug("([purple]%s[/purple]) `%s` handler failed: %s", namespace, event_name, e)
+            return
+
+        if ack_id is not None and connection.namespaces.get(namespace) == sid:
+            self._push(connection, self._dumps([ACK, namespace, ack_id, self._prepare(response)]))
+
+    async def _call(self, handler: Callable[..., Any], *args: Any) -> Any:
+        response = handler(*args)
+        if inspect.isawaitable(response):
+            response = await response
+        return response
+
+    def _spawn(self, coroutine: Awaitable[Any]):
+        task = asyncio.ensure_future(coroutine)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    # Outbound frames
+
+    def _event_frame(self, packet: EncodedPacket, event_name: str, namespace: str) -> str | bytes:
+        def build():
+            frame = [EVENT, namespace, event_name]
+            if packet.payload is not None:
+                frame.append(packet.payload)
+            return self._dumps(frame)
+
+        return packet.cached(("websocket", event_name, namespace), build)
+
+    def _deliver(self, packet: EncodedPacket, event_name: str, to: str | list[str] | None,
+                 namespace: str | None, skip_sid: str | list[str] | None = None):
+        namespace = namespace or "/"
+        started = perf_counter()
+
+        skip_sid = self._manager.exclusions.skip(namespace, event_name, to, skip_sid,
+                                                 self._manager.rooms.get(namespace, {}))
+        skip = set(skip_sid) if isinstance(skip_sid, list) else {skip_sid}
+
+        frame = self._event_frame(packet, event_name, namespace)
+        for sid, connection in self._manager.get_participants(namespace, to):
+            if sid not in skip:
+                self._push(connection, frame)
+
+        if self._manager.metrics is not None:
+            self._manager.metrics.emitted(namespace, event_name, payload_size(packet.payload), perf_counter() - started)
+
+    # Sessions
+
+    async def get_session(self, sid: str, namespace: str | None = None) -> dict[str, Any]:
+        return self._manager.sessions.setdefault(sid, {})
+
+    async def save_session(self, sid: str, session: dict[str, Any], namespace: str | None = None):
+        if self._manager.is_connected(sid, namespace or "/"):
+            self._manager.sessions[sid] = session
+
+    @asynccontextmanager
+    async def session(self, sid: str, namespace: str | None = None):
+        session = await self.get_session(sid, namespace)
+        yield session
+        await self.save_session(sid, session, namespace)
+
+    # BaseEngine
+
+    async def send_event(self, event_name: str,
+                         data: BaseDTO | BaseResponse | RootModel | Any,
+                         to: str | list[str] | None = None,
+                         namespace: str | None = None, **additional_arguments):
+        """
+        ## Send Event
+
+        Send event into room or specific client
+
+        Args:
+            event_name (str): Name of event
+            data (BaseDTO | BaseResponse | RootModel | EncodedPacket | Any): Data which will be body of request
+            to (str | list[str] | None, optional): Client Session ID or name of the room, or list of them. Defaults to None.
+            namespace (str | None, optional): Name of the namespace. Defaults to None.
+        """
+        self._deliver(self.encode(data), event_name, to, namespace, additional_arguments.get("skip_sid"))
+
+    def receive_event(self, event_name: str,
+                      handler: Callable[..., None | Awaitable[None]],
+                      namespace: str | None):
+        """
+        ## Receive Event
+
+        Args:
+            event_name (str): Name of event
+            handler (Callable[..., None  |  Awaitable[None]]): Callback function
+            namespace (str | None): Name of a namespace
+        """
+        self._handlers.setdefault(namespace or "/", {})[event_name] = handler
+
+    async def send_message(self, data: BaseDTO | BaseResponse | RootModel | Any,
+                           to: str | list[str] | None = None,
+                           namespace: str | None = None, **additional_arguments):
+        """
+        ## Send Message
+
+        Sends `message` event into room or specific client
+        """
+        self._deliver(self.encode(data), "message", to, namespace, additional_arguments.get("skip_sid"))
+
+    async def broadcast(self, data: BaseDTO | BaseResponse | RootModel | Any,
+                        event_name: str = "broadcast",
+                        skip_sid: str | None = None,
+                        exclude_rooms: list[str] = [],
+                        namespaces: list[str] = ["/"]):
+        """
+        ## Broadcast
+
+        Emits event once per namespace to every client of it, except of `skip_sid` and members of `exclude_rooms`.
+        Payload is encoded only once and frames are only queued, so broadcast never waits for clients.
+        """
+        packet = self.encode(data)
+        for namespace in namespaces:
+            self._deliver(packet, event_name, None, namespace,
+                          self._skip_sids(namespace, skip_sid, exclude_rooms))
+
+    async def send_r2r(self, event_name: str,
+                       data: BaseDTO | BaseResponse | RootModel | Any,
+                       to: str | None = None,
+                       namespace: str | None = None, timeout: int = 60,
+                       **additional_arguments):
+        """
+        ## Send Request-to-Response
+
+        Sends event with acknowledgement ID to the client given in `to` and waits for it's response.
+        Raises `TimeoutError` if client doesn't respond in `timeout` seconds.
+        """
+        namespace = namespace or "/"
+        if to is None:
+            raise ValueError("Request-to-response requires session ID of the client in `to`")
+        if (connection := self._manager.connection(to, namespace)) is None:
+            raise ConnectionError(f"Client `{to}` is not connected to namespace `{namespace}`")
+
+        ack_id = connection.next_ack()
+        future = connection.acks[ack_id] = asyncio.get_running_loop().create_future()
+        self._push(connection, self._dumps([EVENT, namespace, event_name, self._prepare(data), ack_id]))
+
+        try:
+            return await asyncio.wait_for(future, timeout)
+        finally:
+            connection.acks.pop(ack_id, None)
+
+    async def subscribe(self, sid: str, room_name: str,
+                        namespace: str | None = None,
+                        exclude_events: list[str] = []):
+        namespace = namespace or "/"
+        if (connection := self._manager.connection(sid, namespace)) is None:
+            return
+
+        self._manager.exclusions.add(namespace, room_name, sid, exclude_events)
+        self._manager.enter_room(sid, namespace, room_name, connection)
+
+    async def unsubscribe(self, sid: str, room_name: str,
+                          namespace: str | None = None):
+        namespace = namespace or "/"
+        self._manager.exclusions.discard(namespace, room_name, sid)
+        self._manager.leave_room(sid, namespace, room_name)
+
+    async def disconnect(self, sid: str, namespace: str | None = None):
+        namespace = namespace or "/"
+        if (connection := self._manager.connection(sid, namespace)) is not None:
+            await self._leave(connection, namespace, "server disconnect")
@@ -1,15 +1,36 @@
 from json import JSONDecodeError
-from logging import Logger, getLogger
+from logging import ERROR, Logger, getLogger
 from fastapi import HTTPException
 from pydantic import ValidationError
 from plugins.liveapi.context import SIOContext
+from plugins.liveapi.engines.packet import EncodedPacket
+from plugins.liveapi.logs import ErrorLogLimiter
 
 
 class ErrorHandler:
     def __init__(self, logger: Logger = getLogger("ascender-plugins"),
-                 event_name: str = "error") -> None:
+                 event_name: str = "error",
+                 error_log_interval: float = 1.0) -> None:
         self.logger = logger
         self.event_name = event_name
+        # NOTE: Repeated errors of the same event and type are logged at most once per interval, suppressed ones are counted
+        self.error_log_limiter = ErrorLogLimiter(error_log_interval)
+
+        # NOTE: Response of internal server error never changes, so it's encoded only once
+        self._internal_error: EncodedPacket | None = None
+
+    @staticmethod
+    def classify(exception: Exception) -> str:
+        """
+        Class of the error, the same classes are handled by this error handler (`http`, `validation`, `json` and `internal`)
+        """
+        if isinstance(exception, HTTPException):
+            return "http"
+        if isinstance(exception, ValidationError):
+            return "validation"
+        if isinstance(exception, JSONDecodeError):
+            return "json"
+        return "internal"
 
     async def __call__(self, ctx: SIOContext,
                        current_event: str,
@@ -17,7 +38,13 @@ class ErrorHandler:
         if current_event == "connect":
             await ctx.reject_client()
 
-        self.logger.error(f"([purple]{ctx.namespace}[/purple]) failed to process event message {exception}")
+        if self.logger.isEnabledFor(ERROR) and \
+                (suppressed := self.error_log_limiter.allow((ctx.namespace, current_event, type(exception)))) is not None:
+            if suppressed:
+                self.logger.error("([purple]%s[/purple]) failed to process event message %s (%d similar errors suppressed)",
+                                  ctx.namespace, exception, suppressed)
+            else:
+                self.logger.error("([purple]%s[/purple]) failed to process event message %s", ctx.namespace, exception)
         if isinstance(exception, HTTPException):
             await ctx.reply(self.event_name,
                             {"status_code": exception.status_code, "detail": exception.detail})
@@ -30,5 +57,6 @@ class ErrorHandler:
                             {"status_code": 422, "detail": f"JSON Serializer Error: {exception}"})
         
         else:
-            await ctx.reply(self.event_name,
-                            {"status_code": 500, "detail": "Internal Server Error"})
\ No newline at end of file
+            if self._internal_error is None:
+                self._internal_error = ctx.engine.encode({"status_code": 500, "detail": "Internal Server Error"})
+            await ctx.reply(self.event_name, self._internal_error)
\ No newline at end of file
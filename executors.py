@@ -0,0 +1,98 @@
+import asyncio
+import importlib
+import inspect
+import pickle
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Any, Callable
+
+
+EXECUTION_MODES = ("loop", "thread", "process")
+
+
+def _run_in_process(reference: tuple[str, str], instance: Any, payload: dict[str, Any]) -> Any:
+    """
+    Entry point of worker process, resolves callback by it's import path, because decorated callbacks can't be pickled by themselves
+    """
+    module_name, qualname = reference
+    target = importlib.import_module(module_name)
+    for name in qualname.split("."):
+        target = getattr(target, name)
+
+    target = inspect.unwrap(target)
+    if instance is not None:
+        return target(instance, **payload)
+    return target(**payload)
+
+
+class ProcessTarget:
+    """
+    Picklable reference to callback executed in process pool
+    """
+    __slots__ = ("reference", "instance")
+
+    def __init__(self, callback: Callable[..., Any]) -> None:
+        function = getattr(callback, "__func__", callback)
+        self.instance = getattr(callback, "__self__", None)
+        self.reference = (function.__module__, function.__qualname__)
+
+        if "<locals>" in function.__qualname__:
+            raise TypeError(f"Callback `{function.__qualname__}` can't be executed in process, it has to be importable")
+
+        if self.instance is not None:
+            try:
+                pickle.dumps(self.instance)
+            except Exception as e:
+                raise TypeError(f"Callback `{function.__qualname__}` can't be executed in process, "
+                                f"`{type(self.instance).__name__}` instance can't be pickled: {e}")
+
+    def __call__(self, payload: dict[str, Any]) -> Callable[[], Any]:
+        return partial(_run_in_process, self.reference, self.instance, payload)
+
+
+class ExecutorPools:
+    """
+    ## Executor Pools
+
+    Thread and process pools used to offload blocking and CPU-bound listeners (`LiveEvent(..., execution="thread" | "process")`)
+    and sync dependencies. Pools are created lazily on first use.
+
+    Args:
+        thread_workers (int | None, optional): Size of thread pool. Defaults to `ThreadPoolExecutor`'s default.
+        process_workers (int | None, optional): Size of process pool. Defaults to amount of CPUs.
+    """
+
+    def __init__(self, thread_workers: int | None = None,
+                 process_workers: int | None = None) -> None:
+        self.thread_workers = thread_workers
+        self.process_workers = process_workers
+
+        self._thread: ThreadPoolExecutor | None = None
+        self._process: ProcessPoolExecutor | None = None
+
+    @property
+    def thread(self) -> ThreadPoolExecutor:
+        if self._thread is None:
+            self._thread = ThreadPoolExecutor(max_workers=self.thread_workers,
+                                              thread_name_prefix="liveapi")
+        return self._thread
+
+    @property
+    def process(self) -> ProcessPoolExecutor:
+        if self._process is None:
+            self._process = ProcessPoolExecutor(max_workers=self.process_workers)
+        return self._process
+
+    def executor(self, execution: str) -> Executor:
+        return self.process if execution == "process" else self.thread
+
+    async def run(self, execution: str, function: Callable[[], Any]) -> Any:
+        return await asyncio.get_running_loop().run_in_executor(self.executor(execution), function)
+
+    def shutdown(self):
+        if self._thread is not None:
+            self._thread.shutdown(wait=False, cancel_futures=True)
+            self._thread = None
+        if self._process is not None:
+            self._process.shutdown(wait=False, cancel_futures=True)
+            self._process = None
@@ -2,34 +2,131 @@ from logging import Logger, getLogger
 from typing import Any, Awaitable, Callable
 
 from fastapi.params import Depends
+from plugins.liveapi.admission import AdmissionController, AdmissionPolicy
 from plugins.liveapi.engines.base import BaseEngine
+from plugins.liveapi.executors import ExecutorPools
 from plugins.liveapi.listener import Listener
+from plugins.liveapi.logs import LogSampling
+from plugins.liveapi.metrics import MetricsRegistry
+from plugins.liveapi.plan import InvocationPlan
+from plugins.liveapi.router import EventRouter
+
+
+async def accept_connection():
+    """
+    `connect` listener registered for namespaces which don't have their own one, but use connection-scoped dependencies
+    """
+    return None
 
 
 class SIOHandler:
     def __init__(
             self, engine: BaseEngine,
             listeners: list[Listener] = [],
-            logger: Logger = getLogger("ascender-plugins")
+            logger: Logger = getLogger("ascender-plugins"),
+            admission: AdmissionPolicy | None = None,
+            executors: ExecutorPools | None = None,
+            metrics: MetricsRegistry | None = None,
+            log_sampling: LogSampling | None = None
         ) -> None:
         self.engine = engine
         self.listeners = listeners
         self.logger = logger
+        self.executors = executors or ExecutorPools()
+        self.metrics = metrics
+        self.log_sampling = log_sampling
+
+        # NOTE: Admission state of each client is dropped as soon as client disconnects
+        self.admission = AdmissionController(admission or AdmissionPolicy())
+        self.engine.on_disconnect(self.admission.forget)
     
     def add_listener(
             self, 
             listener: Callable[..., Awaitable[Any | None]],
             event_name: str, 
             dependencies: list[Depends] = [],
-            namespace: str | None = None
+            namespace: str | None = None,
+            admission: dict[str, Any] | None = None,
+            execution: str | None = None,
+            executor_concurrency: int | None = None
         ) -> None:
+        # NOTE: Invocation plans are compiled here once, so there is no reflection during event dispatch
+        _listener = Listener(event_name, listener, dependencies, f"/{namespace}",
+                             execution=execution, executor_concurrency=executor_concurrency,
+                             executors=self.executors).compile()
+        self.configure_admission(_listener, admission or {})
+        self.configure_metrics(_listener)
+        self.configure_logging(_listener)
         self.logger.debug(f"([purple]{namespace}[/purple]) Successfully initialized [cyan]{event_name}[/cyan] event-listener")
-        self.listeners.append(Listener(event_name, listener, dependencies, f"/{namespace}"))
+        self.listeners.append(_listener)
+
+    def configure_admission(self, listener: Listener, options: dict[str, Any]):
+        """
+        Applies admission limits to listener, options given in `LiveEvent` override plugin-wide policy.
+        NOTE: `connect` and `disconnect` events are never limited
+        """
+        if listener.event_name in ("connect", "disconnect"):
+            return
+
+        policy = self.admission.policy.merge(**options) if options else self.admission.policy
+        if policy.is_unlimited:
+            return
+
+        listener.admission = self.admission
+        listener.admission_policy = policy
+        # NOTE: Listener with it's own concurrency limit has it's own slots, otherwise slots are shared by every event of the client
+        listener.admission_key = f"{listener.namespace}:{listener.event_name}" if options.get("max_concurrency") is not None else None
+
+    def configure_metrics(self, listener: Listener):
+        # NOTE: Metrics of each event are allocated at registration time, so event dispatch doesn't look them up
+        if self.metrics is not None:
+            listener.metrics = self.metrics.event(listener.namespace, listener.event_name)
+
+    def configure_logging(self, listener: Listener):
+        # NOTE: Samplers are keyed by event name of the listener, so each pattern listener has single sampler for every event it receives
+        if self.log_sampling is not None:
+            listener.log_sampler = self.log_sampling.sampler(listener.event_name)
+
+    def bind_connection_dependencies(self):
+        """
+        Connection-scoped dependencies of every listener in namespace are resolved eagerly by `connect` listener of the namespace,
+        while request headers and authorization of the connection are still available.
+        """
+        connection_plans: dict[str, dict[Callable[..., Any], InvocationPlan]] = {}
+        connect_listeners: dict[str, Listener] = {}
+
+        for listener in self.listeners:
+            if listener.event_name == "connect":
+                connect_listeners[listener.namespace] = listener
+            for plan in listener.collect_connection_plans():
+                connection_plans.setdefault(listener.namespace, {}).setdefault(plan.callback, plan)
+
+        for namespace, plans in connection_plans.items():
+            if (connect_listener := connect_listeners.get(namespace)) is None:
+                connect_listener = Listener("connect", accept_connection, [], namespace,
+                                            executors=self.executors).compile()
+                self.configure_metrics(connect_listener)
+                self.configure_logging(connect_listener)
+                self.listeners.append(connect_listener)
+
+            connect_listener.connection_plans = list(plans.values())
+            connect_listener.share_dependencies()
     
     def run_listener(self, listener: Listener):
         self.engine.receive_event(listener.event_name,
                                   listener.__call__, listener.namespace)
     
     def run_listeners(self):
+        self.bind_connection_dependencies()
+
+        # NOTE: Listeners of patterns are collected into single router per namespace, which is the catch-all handler of the namespace
+        routers: dict[str, EventRouter] = {}
         for listener in self.listeners:
-            self.run_listener(listener)
\ No newline at end of file
+            if EventRouter.is_pattern(listener.event_name):
+                routers.setdefault(listener.namespace, EventRouter(listener.namespace)).add(listener)
+            else:
+                self.run_listener(listener)
+
+        for namespace, router in routers.items():
+            self.engine.receive_event("*", router.dispatch, namespace)
+            self.logger.debug(f"([purple]{namespace}[/purple]) Routing {len(router.listeners)} event patterns")
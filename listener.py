@@ -1,32 +1,59 @@
+import asyncio
 import inspect
-from typing import Any, Awaitable, Callable
+from functools import partial
+from logging import INFO
+from time import perf_counter
+from typing import Any, Awaitable, Callable, Iterable
 
-from pydantic import BaseModel
-
-from core.optionals.base.dto import BaseDTO
-from core.optionals.base.response import BaseResponse
 from core.registries.service import ServiceRegistry
 from plugins.liveapi.context import SIOContext
-from fastapi.params import Depends, Header
+from fastapi.params import Depends
 
+from plugins.liveapi.admission import AdmissionController, AdmissionDropped, AdmissionPolicy, AdmissionRejected
 from plugins.liveapi.engines.base import BaseEngine
 from plugins.liveapi.error import ErrorHandler
-from plugins.liveapi.types.authorization import SIOAuthorization
-from plugins.liveapi.utils.validation import isvalid
-from plugins.liveapi.validation.depends import ValidationDepends
-from plugins.liveapi.validation.strategies.authorization import AuthorizationValidationStrategy
-from plugins.liveapi.validation.strategies.general import GeneralValidationStrategy
-from plugins.liveapi.validation.strategies.headers import HeaderValidationStrategy
-from plugins.liveapi.validation.strategies.jsonv import JSONValidationStrategy
-from plugins.liveapi.validation.validation import Validator
+from plugins.liveapi.executors import ExecutorPools
+from plugins.liveapi.logs import LogSampler
+from plugins.liveapi.metrics import EventMetrics, emit_time
+from plugins.liveapi.plan import InvocationPlan, is_concurrent, share_dependencies
+from plugins.liveapi.validation.depends import dependency_scope
+from plugins.liveapi.validation.payload import EventPayload
+
+
+async def gather_dependencies(coroutines: Iterable[Awaitable[Any]], concurrent: bool = True) -> list[Any]:
+    """
+    Runs dependencies concurrently, if one of them fails then the rest are cancelled and it's exception is raised as is.
+
+    NOTE: If dependencies aren't `concurrent` they are awaited one by one, without scheduling of tasks
+    """
+    if not concurrent:
+        return [await coroutine for coroutine in coroutines]
+
+    coroutines = list(coroutines)
+    if len(coroutines) == 1:
+        return [await coroutines[0]]
+
+    tasks = [asyncio.ensure_future(coroutine) for coroutine in coroutines]
+    try:
+        return await asyncio.gather(*tasks)
+    except BaseException:
+        for task in tasks:
+            task.cancel()
+        raise
 
 
 class Listener:
+    plan: InvocationPlan | None
+    dependency_plans: list[InvocationPlan]
+
     def __init__(
-            self, event_name: str, 
+            self, event_name: str,
             callback: Callable[..., Awaitable[Any | None]],
             dependencies: list[Depends] = [],
-            namespace: str | None = None
+            namespace: str | None = None,
+            execution: str | None = None,
+            executor_concurrency: int | None = None,
+            executors: ExecutorPools | None = None
         ) -> None:
 
         self.event_name = event_name
@@ -34,136 +61,305 @@ class Listener:
         self.dependencies = dependencies
         self.namespace = namespace
         self.service_registry = ServiceRegistry()
-    
-    def get_parameters(self, callback: Callable[..., Awaitable[Any | None]]) -> dict[str, inspect.Parameter]:
-        parameters = inspect.signature(callback).parameters
-
-        _formated: dict[str, BaseDTO | BaseResponse | Any] = {}
-
-        for name, param in parameters.items():
-            _formated[name] = param
-        
-        return _formated
-    
-    def process_parameters(
-            self, 
-            params: dict[str, inspect.Parameter],
-            data: Any,
+
+        # NOTE: Execution mode of callback (`loop`, `thread` or `process`), by default coroutines are executed in event loop and sync callables in thread pool
+        self.execution = execution
+        self.executors = executors or ExecutorPools()
+        self.executor_limit = asyncio.Semaphore(executor_concurrency) if executor_concurrency else None
+
+        self.plan = None
+        self.dependency_plans = []
+        # NOTE: Connection-scoped dependencies of whole namespace, resolved eagerly by `connect` listener
+        self.connection_plans: list[InvocationPlan] = []
+        # NOTE: Whether listener-level dependencies are executed concurrently, set by `share_dependencies`
+        self.concurrent = False
+
+        self._engine: BaseEngine | None = None
+        self._error_handler: ErrorHandler | None = None
+
+        # NOTE: Admission control of inbound events, configured by `SIOHandler`. `None` if listener has no limits
+        self.admission: AdmissionController | None = None
+        self.admission_policy: AdmissionPolicy | None = None
+        self.admission_key: str | None = None
+
+        # NOTE: Metrics of the listener, set by `SIOHandler` if metrics are enabled
+        self.metrics: EventMetrics | None = None
+        # NOTE: Sampler of log lines of processed events, set by `SIOHandler`. `None` if every event is logged
+        self.log_sampler: LogSampler | None = None
+
+    def compile(self):
+        """
+        Compiles invocation plans of listener's callback and of every listener-level dependency.
+
+        NOTE: Signatures of callbacks are inspected only here, once per listener. During event dispatch only prebuilt resolvers are used.
+        """
+        self.plan = InvocationPlan(self.callback, execution=self.execution)
+        self.dependency_plans = [InvocationPlan(dependency.dependency, use_cache=dependency.use_cache,
+                                                scope=dependency_scope(dependency))
+                                 for dependency in self.dependencies]
+        self.share_dependencies()
+        return self
+
+    def share_dependencies(self):
+        """
+        Counts dependants of every dependency executed during event of this listener, has to be called again if `connection_plans` are changed.
+        """
+        share_dependencies([*self.dependency_plans, *self.connection_plans,
+                            *(dependency.plan for dependency in self.plan.dependencies)])
+        self.concurrent = is_concurrent([*self.dependency_plans, *self.connection_plans])
+
+    @property
+    def engine(self) -> BaseEngine:
+        # SocketIO engine - Is the main server engine allows to run SIO
+        # NOTE: It also responsible for generation `SIOContext` which is used in SocketIO Context (CTX)
+        if self._engine is None:
+            self._engine = self.service_registry.get_singletone(BaseEngine)
+        return self._engine
+
+    @property
+    def error_handler(self) -> ErrorHandler:
+        # NOTE: Error handler here handles that are same as FastAPI's error handler,
+        # It handles FastAPI's HTTPException and during connection it refuses connection and during events it sends error messages
+        if self._error_handler is None:
+            self._error_handler = self.service_registry.get_singletone(ErrorHandler)
+        return self._error_handler
+
+    async def invoke(
+            self,
+            plan: InvocationPlan,
+            _ctx: SIOContext,
+            data: EventPayload,
             headers: dict[str, str] | None,
-            _ctx: SIOContext
+            cache: dict[Callable[..., Any], asyncio.Future]
         ):
-        payload: dict[str, Any] = {}
+        # Preparing payload with all collected earlier data
+        payload = plan.resolve(data, headers, _ctx)
+        payload = await self.invoke_paramdeps(plan, payload, data, headers, _ctx, cache)
 
-        for name, param in params.items():
-            payload[name] = self.validate_parameter(name, param,
-                                                    data, headers, _ctx)
-        
-        return payload
-    
-    def validate_parameter(
+        return await self.execute(plan, payload)
+
+    async def execute(self, plan: InvocationPlan, payload: dict[str, Any]):
+        """
+        Executes callback of the plan in it's execution mode, blocking and CPU-bound callbacks are offloaded to executor pools
+        """
+        if plan.execution == "loop":
+            response = plan.callback(**payload)
+            # NOTE: Sync callables may still return awaitables (e.g. `functools.partial` of coroutine function), they are awaited as well
+            return await response if plan.is_coroutine or inspect.isawaitable(response) else response
+
+        if plan.execution == "process":
+            function = plan.process_target(payload)
+        else:
+            function = partial(plan.callback, **payload)
+
+        # NOTE: Concurrency cap applies only to listener's own callback, not to it's dependencies
+        if self.executor_limit is None or plan is not self.plan:
+            response = await self.executors.run(plan.execution, function)
+        else:
+            async with self.executor_limit:
+                response = await self.executors.run(plan.execution, function)
+
+        return await response if inspect.isawaitable(response) else response
+
+    async def invoke_dependency(
             self,
-            name: str,
-            param: inspect.Parameter,
-            data: Any,
+            plan: InvocationPlan,
+            _ctx: SIOContext,
+            data: EventPayload,
             headers: dict[str, str] | None,
-            _ctx: SIOContext
+            cache: dict[Callable[..., Any], asyncio.Future]
         ):
-        if isvalid(param.annotation, SIOContext) or name == "ctx":
-            return _ctx
-        
-        if isvalid(Header, param.default):
-            validator = Validator(HeaderValidationStrategy())
-            return validator.validate(param, headers)
-        
-        if isvalid(Depends, param.default):
-            return ValidationDepends(param, param.default.dependency,
-                                     use_cache=param.default.use_cache)
-        
-        if isinstance(param.annotation, type) and issubclass(param.annotation, SIOAuthorization):
-            validator = Validator(AuthorizationValidationStrategy())
-            return validator.validate(param, data)
-        
-        if isvalid(param.annotation, BaseModel):
-            validator = Validator(JSONValidationStrategy())
-            return validator.validate(param, data)
-        
-        validator = Validator(GeneralValidationStrategy())
-        return validator.validate(param, data)
+        """
+        Invokes dependency, if dependency is shared by several dependants then it's executed only once per event
+        and every dependant awaits the same result.
+        """
+        if plan.scope == "connection":
+            return await self.invoke_connection_dependency(plan, _ctx, data, headers, cache)
 
-    async def invoke(
-            self, 
-            callback: Callable[..., Awaitable[Any | None]], 
-            sid: str, data: Any, 
-            *args, **kwargs
+        # NOTE: Dependency which has single dependant is executed only once anyway, so it's awaited inline
+        if not plan.shared:
+            return await self.invoke(plan, _ctx, data, headers, cache)
+
+        if (future := cache.get(plan.callback)) is None:
+            future = cache[plan.callback] = asyncio.ensure_future(self.invoke(plan, _ctx, data, headers, cache))
+
+        return await future
+
+    async def invoke_connection_dependency(
+            self,
+            plan: InvocationPlan,
+            _ctx: SIOContext,
+            data: EventPayload,
+            headers: dict[str, str] | None,
+            cache: dict[Callable[..., Any], asyncio.Future]
         ):
-        # SocketIO engine - Is the main server engine allows to run SIO
-        # NOTE: It also responsible for generation `SIOContext` which is used in SocketIO Context (CTX)
-        engine = self.service_registry.get_singletone(BaseEngine)
+        """
+        Invokes connection-scoped dependency, result is taken from socket.io session of the client if it was already resolved during this connection.
+        """
+        session = await self.engine.get_session(_ctx.session_id, self.namespace)
+        if plan.session_key in session:
+            return session[plan.session_key]
 
-        # NOTE: Error handler here handles that are same as FastAPI's error handler,
-        # It handles FastAPI's HTTPException and during connection it refuses connection and during events it sends error messages
-        error_handler = self.service_registry.get_singletone(ErrorHandler)
-        
-        # NOTE: These parameters are params defined in Listener's callback function or Guard's `handle_access` function.
-        # It extracts annotations and default types of function for further *validation* and *assignation* purposes
-        params = self.get_parameters(callback)
+        if not plan.shared:
+            response = await self.invoke(plan, _ctx, data, headers, cache)
+        else:
+            if (future := cache.get(plan.callback)) is None:
+                future = cache[plan.callback] = asyncio.ensure_future(self.invoke(plan, _ctx, data, headers, cache))
+            response = await future
+
+        session[plan.session_key] = response
+        await self.engine.save_session(_ctx.session_id, session, self.namespace)
+
+        return response
+
+    def collect_connection_plans(self) -> list[InvocationPlan]:
+        """
+        Collects every connection-scoped dependency used by this listener
+        """
+        plans: list[InvocationPlan] = []
+        for plan in [*self.dependency_plans, self.plan]:
+            plans.extend(plan.connection_plans())
+        return plans
+
+    async def invoke_paramdeps(
+            self,
+            plan: InvocationPlan,
+            payload: dict[str, Any],
+            data: EventPayload,
+            headers: dict[str, str] | None,
+            _ctx: SIOContext,
+            cache: dict[Callable[..., Any], asyncio.Future]
+        ):
+        """
+        Invokes parameter dependnecies.
+
+        In FastAPI there are parameter dependencies, the dependencies that are defined straight in parameter of router endpoint.
+        To replicate this, each parameter wrapped by FastAPI's `params.Depends` class has it's own compiled plan
+        which is invoked recursively and it's response is validated against annotation of the parameter.
+
+        NOTE: Dependencies of the same callback don't depend on each other, so they are executed concurrently if at least two of them suspend
+        """
+        if not plan.dependencies:
+            return payload
+
+        responses = await gather_dependencies((self.invoke_dependency(dependency.plan, _ctx, data, headers, cache)
+                                               for dependency in plan.dependencies), plan.concurrent)
+
+        for dependency, response in zip(plan.dependencies, responses):
+            payload[dependency.name] = dependency.resolve(response, headers, _ctx)
+
+        return payload
+
+    async def __call__(self, sid: str, data: Any = None, *args, event_name: str | None = None, **kwargs):
+        if self.plan is None:
+            self.compile()
 
         # SIO Context (SocketIO Context) - Is context manager for each `event` created new asyncio thread and each of them do have SIOContext
         # NOTE: SIOContext may differ in each event request as because it contains information about current request
         # It also differs if there is different namespace
         # It contains additional `reply` and `streaming_response` methods allowing developers to use them if for quick actions and comfortability
-        _ctx = SIOContext(engine, self.namespace,
-                          self.event_name, sid)
-        
+        # NOTE: Listeners of patterns (`EventRouter`) get actual name of received event
+        _ctx = SIOContext(self.engine, self.namespace,
+                          event_name or self.event_name, sid)
+
+        slots = None
+        if self.admission is not None:
+            try:
+                slots = await self.admission.acquire(sid, self.event_name, self.admission_policy, self.admission_key)
+            except AdmissionDropped:
+                return None
+            except AdmissionRejected as e:
+                await self.error_handler(_ctx, self.event_name, e)
+                return None
+
+        try:
+            return await self.dispatch(_ctx, sid, data)
+        finally:
+            if slots is not None:
+                self.admission.release(slots)
+
+    async def run(
+            self,
+            _ctx: SIOContext,
+            data: EventPayload,
+            headers: dict[str, str] | None,
+            cache: dict[Callable[..., Any], asyncio.Future]
+        ):
+        if self.dependency_plans or self.connection_plans:
+            await gather_dependencies((self.invoke_dependency(plan, _ctx, data, headers, cache)
+                                       for plan in [*self.dependency_plans, *self.connection_plans]), self.concurrent)
+
+        # Executing the Listener's callback function and handling errors it may raise
+        # The priority exceptions are ValidationError and HTTPException
+        return await self.invoke(self.plan, _ctx, data, headers, cache)
+
+    async def measured_run(
+            self,
+            metrics: EventMetrics,
+            _ctx: SIOContext,
+            data: EventPayload,
+            headers: dict[str, str] | None,
+            cache: dict[Callable[..., Any], asyncio.Future]
+        ):
+        """
+        The same as `run`, but records duration of every phase of the event. Phases which weren't reached because of error are not recorded.
+
+        NOTE: Emits made during the event are recorded as `emit` phase and are subtracted from phase which made them
+        """
+        metrics.invocations += 1
+        spent = [0.0]
+        token = emit_time.set(spent)
+        started = perf_counter()
+        try:
+            if self.dependency_plans or self.connection_plans:
+                await gather_dependencies((self.invoke_dependency(plan, _ctx, data, headers, cache)
+                                           for plan in [*self.dependency_plans, *self.connection_plans]), self.concurrent)
+
+            resolved = perf_counter()
+            payload = self.plan.resolve(data, headers, _ctx)
+            validated = perf_counter()
+            metrics.phases["validation"].observe(validated - resolved)
+
+            payload = await self.invoke_paramdeps(self.plan, payload, data, headers, _ctx, cache)
+            executed = perf_counter()
+            dependency_emits = spent[0]
+            metrics.phases["dependency"].observe((resolved - started) + (executed - validated) - dependency_emits)
+
+            response = await self.execute(self.plan, payload)
+            metrics.phases["callback"].observe(perf_counter() - executed - (spent[0] - dependency_emits))
+            return response
+        finally:
+            metrics.phases["emit"].observe(spent[0])
+            metrics.phases["total"].observe(perf_counter() - started)
+            emit_time.reset(token)
+
+    async def dispatch(self, _ctx: SIOContext, sid: str, data: Any):
         # NOTE: Headers are presented only during `on_connect` event. After successfully estabilishing connection, headers will be always `None`
         headers: dict[str, str] | None = None
         if isinstance(data, dict) and self.event_name == "connect":
             headers = {k.decode(): v.decode() for k, v in data.get("asgi.scope", {}).get("headers", [])}
 
+        # NOTE: Payload is decoded lazily and at most once, then shared by every strategy and dependency of this event
+        data = EventPayload(data, self.engine.serializer.loads)
+
+        # NOTE: Results of dependencies which use cache, shared by every dependant during this event
+        cache: dict[Callable[..., Any], asyncio.Future] = {}
+
         try:
-            # Preparing payload with all collected earlier data
-            payload = self.process_parameters(params, data, headers, _ctx)
-            payload = await self.invoke_paramdeps(payload, data, headers, _ctx)
-            # Executing the Listener's callback function and handling errors it may raise
-            # The priority exceptions are ValidationError and HTTPException
-            _response = await callback(**payload)
+            if self.metrics is not None:
+                _response = await self.measured_run(self.metrics, _ctx, data, headers, cache)
+            else:
+                _response = await self.run(_ctx, data, headers, cache)
 
         except Exception as e:
-            await error_handler(_ctx, self.event_name, e)
+            if self.metrics is not None:
+                self.metrics.errors[self.error_handler.classify(e)] += 1
+            await self.error_handler(_ctx, self.event_name, e)
             raise e
 
-        error_handler.logger.info(f"([purple]{self.namespace}[/purple]) received [green]{self.event_name}[/green] event message")
+        # NOTE: Message is formatted only if it's logged, disabled level or skipped sample cost a single check
+        logger = self.error_handler.logger
+        if logger.isEnabledFor(INFO) and (self.log_sampler is None or self.log_sampler()):
+            logger.info("([purple]%s[/purple]) received [green]%s[/green] event message", self.namespace, _ctx.event_name)
 
         return _response
-    
-    async def invoke_paramdeps(
-            self, 
-            payload: dict[str, Any],
-            data: Any, 
-            headers: dict[str, str] | None,
-            _ctx: SIOContext,
-            *args, **kwargs
-        ):
-        """
-        Invokes parameter dependnecies.
-
-        In FastAPI there are parameter dependencies, the dependencies that are defined straight in parameter of router endpoint.
-        To replicate this we have `invoke_paramdeps` method which will double loop through payload that was outputed invoke itself.
-        If it finds parameter which is wrapped by FastAPI's `params.Depends` class, it will call new `invoke` method recursively
-        """
-        for name, obj in payload.items():
-            if isinstance(obj, ValidationDepends):
-                response = await self.invoke(obj.dependency, _ctx.session_id, data, *args, **kwargs)
-                response = self.validate_parameter(name, inspect.Parameter(obj.param.name, obj.param.kind,
-                                                                           annotation=obj.param.annotation), response, headers, _ctx)
-                payload[name] = response
-        
-        return payload
-        
-
-    async def __call__(self, sid: str, data: Any, *args, **kwargs):
-        for dependency in self.dependencies:
-            await self.invoke(dependency.dependency, sid, data, *args, **kwargs)
-        
-        return await self.invoke(self.callback, sid, data, *args, **kwargs)
-        
\ No newline at end of file
@@ -0,0 +1,122 @@
+from logging import Handler, Logger
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+from time import monotonic
+from typing import Hashable
+
+
+class LogSampler:
+    """
+    Deterministic sampler of per-event log lines, `rate` of 0.1 logs every 10th event and rate of 0 disables logging of the event.
+    Sampling is a counter increment, so skipped events cost nothing else.
+    """
+    __slots__ = ("every", "_count")
+
+    def __init__(self, rate: float) -> None:
+        self.every = max(round(1 / rate), 1) if rate > 0 else 0
+        self._count = 0
+
+    def __call__(self) -> bool:
+        if not self.every:
+            return False
+
+        self._count += 1
+        if self._count < self.every:
+            return False
+        self._count = 0
+        return True
+
+
+class LogSampling:
+    """
+    ## Log Sampling
+
+    Sampling rates of log lines of processed events, per event name (or pattern of `LiveEvent`).
+
+    Args:
+        rate (float, optional): Rate of events which are not listed in `rates`. Defaults to 1 (every event is logged).
+        rates (dict[str, float] | None, optional): Rates of specific events. Defaults to None.
+    """
+
+    def __init__(self, rate: float = 1.0, rates: dict[str, float] | None = None) -> None:
+        self.rate = rate
+        self.rates = rates or {}
+
+    def sampler(self, event_name: str) -> LogSampler | None:
+        """
+        Sampler of the event, `None` if every event is logged
+        """
+        rate = self.rates.get(event_name, self.rate)
+        return None if rate >= 1 else LogSampler(rate)
+
+
+class ErrorLogLimiter:
+    """
+    Rate limit of repeated error logs, errors of the same key are logged at most once per `interval` seconds.
+    Suppressed errors are counted and the count is reported with the next logged error of the key.
+
+    Args:
+        interval (float, optional): Minimal interval in seconds between logs of the same key. Defaults to 1.
+        max_keys (int, optional): Maximal amount of tracked keys. Defaults to 1024.
+    """
+
+    def __init__(self, interval: float = 1.0, max_keys: int = 1024) -> None:
+        self.interval = interval
+        self.max_keys = max_keys
+        # key -> (time of last logged error, amount of suppressed errors since then)
+        self._keys: dict[Hashable, tuple[float, int]] = {}
+
+    def allow(self, key: Hashable) -> int | None:
+        """
+        Returns amount of suppressed errors if error should be logged, `None` if it should be suppressed
+        """
+        now = monotonic()
+        if (state := self._keys.get(key)) is not None and now - state[0] < self.interval:
+            self._keys[key] = (state[0], state[1] + 1)
+            return None
+
+        if state is None and len(self._keys) >= self.max_keys:
+            # NOTE: Dictionaries keep insertion order, so the oldest key is dropped
+            self._keys.pop(next(iter(self._keys)))
+        self._keys[key] = (now, 0)
+        return state[1] if state is not None else 0
+
+
+class QueueLogging:
+    """
+    ## Queue Logging
+
+    Moves handlers of the logger to background thread, so log records are only put into queue on event loop
+    and I/O of handlers never blocks it.
+
+    Only handlers attached to the logger itself are moved, propagation of the logger is left as is,
+    so handlers of parent loggers (e.g. root logger configured by application) keep receiving records.
+    """
+
+    def __init__(self, logger: Logger) -> None:
+        self.logger = logger
+        self._listener: QueueListener | None = None
+        self._handlers: list[Handler] | None = None
+
+    def start(self):
+        if self._listener is not None or not (handlers := list(self.logger.handlers)):
+            return
+
+        queue: SimpleQueue = SimpleQueue()
+        self._handlers = handlers
+        self._listener = QueueListener(queue, *handlers, respect_handler_level=True)
+
+        self.logger.handlers = [QueueHandler(queue)]
+        self._listener.start()
+
+    def stop(self):
+        """
+        Restores handlers of the logger, records which are still queued are handled before it returns
+        """
+        if self._listener is None:
+            return
+
+        self._listener.stop()
+        self._listener = None
+        self.logger.handlers = self._handlers
+        self._handlers = None
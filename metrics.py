@@ -0,0 +1,150 @@
+from bisect import bisect_left
+from contextvars import ContextVar
+from typing import Any, Callable
+
+# Upper bounds of latency buckets in seconds
+DEFAULT_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01,
+                   0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+PHASES = ("dependency", "validation", "callback", "emit", "total")
+ERROR_CLASSES = ("http", "validation", "json", "internal")
+
+# NOTE: Time spent by emits of inbound event which is being processed, set by listener for the duration of the event
+emit_time: ContextVar[list[float] | None] = ContextVar("liveapi_emit_time", default=None)
+
+
+class Histogram:
+    """
+    Histogram with preallocated buckets, observing value is a single bisect and two increments.
+
+    NOTE: Metrics are updated only from event loop thread, so there is no locking
+    """
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class EventMetrics:
+    """
+    Metrics of inbound event of a single (namespace, event_name), preallocated when listener is registered
+    """
+    __slots__ = ("invocations", "errors", "phases")
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.invocations = 0
+        self.errors = dict.fromkeys(ERROR_CLASSES, 0)
+        self.phases = {phase: Histogram(buckets) for phase in PHASES}
+
+
+class OutboundMetrics:
+    """
+    Metrics of outbound event of a single (namespace, event_name)
+    """
+    __slots__ = ("messages", "bytes", "latency")
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.messages = 0
+        self.bytes = 0
+        self.latency = Histogram(buckets)
+
+
+class MetricsRegistry:
+    """
+    ## Metrics Registry
+
+    Collects metrics of LiveAPI hot paths and renders them in Prometheus text exposition format.
+
+    Gauges (connected clients, rooms) are collected only when metrics are scraped, from `gauges` callbacks.
+    Callback returns `{name: (description, {labels: value})}`, metric may also be given with it's type as `(description, values, "counter")`.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS) -> None:
+        self.buckets = buckets
+        self.inbound: dict[tuple[str, str], EventMetrics] = {}
+        self.outbound: dict[tuple[str, str], OutboundMetrics] = {}
+        self.gauges: list[Callable[[], dict[str, tuple[Any, ...]]]] = []
+
+    def event(self, namespace: str, event_name: str) -> EventMetrics:
+        if (metrics := self.inbound.get((namespace, event_name))) is None:
+            metrics = self.inbound[(namespace, event_name)] = EventMetrics(self.buckets)
+        return metrics
+
+    def emitted(self, namespace: str, event_name: str, size: int, latency: float):
+        """
+        Records outbound message, `size` is size of encoded payload (0 if it's unknown, e.g. for msgpack packets).
+        Duration of emit is also attributed to `emit` phase of inbound event which emitted it
+        """
+        if (spent := emit_time.get()) is not None:
+            spent[0] += latency
+        if (metrics := self.outbound.get((namespace, event_name))) is None:
+            metrics = self.outbound[(namespace, event_name)] = OutboundMetrics(self.buckets)
+        metrics.messages += 1
+        metrics.bytes += size
+        metrics.latency.observe(latency)
+
+    def render(self) -> str:
+        lines: list[str] = []
+
+        def header(name: str, kind: str, description: str):
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        def histogram(name: str, labels: str, value: Histogram):
+            cumulative = 0
+            for bound, count in zip(value.buckets, value.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {value.count}')
+            lines.append(f"{name}_sum{{{labels}}} {value.sum}")
+            lines.append(f"{name}_count{{{labels}}} {value.count}")
+
+        header("liveapi_events_total", "counter", "Inbound events processed by listeners")
+        for (namespace, event_name), metrics in self.inbound.items():
+            lines.append(f'liveapi_events_total{{{_labels(namespace=namespace, event=event_name)}}} {metrics.invocations}')
+
+        header("liveapi_event_errors_total", "counter", "Inbound events failed, by class of error")
+        for (namespace, event_name), metrics in self.inbound.items():
+            for error_class, count in metrics.errors.items():
+                lines.append(f'liveapi_event_errors_total{{{_labels(namespace=namespace, event=event_name, error=error_class)}}} {count}')
+
+        header("liveapi_event_duration_seconds", "histogram", "Duration of phases of inbound event processing")
+        for (namespace, event_name), metrics in self.inbound.items():
+            for phase, value in metrics.phases.items():
+                histogram("liveapi_event_duration_seconds", _labels(namespace=namespace, event=event_name, phase=phase), value)
+
+        header("liveapi_outbound_messages_total", "counter", "Outbound messages emitted")
+        for (namespace, event_name), metrics in self.outbound.items():
+            lines.append(f'liveapi_outbound_messages_total{{{_labels(namespace=namespace, event=event_name)}}} {metrics.messages}')
+
+        header("liveapi_outbound_bytes_total", "counter", "Size of encoded payloads of outbound messages")
+        for (namespace, event_name), metrics in self.outbound.items():
+            lines.append(f'liveapi_outbound_bytes_total{{{_labels(namespace=namespace, event=event_name)}}} {metrics.bytes}')
+
+        header("liveapi_emit_duration_seconds", "histogram", "Duration of emits")
+        for (namespace, event_name), metrics in self.outbound.items():
+            histogram("liveapi_emit_duration_seconds", _labels(namespace=namespace, event=event_name), metrics.latency)
+
+        for collect in self.gauges:
+            for name, (description, values, *kind) in collect().items():
+                header(name, kind[0] if kind else "gauge", description)
+                for labels, value in values.items():
+                    lines.append(f"{name}{{{_labels(**dict(labels))}}} {value}" if labels else f"{name} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _labels(**labels: Any) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
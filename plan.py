@@ -0,0 +1,204 @@
+import inspect
+from inspect import isclass
+from typing import Any, Awaitable, Callable, Iterable
+
+from fastapi.params import Depends, Header
+from pydantic import BaseModel
+
+from plugins.liveapi.context import SIOContext
+from plugins.liveapi.executors import EXECUTION_MODES, ProcessTarget
+from plugins.liveapi.types.authorization import SIOAuthorization
+from plugins.liveapi.utils.validation import isvalid
+from plugins.liveapi.validation.depends import ConnectionDepends, dependency_scope
+from plugins.liveapi.validation.strategies.authorization import AuthorizationValidationStrategy
+from plugins.liveapi.validation.strategies.general import GeneralValidationStrategy
+from plugins.liveapi.validation.strategies.headers import HeaderValidationStrategy
+from plugins.liveapi.validation.strategies.jsonv import JSONValidationStrategy
+from plugins.liveapi.validation.validation import Validator
+
+
+class ParameterResolver:
+    """
+    Compiled resolver of a single callback parameter.
+
+    Resolvers are built once when listener is registered, so during event dispatch
+    there is no more reflection or strategy selection, only call of `resolve`.
+    """
+    kind: str = "general"
+
+    def __init__(self, name: str, param: inspect.Parameter) -> None:
+        self.name = name
+        self.param = param
+
+    def resolve(self, data: Any, headers: dict[str, str] | None, ctx: SIOContext) -> Any:
+        raise NotImplementedError("Subclasses should implement this method.")
+
+
+class ContextResolver(ParameterResolver):
+    kind = "ctx"
+
+    def resolve(self, data: Any, headers: dict[str, str] | None, ctx: SIOContext) -> SIOContext:
+        return ctx
+
+
+class ValidatorResolver(ParameterResolver):
+    def __init__(self, name: str, param: inspect.Parameter,
+                 validator: Validator, kind: str) -> None:
+        super().__init__(name, param)
+        self.validator = validator
+        self.kind = kind
+
+        # NOTE: Warming up validator (e.g. type adapters) at registration time instead of first event
+        self.validator.prepare(param)
+
+    def resolve(self, data: Any, headers: dict[str, str] | None, ctx: SIOContext) -> Any:
+        return self.validator.validate(self.param, data)
+
+
+class HeaderResolver(ValidatorResolver):
+    def resolve(self, data: Any, headers: dict[str, str] | None, ctx: SIOContext) -> Any:
+        return self.validator.validate(self.param, headers)
+
+
+class DependsResolver(ParameterResolver):
+    """
+    Resolver of parameter dependency (FastAPI's `params.Depends`).
+
+    Holds compiled plan of the dependency itself and resolver which validates the dependency's response
+    against annotation of the parameter.
+    """
+    kind = "depends"
+
+    def __init__(self, name: str, param: inspect.Parameter) -> None:
+        super().__init__(name, param)
+        self.use_cache = param.default.use_cache
+        self.plan = InvocationPlan(param.default.dependency, use_cache=self.use_cache,
+                                   scope=dependency_scope(param.default))
+
+        # NOTE: Response of dependency is validated as a regular parameter without default value
+        self.result = compile_resolver(name, inspect.Parameter(param.name, param.kind,
+                                                               annotation=param.annotation))
+
+    def resolve(self, data: Any, headers: dict[str, str] | None, ctx: SIOContext) -> Any:
+        return self.result.resolve(data, headers, ctx)
+
+
+def compile_resolver(name: str, param: inspect.Parameter) -> ParameterResolver:
+    """
+    Picks resolver for the parameter, the order of checks is the same as resolution order of parameters in listener.
+    """
+    annotation = param.annotation
+
+    # NOTE: Annotations are checked as classes, `Any` annotated parameters are general parameters, not context or models
+    if (isclass(annotation) and issubclass(annotation, SIOContext)) or name == "ctx":
+        return ContextResolver(name, param)
+
+    if isvalid(Header, param.default):
+        return HeaderResolver(name, param, Validator(HeaderValidationStrategy()), "header")
+
+    if isvalid(Depends, param.default):
+        return DependsResolver(name, param)
+
+    if isclass(annotation) and issubclass(annotation, SIOAuthorization):
+        return ValidatorResolver(name, param, Validator(AuthorizationValidationStrategy()), "authorization")
+
+    if isclass(annotation) and issubclass(annotation, BaseModel):
+        return ValidatorResolver(name, param, Validator(JSONValidationStrategy()), "json")
+
+    return ValidatorResolver(name, param, Validator(GeneralValidationStrategy()), "general")
+
+
+class InvocationPlan:
+    """
+    ## Invocation Plan
+
+    Compiled form of listener callback or dependency, maps each parameter of callback to it's resolver.
+    """
+
+    def __init__(self, callback: Callable[..., Awaitable[Any | None]],
+                 use_cache: bool = True, scope: str = "event",
+                 execution: str | None = None) -> None:
+        self.callback = callback
+        # NOTE: Used only by plans of dependencies, if enabled then dependency is executed only once per event
+        self.use_cache = use_cache
+        # NOTE: Dependencies of `connection` scope are executed once per connection and stored in socket.io session
+        self.scope = scope
+        self.session_key = ConnectionDepends.session_key(callback)
+        self.resolvers: list[ParameterResolver] = [compile_resolver(name, param) for name, param
+                                                   in inspect.signature(callback).parameters.items()]
+
+        self.parameters = [resolver for resolver in self.resolvers
+                           if not isinstance(resolver, DependsResolver)]
+        self.dependencies: list[DependsResolver] = [resolver for resolver in self.resolvers
+                                                    if isinstance(resolver, DependsResolver)]
+
+        # NOTE: Sync callables are executed in thread pool by default, so they don't block event loop.
+        # Instances with `async def __call__` (e.g. `Depends(Auth())`) are coroutine functions too, classes are only instantiated
+        self.is_coroutine = inspect.iscoroutinefunction(callback) or (
+            not isclass(callback) and inspect.iscoroutinefunction(getattr(callback, "__call__", None)))
+        self.execution = execution or ("loop" if self.is_coroutine else "thread")
+        self.process_target: ProcessTarget | None = None
+
+        if self.execution not in EXECUTION_MODES:
+            raise ValueError(f"Execution mode `{self.execution}` is not supported, use one of {EXECUTION_MODES}")
+
+        if self.execution != "loop" and self.is_coroutine:
+            raise TypeError(f"`{getattr(callback, '__qualname__', callback)}` is a coroutine function, "
+                            f"only sync callables can be executed in `{self.execution}` execution mode")
+
+        if self.execution == "process":
+            if any(isinstance(resolver, ContextResolver) for resolver in self.resolvers):
+                raise TypeError(f"`{getattr(callback, '__qualname__', callback)}` can't be executed in process, SIOContext can't be passed to other process")
+            self.process_target = ProcessTarget(callback)
+
+        # NOTE: Plan suspends if it awaits anything, dependencies are scheduled concurrently only if at least two of them suspend,
+        # otherwise they are awaited one by one without creating tasks
+        self.suspends = (self.is_coroutine or self.execution != "loop" or self.scope == "connection"
+                         or any(dependency.plan.suspends for dependency in self.dependencies))
+        self.concurrent = is_concurrent(dependency.plan for dependency in self.dependencies)
+        # NOTE: Set by `share_dependencies`, only shared dependencies are memoized through per-event futures
+        self.shared = False
+
+    def connection_plans(self) -> list["InvocationPlan"]:
+        """
+        Collects plans of every connection-scoped dependency of this plan, including nested ones.
+        """
+        plans = [self] if self.scope == "connection" else []
+        for dependency in self.dependencies:
+            plans.extend(dependency.plan.connection_plans())
+        return plans
+
+    def resolve(self, data: Any, headers: dict[str, str] | None, ctx: SIOContext) -> dict[str, Any]:
+        """
+        Resolves every parameter except of parameter dependencies, which should be awaited by listener.
+        """
+        return {resolver.name: resolver.resolve(data, headers, ctx) for resolver in self.parameters}
+
+
+def is_concurrent(plans: Iterable[InvocationPlan]) -> bool:
+    """
+    Whether plans are worth executing concurrently, which is only if at least two of them suspend
+    """
+    return sum(plan.suspends for plan in plans) >= 2
+
+
+def share_dependencies(plans: Iterable[InvocationPlan]) -> None:
+    """
+    Counts dependants of every cached dependency reachable from the plans and marks dependencies which are executed
+    more than once during the same event as shared. Dependency which has single dependant is awaited inline.
+    """
+    dependants: dict[Callable[..., Any], list[InvocationPlan]] = {}
+
+    def collect(plan: InvocationPlan):
+        if plan.use_cache or plan.scope == "connection":
+            dependants.setdefault(plan.callback, []).append(plan)
+        for dependency in plan.dependencies:
+            collect(dependency.plan)
+
+    for plan in plans:
+        collect(plan)
+
+    for shared in dependants.values():
+        if len(shared) > 1:
+            for plan in shared:
+                plan.shared = True
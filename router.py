@@ -0,0 +1,101 @@
+from typing import Any
+
+from plugins.liveapi.listener import Listener
+
+WILDCARD = "*"
+SEPARATOR = "."
+
+
+class RouteNode:
+    __slots__ = ("children", "wildcard", "listener", "tail")
+
+    def __init__(self) -> None:
+        # NOTE: Literal segments are matched by a single dictionary lookup
+        self.children: dict[str, RouteNode] = {}
+        # Node of `*` segment in the middle of pattern, it matches exactly one segment
+        self.wildcard: RouteNode | None = None
+        # Listener of pattern which ends at this node
+        self.listener: Listener | None = None
+        # Listener of pattern which ends with `*` right after this node, it matches the rest of event name
+        self.tail: Listener | None = None
+
+
+class EventRouter:
+    """
+    ## Event Router
+
+    Dispatches events of a namespace to listeners registered with patterns of event names.
+    Segments of patterns are separated by `.`, `*` in the middle of pattern matches exactly one segment
+    and `*` at the end matches the rest of event name (one or more segments), so `orders.*` matches both `orders.created` and `orders.item.added`.
+    Pattern `*` alone is catch-all listener of the namespace.
+
+    Patterns are compiled into trie of segments, literal segments take precedence over `*` and longer patterns over shorter ones.
+    Resolved event names are cached, so repeated events are a single dictionary lookup.
+
+    NOTE: Listeners of exact event names are dispatched by engine itself, router receives only events which have no listener of their own
+    """
+
+    def __init__(self, namespace: str, cache_size: int = 4096) -> None:
+        self.namespace = namespace
+        self.cache_size = cache_size
+        self.listeners: list[Listener] = []
+
+        self._root = RouteNode()
+        self._cache: dict[str, Listener | None] = {}
+
+    @staticmethod
+    def is_pattern(event_name: str) -> bool:
+        return WILDCARD in event_name.split(SEPARATOR)
+
+    def add(self, listener: Listener):
+        node = self._root
+        segments = listener.event_name.split(SEPARATOR)
+        for index, segment in enumerate(segments):
+            if segment != WILDCARD:
+                node = node.children.setdefault(segment, RouteNode())
+            elif index == len(segments) - 1:
+                node.tail = listener
+                break
+            else:
+                node.wildcard = node.wildcard or RouteNode()
+                node = node.wildcard
+        else:
+            node.listener = listener
+
+        self.listeners.append(listener)
+        self._cache.clear()
+
+    def match(self, event_name: str) -> Listener | None:
+        try:
+            return self._cache[event_name]
+        except KeyError:
+            pass
+
+        listener = self._match(self._root, event_name.split(SEPARATOR), 0)
+        if len(self._cache) >= self.cache_size:
+            # NOTE: Dictionaries keep insertion order, so the oldest entry is dropped
+            self._cache.pop(next(iter(self._cache)))
+        self._cache[event_name] = listener
+        return listener
+
+    def _match(self, node: RouteNode, segments: list[str], index: int) -> Listener | None:
+        if index == len(segments):
+            return node.listener
+
+        if (child := node.children.get(segments[index])) is not None and \
+                (listener := self._match(child, segments, index + 1)) is not None:
+            return listener
+
+        if node.wildcard is not None and \
+                (listener := self._match(node.wildcard, segments, index + 1)) is not None:
+            return listener
+
+        return node.tail
+
+    async def dispatch(self, event_name: str, sid: str, *args: Any):
+        """
+        Catch-all handler of engine, called with name of event which has no listener of it's own
+        """
+        if (listener := self.match(event_name)) is None:
+            return None
+        return await listener(sid, *args, event_name=event_name)
@@ -0,0 +1,103 @@
+from abc import ABC, abstractmethod
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class RawJSON:
+    """
+    Already encoded JSON document.
+
+    Serializers splice it into socket.io packets as is, so pydantic models are encoded straight to bytes by `model_dump_json`
+    and never go through `dict -> json` round trip.
+    """
+    __slots__ = ("value",)
+
+    def __init__(self, value: str) -> None:
+        self.value = value
+
+    def __len__(self) -> int:
+        return len(self.value)
+
+
+class BaseSerializer(ABC):
+    """
+    ## Base Serializer
+
+    Wire serializer of LiveAPI engines.
+    Serializer instance is also used as `json` module of socket.io server, so it implements `dumps` and `loads` in the same way as `json` module does.
+    """
+    name: str
+    binary: bool = False
+
+    def server_options(self) -> dict[str, Any]:
+        """
+        Additional options of socket.io server (`socketio.AsyncServer`) required by the serializer
+        """
+        return {"json": self}
+
+    def prepare(self, data: Any) -> Any:
+        """
+        Prepares outbound data for emitting.
+        Pydantic models are encoded straight to JSON, every other value is left for socket.io packet encoder.
+        """
+        if isinstance(data, BaseModel):
+            return RawJSON(data.model_dump_json())
+        return data
+
+    def encode(self, data: Any) -> Any:
+        """
+        Encodes outbound data once, so it can be emitted to many recipients without being encoded again.
+        Data which can't be encoded into JSON (e.g. binary attachments) is left for socket.io packet encoder.
+        """
+        if isinstance(data, (BaseModel, RawJSON)):
+            return self.prepare(data)
+
+        # NOTE: `None` and tuples are treated by socket.io as no arguments and as multiple arguments of event
+        if data is None or isinstance(data, tuple):
+            return data
+
+        try:
+            return RawJSON(self.dumps(data))
+        except (TypeError, ValueError):
+            return data
+
+    def encode_batch(self, items: list[Any]) -> Any:
+        """
+        Encodes many items into single frame (JSON array), every item is encoded only once.
+        """
+        encoded = [self.encode(item) for item in items]
+        if all(isinstance(item, RawJSON) for item in encoded):
+            return RawJSON("[" + ",".join(item.value for item in encoded) + "]")
+        return [self.prepare(item) for item in items]
+
+    @abstractmethod
+    def dumps(self, obj: Any, **kwargs) -> str:
+        """
+        ## Dumps
+
+        Encodes object into JSON text, encoded `RawJSON` documents are spliced as is.
+        """
+        ...
+
+    @abstractmethod
+    def loads(self, data: str | bytes | bytearray, **kwargs) -> Any:
+        """
+        ## Loads
+
+        Decodes inbound payload into Python object.
+        """
+        ...
+
+    def _splice(self, obj: Any, encode) -> str | None:
+        """
+        Splices top-level `RawJSON` documents into encoded packet, returns `None` if there are no documents to splice.
+        NOTE: socket.io packets are always encoded as list of `[event_name, *arguments]`
+        """
+        if isinstance(obj, RawJSON):
+            return obj.value
+
+        if not isinstance(obj, list) or not any(isinstance(item, RawJSON) for item in obj):
+            return None
+
+        return "[" + ",".join(item.value if isinstance(item, RawJSON) else encode(item) for item in obj) + "]"
@@ -0,0 +1,25 @@
+import json
+from typing import Any
+
+from plugins.liveapi.serializers.base import BaseSerializer, RawJSON
+
+
+class JSONSerializer(BaseSerializer):
+    name = "json"
+
+    def _default(self, obj: Any):
+        # NOTE: Encoded documents nested deeper than arguments of packet can't be spliced, so they are decoded back
+        if isinstance(obj, RawJSON):
+            return json.loads(obj.value)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def dumps(self, obj: Any, **kwargs) -> str:
+        kwargs.setdefault("separators", (",", ":"))
+        kwargs.setdefault("default", self._default)
+
+        if (spliced := self._splice(obj, lambda item: json.dumps(item, **kwargs))) is not None:
+            return spliced
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, data: str | bytes | bytearray, **kwargs) -> Any:
+        return json.loads(data, **kwargs)
@@ -0,0 +1,41 @@
+import json
+from typing import Any
+
+import msgpack
+from pydantic import BaseModel
+
+from plugins.liveapi.serializers.base import BaseSerializer
+
+
+class MsgPackSerializer(BaseSerializer):
+    """
+    ## MessagePack Serializer
+
+    Uses socket.io's own msgpack packets, so every packet is sent as binary frame.
+    """
+    name = "msgpack"
+    binary = True
+
+    def server_options(self) -> dict[str, Any]:
+        return {"serializer": "msgpack"}
+
+    def prepare(self, data: Any) -> Any:
+        if isinstance(data, BaseModel):
+            return data.model_dump(mode="json")
+        return data
+
+    def encode(self, data: Any) -> Any:
+        # NOTE: msgpack packets are encoded by socket.io itself
+        return self.prepare(data)
+
+    def encode_batch(self, items: list[Any]) -> Any:
+        return [self.prepare(item) for item in items]
+
+    def dumps(self, obj: Any, **kwargs) -> str:
+        return json.dumps(obj, **kwargs)
+
+    def loads(self, data: str | bytes | bytearray, **kwargs) -> Any:
+        # NOTE: Binary payloads are expected to be msgpack documents, text payloads are still JSON
+        if isinstance(data, (bytes, bytearray)):
+            return msgpack.unpackb(data)
+        return json.loads(data, **kwargs)
@@ -0,0 +1,27 @@
+from typing import Any
+
+import orjson
+
+from plugins.liveapi.serializers.base import BaseSerializer, RawJSON
+
+
+class ORJSONSerializer(BaseSerializer):
+    name = "orjson"
+
+    def _default(self, obj: Any):
+        # NOTE: Encoded documents nested deeper than arguments of packet can't be spliced, so they are decoded back
+        if isinstance(obj, RawJSON):
+            return orjson.loads(obj.value)
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+    def _encode(self, obj: Any) -> str:
+        return orjson.dumps(obj, default=self._default).decode()
+
+    def dumps(self, obj: Any, **kwargs) -> str:
+        # NOTE: orjson always produces compact output, so `separators` and other `json.dumps` options are ignored
+        if (spliced := self._splice(obj, self._encode)) is not None:
+            return spliced
+        return self._encode(obj)
+
+    def loads(self, data: str | bytes | bytearray, **kwargs) -> Any:
+        return orjson.loads(data)
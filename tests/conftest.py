@@ -0,0 +1,17 @@
+import sys
+import types
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# NOTE: Plugin is imported as `plugins.liveapi` inside of Ascender Framework's project, outside of it the checkout is registered
+# under the same name without executing `__init__.py`, so modules which don't need the framework can be tested on their own
+try:
+    import plugins.liveapi  # noqa: F401
+except ImportError:
+    plugins = sys.modules.setdefault("plugins", types.ModuleType("plugins"))
+    plugins.__path__ = getattr(plugins, "__path__", [])
+    liveapi = types.ModuleType("plugins.liveapi")
+    liveapi.__path__ = [str(ROOT)]
+    sys.modules["plugins.liveapi"] = liveapi
+    plugins.liveapi = liveapi
@@ -0,0 +1,145 @@
+import asyncio
+
+import pytest
+
+from plugins.liveapi.admission import AdmissionController, AdmissionDropped, AdmissionPolicy, AdmissionRejected
+
+
+async def settle():
+    for _ in range(3):
+        await asyncio.sleep(0)
+
+
+def test_unknown_overflow_policy_is_refused():
+    with pytest.raises(ValueError):
+        AdmissionPolicy(overflow="ignore")
+
+
+def test_listener_policy_falls_back_to_global_options():
+    policy = AdmissionPolicy(max_concurrency=4, rate=10, burst=20, overflow="reject")
+
+    merged = policy.merge(rate_limit=(5, 1))
+    assert (merged.max_concurrency, merged.rate, merged.burst, merged.overflow) == (4, 5, 1, "reject")
+    assert policy.merge(max_concurrency=1).rate_of("any") == (10, 20)
+    assert AdmissionPolicy(rate=2.5).rate_of("any") == (2.5, 3)
+    assert AdmissionPolicy(rate_limits={"typing": 1}).rate_of("message") is None
+
+
+def test_queued_event_waits_for_released_slot():
+    async def main():
+        policy = AdmissionPolicy(max_concurrency=1)
+        controller = AdmissionController(policy)
+
+        slots = await controller.acquire("s1", "ev", policy)
+        waiting = asyncio.ensure_future(controller.acquire("s1", "ev", policy))
+        await settle()
+        assert not waiting.done()
+
+        # NOTE: Other clients have slots of their own
+        assert await controller.acquire("s2", "ev", policy) is not None
+
+        controller.release(slots)
+        assert await waiting is slots
+        assert slots.active == 1
+
+    asyncio.run(main())
+
+
+def test_reject_policy_refuses_event_over_concurrency():
+    async def main():
+        policy = AdmissionPolicy(max_concurrency=1, overflow="reject")
+        controller = AdmissionController(policy)
+
+        await controller.acquire("s1", "ev", policy)
+        with pytest.raises(AdmissionRejected) as error:
+            await controller.acquire("s1", "ev", policy)
+        assert error.value.status_code == 429
+
+    asyncio.run(main())
+
+
+def test_full_queue_rejects_or_drops_oldest_event():
+    async def main():
+        queue = AdmissionPolicy(max_concurrency=1, max_queue=1)
+        controller = AdmissionController(queue)
+        await controller.acquire("s1", "ev", queue)
+        first = asyncio.ensure_future(controller.acquire("s1", "ev", queue))
+        await settle()
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire("s1", "ev", queue)
+        first.cancel()
+
+        drop = AdmissionPolicy(max_concurrency=1, max_queue=1, overflow="drop-oldest")
+        controller = AdmissionController(drop)
+        slots = await controller.acquire("s1", "ev", drop)
+        oldest = asyncio.ensure_future(controller.acquire("s1", "ev", drop))
+        await settle()
+        newest = asyncio.ensure_future(controller.acquire("s1", "ev", drop))
+        await settle()
+
+        with pytest.raises(AdmissionDropped):
+            await oldest
+        controller.release(slots)
+        assert await newest is slots
+
+    asyncio.run(main())
+
+
+def test_cancelled_waiter_passes_slot_to_next_one():
+    async def main():
+        policy = AdmissionPolicy(max_concurrency=1)
+        controller = AdmissionController(policy)
+
+        slots = await controller.acquire("s1", "ev", policy)
+        cancelled = asyncio.ensure_future(controller.acquire("s1", "ev", policy))
+        waiting = asyncio.ensure_future(controller.acquire("s1", "ev", policy))
+        await settle()
+
+        # NOTE: Slot is handed over to the first waiter right before it's cancelled
+        controller.release(slots)
+        cancelled.cancel()
+        await settle()
+
+        assert cancelled.cancelled()
+        assert await waiting is slots
+        assert slots.active == 1
+
+    asyncio.run(main())
+
+
+def test_rate_limit_rejects_or_delays_events_over_burst():
+    async def main():
+        reject = AdmissionPolicy(rate=1, burst=1, overflow="reject")
+        controller = AdmissionController(reject)
+        await controller.acquire("s1", "ev", reject)
+        with pytest.raises(AdmissionRejected):
+            await controller.acquire("s1", "ev", reject)
+        # NOTE: Buckets are per event name
+        await controller.acquire("s1", "other", reject)
+
+        queue = AdmissionPolicy(rate=50, burst=1)
+        controller = AdmissionController(queue)
+        loop = asyncio.get_running_loop()
+        await controller.acquire("s1", "ev", queue)
+        started = loop.time()
+        await controller.acquire("s1", "ev", queue)
+        assert loop.time() - started >= 0.015
+
+    asyncio.run(main())
+
+
+def test_forget_drops_waiting_events_of_disconnected_client():
+    async def main():
+        policy = AdmissionPolicy(max_concurrency=1)
+        controller = AdmissionController(policy)
+
+        await controller.acquire("s1", "ev", policy)
+        waiting = asyncio.ensure_future(controller.acquire("s1", "ev", policy))
+        await settle()
+
+        controller.forget("s1")
+        controller.forget("unknown")
+        with pytest.raises(AdmissionDropped):
+            await waiting
+
+    asyncio.run(main())
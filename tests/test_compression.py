@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+from plugins.liveapi.engines.compression import MAGIC, MessageCompressor, best_codec, load_codec
+
+
+def test_small_and_incompressible_messages_are_sent_as_is():
+    compressor = MessageCompressor("zlib", threshold=64)
+
+    assert compressor.compress('{"a":1}') == '{"a":1}'
+    noise = os.urandom(512)
+    assert compressor.compress(noise) is noise
+    assert compressor.stats.skipped == 1
+
+
+@pytest.mark.parametrize("codec", ["zlib", "lz4", "zstd"])
+def test_compressed_message_is_decompressed_by_node_without_compression(codec):
+    if codec != "zlib":
+        pytest.importorskip({"lz4": "lz4.frame", "zstd": "zstandard"}[codec])
+    message = '{"items":[' + ",".join(['"value"'] * 500) + "]}"
+
+    compressed = MessageCompressor(codec, threshold=64).compress(message)
+
+    assert compressed.startswith(MAGIC)
+    assert MessageCompressor().decompress(compressed) == message.encode()
+
+
+def test_plain_messages_pass_through_decompression():
+    compressor = MessageCompressor()
+
+    assert compressor.decompress('{"a":1}') == '{"a":1}'
+    assert compressor.decompress(b'{"a":1}') == b'{"a":1}'
+    assert compressor.stats.decompressed == 0
+
+
+def test_unknown_codec_is_refused():
+    with pytest.raises(ValueError):
+        load_codec("brotli")
+    with pytest.raises(ValueError):
+        MessageCompressor().decompress(MAGIC + bytes((9,)) + b"data")
+
+
+def test_stats_track_ratio_of_compressed_messages():
+    compressor = MessageCompressor(codec="zlib", threshold=0)
+    compressor.compress("a" * 1000)
+
+    assert compressor.stats.compressed == 1
+    assert 0 < compressor.stats.ratio < 0.1
+    assert best_codec().name in ("zstd", "lz4", "zlib")
@@ -0,0 +1,140 @@
+import asyncio
+
+from plugins.liveapi.benchmarks.fake import FakeEngine
+from plugins.liveapi.context import SIOContext
+from plugins.liveapi.engines.packet import EncodedPacket
+
+
+class RecordingEngine(FakeEngine):
+    def __init__(self) -> None:
+        super().__init__()
+        self.sent: list[tuple[str, object, object, str | None]] = []
+
+    async def send_event(self, event_name, data, to=None, namespace=None, **additional_arguments):
+        self.sent.append((event_name, data, to, namespace))
+
+
+def test_reply_defaults_to_current_client_and_event():
+    engine = RecordingEngine()
+    ctx = SIOContext(engine, "/chat", "message", "s1")
+
+    asyncio.run(ctx.reply(None, {"text": "hi"}))
+
+    assert engine.sent == [("message", {"text": "hi"}, "s1", "/chat")]
+
+
+def test_reply_to_many_targets_is_single_emit_of_encoded_packet():
+    engine = RecordingEngine()
+    ctx = SIOContext(engine, "/chat", "message", "s1")
+
+    asyncio.run(ctx.reply("update", {"text": "hi"}, to=["room-a", "room-b"]))
+
+    assert len(engine.sent) == 1
+    event_name, data, to, namespace = engine.sent[0]
+    assert (event_name, to, namespace) == ("update", ["room-a", "room-b"], "/chat")
+    assert isinstance(data, EncodedPacket)
+
+
+def streaming_context(engine: RecordingEngine) -> SIOContext:
+    engine.connect("s1", "/chat")
+    return SIOContext(engine, "/chat", "stream", "s1")
+
+
+def test_streaming_response_sends_every_item_and_batches():
+    engine = RecordingEngine()
+    ctx = streaming_context(engine)
+
+    assert asyncio.run(ctx.streaming_response(range(3))) == 3
+    assert [data for _, data, _, _ in engine.sent] == [0, 1, 2]
+
+    engine.sent.clear()
+    assert asyncio.run(ctx.streaming_response(range(5), batch_size=2)) == 5
+    assert [data.value for _, data, _, _ in engine.sent] == ["[0,1]", "[2,3]", "[4]"]
+
+
+def test_streaming_response_stops_producer_of_disconnected_client():
+    engine = RecordingEngine()
+    ctx = streaming_context(engine)
+    produced = []
+
+    async def endless():
+        while True:
+            produced.append(None)
+            yield len(produced)
+
+    async def main():
+        async def send_event(*args, **kwargs):
+            await RecordingEngine.send_event(engine, *args, **kwargs)
+            await engine.disconnect("s1", "/chat")
+        engine.send_event = send_event
+
+        # NOTE: Queue of producer is full when client disconnects, producer has to be cancelled instead of waiting for free place
+        sent = await asyncio.wait_for(ctx.streaming_response(endless(), max_in_flight=1), 1)
+        stopped_at = len(produced)
+        await asyncio.sleep(0.01)
+        return sent, stopped_at
+
+    sent, stopped_at = asyncio.run(main())
+    assert sent == 1
+    assert len(produced) == stopped_at
+
+
+def test_streaming_response_stops_idle_stream_of_disconnected_client():
+    engine = RecordingEngine()
+    ctx = streaming_context(engine)
+    ctx.stream_idle_check = 0.01
+
+    async def idle():
+        await asyncio.sleep(60)
+        yield None
+
+    async def main():
+        stream = asyncio.ensure_future(ctx.streaming_response(idle()))
+        await asyncio.sleep(0.02)
+        await engine.disconnect("s1", "/chat")
+        return await asyncio.wait_for(stream, 1)
+
+    assert asyncio.run(main()) == 0
+
+
+def test_streaming_response_raises_error_of_producer_after_sent_items():
+    engine = RecordingEngine()
+    ctx = streaming_context(engine)
+
+    def failing():
+        yield 1
+        raise ValueError("broken")
+
+    try:
+        asyncio.run(asyncio.wait_for(ctx.streaming_response(failing()), 1))
+    except ValueError as e:
+        assert str(e) == "broken"
+    else:
+        raise AssertionError("Error of producer isn't raised")
+    assert [data for _, data, _, _ in engine.sent] == [1]
+
+
+def test_streaming_response_cancels_producer_if_reply_fails():
+    engine = RecordingEngine()
+    ctx = streaming_context(engine)
+    producers = []
+
+    async def endless():
+        producers.append(asyncio.current_task())
+        while True:
+            yield None
+
+    async def main():
+        async def send_event(*args, **kwargs):
+            raise ConnectionError("gone")
+        engine.send_event = send_event
+
+        try:
+            await asyncio.wait_for(ctx.streaming_response(endless()), 1)
+        except ConnectionError:
+            pass
+        else:
+            raise AssertionError("Error of reply isn't raised")
+        return producers[0].done()
+
+    assert asyncio.run(main())
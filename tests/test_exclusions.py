@@ -0,0 +1,84 @@
+from plugins.liveapi.engines.exclusions import ExclusionIndex
+
+
+def rooms(**members: list[str]) -> dict[str, dict[str, str]]:
+    return {room: {sid: sid for sid in sids} for room, sids in members.items()}
+
+
+def test_single_room_skips_clients_which_excluded_event():
+    index = ExclusionIndex()
+    index.add("/", "A", "s1", ["typing"])
+
+    assert index.skip("/", "typing", "A", None) == ["s1"]
+    assert index.skip("/", "message", "A", None) is None
+    assert sorted(index.skip("/", "typing", "A", "s2")) == ["s1", "s2"]
+    assert sorted(index.skip("/", "typing", "A", ["s2", "s3"])) == ["s1", "s2", "s3"]
+
+
+def test_exclusions_are_per_room_and_namespace():
+    index = ExclusionIndex()
+    index.add("/", "A", "s1", ["typing"])
+
+    assert index.skip("/", "typing", "B", None) is None
+    assert index.skip("/chat", "typing", "A", None) is None
+    # NOTE: Emit to whole namespace isn't filtered by exclusions of rooms
+    assert index.skip("/", "typing", None, None) is None
+
+
+def test_multiple_rooms_keep_client_which_receives_event_through_another_room():
+    index = ExclusionIndex()
+    index.add("/", "A", "s1", ["ev"])
+    members = rooms(A=["s1", "s2"], B=["s1", "s3"])
+
+    assert index.skip("/", "ev", ["A", "B"], None, members) is None
+
+
+def test_multiple_rooms_skip_client_which_excluded_event_everywhere():
+    index = ExclusionIndex()
+    index.add("/", "A", "s1", ["ev"])
+    index.add("/", "B", "s1", ["ev"])
+    index.add("/", "B", "s2", ["ev"])
+    members = rooms(A=["s1", "s2"], B=["s1", "s2"])
+
+    # NOTE: `s2` is a plain member of `A`, so it still receives the event
+    assert index.skip("/", "ev", ["A", "B"], None, members) == ["s1"]
+
+
+def test_multiple_rooms_without_members_join_exclusions():
+    index = ExclusionIndex()
+    index.add("/", "A", "s1", ["ev"])
+    index.add("/", "B", "s2", ["ev"])
+
+    assert sorted(index.skip("/", "ev", ["A", "B"], None)) == ["s1", "s2"]
+
+
+def test_resubscribe_replaces_excluded_events():
+    index = ExclusionIndex()
+    index.add("/", "A", "s1", ["ev"])
+    index.add("/", "A", "s1", ["other"])
+
+    assert index.skip("/", "ev", "A", None) is None
+    assert index.skip("/", "other", "A", None) == ["s1"]
+
+
+def test_unsubscribe_and_disconnect_clear_index():
+    index = ExclusionIndex()
+    index.add("/", "A", "s1", ["ev"])
+    index.add("/", "B", "s1", ["ev"])
+
+    index.discard("/", "A", "s1")
+    assert index.skip("/", "ev", "A", None) is None
+    assert index.skip("/", "ev", "B", None) == ["s1"]
+
+    index.discard_sid("/", "s1")
+    assert not index
+    assert index.skip("/", "ev", "B", None) is None
+
+
+def test_discard_of_unknown_subscription_is_ignored():
+    index = ExclusionIndex()
+    index.discard("/", "A", "s1")
+    index.discard_sid("/", "s1")
+    index.add("/", "A", "s1", [])
+
+    assert not index
@@ -0,0 +1,66 @@
+import asyncio
+import threading
+
+import pytest
+
+from plugins.liveapi.context import SIOContext
+from plugins.liveapi.executors import ExecutorPools, ProcessTarget
+from plugins.liveapi.plan import InvocationPlan
+
+
+def square(value: int) -> int:
+    return value * value
+
+
+class Unpicklable:
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+
+    def handle(self, value: int) -> int:
+        return value
+
+
+def test_process_target_requires_importable_and_picklable_callback():
+    def local(value: int) -> int:
+        return value
+
+    with pytest.raises(TypeError, match="importable"):
+        ProcessTarget(local)
+    with pytest.raises(TypeError, match="can't be pickled"):
+        ProcessTarget(Unpicklable().handle)
+    assert ProcessTarget(square).reference == (__name__, "square")
+
+
+def test_plan_refuses_unsupported_execution_modes():
+    async def coroutine(value: int):
+        return value
+
+    def with_context(ctx: SIOContext):
+        return ctx
+
+    with pytest.raises(ValueError):
+        InvocationPlan(square, execution="fiber")
+    with pytest.raises(TypeError, match="coroutine function"):
+        InvocationPlan(coroutine, execution="thread")
+    with pytest.raises(TypeError, match="SIOContext"):
+        InvocationPlan(with_context, execution="process")
+
+
+def test_sync_callbacks_default_to_thread_pool():
+    async def coroutine(value: int):
+        return value
+
+    assert InvocationPlan(square).execution == "thread"
+    assert InvocationPlan(coroutine).execution == "loop"
+
+
+def test_thread_pool_is_created_lazily_and_shut_down():
+    pools = ExecutorPools(thread_workers=1)
+    assert pools._thread is None
+
+    async def main():
+        return await pools.run("thread", lambda: threading.current_thread().name)
+
+    assert asyncio.run(main()).startswith("liveapi")
+    pools.shutdown()
+    assert pools._thread is None and pools._process is None
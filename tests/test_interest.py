@@ -0,0 +1,57 @@
+from plugins.liveapi.engines.interest import RoomInterest
+
+
+def test_announcements_index_hosts_of_room():
+    interest = RoomInterest("local")
+
+    assert interest.update("node-a", "/", "room", True, interest.next_sequence())
+    assert interest.update("node-b", "/", "room", True, 1)
+    assert interest.hosts("/", "room") == {"node-a", "node-b"}
+    assert interest.hosts("/chat", "room") == set()
+
+    assert interest.update("node-b", "/", "room", False, 2)
+    assert interest.hosts("/", "room") == {"node-a"}
+    assert interest.rooms_of("node-a") == [("/", "room")]
+
+
+def test_announcement_older_than_applied_one_is_ignored():
+    interest = RoomInterest("local")
+
+    interest.update("node-a", "/", "room", False, 2)
+    assert not interest.update("node-a", "/", "room", True, 1)
+    assert not interest.update("node-a", "/", "room", True, 2)
+    assert interest.hosts("/", "room") == set()
+
+    # NOTE: Sequences are tracked per node and room
+    assert interest.update("node-a", "/", "other", True, 1)
+    assert interest.update("node-b", "/", "room", True, 1)
+
+
+def test_announcement_without_sequence_is_always_applied():
+    interest = RoomInterest("local")
+
+    interest.update("node-a", "/", "room", True, 5)
+    assert interest.update("node-a", "/", "room", False)
+    assert interest.hosts("/", "room") == set()
+    # NOTE: Leaving a room which isn't indexed is a no-op
+    assert interest.update("node-a", "/", "unknown", False)
+
+
+def test_full_state_replaces_rooms_of_node():
+    interest = RoomInterest("local")
+    interest.update("node-a", "/", "old", True, 1)
+    interest.update("node-a", "/", "kept", True, 1)
+
+    interest.replace("node-a", [["/", "kept"], ["/", "new"]], 2)
+
+    assert sorted(interest.rooms_of("node-a")) == [("/", "kept"), ("/", "new")]
+    assert interest.hosts("/", "old") == set()
+
+
+def test_stale_full_state_does_not_override_newer_announcements():
+    interest = RoomInterest("local")
+    interest.update("node-a", "/", "room", True, 3)
+
+    interest.replace("node-a", [], 2)
+
+    assert interest.hosts("/", "room") == {"node-a"}
@@ -0,0 +1,96 @@
+import asyncio
+
+from fastapi import Depends
+
+from plugins.liveapi.benchmarks.fake import FakeEngine
+from plugins.liveapi.context import SIOContext
+from plugins.liveapi.error import ErrorHandler
+from plugins.liveapi.listener import Listener
+
+
+def listener_of(callback, dependencies=[]) -> Listener:
+    listener = Listener("message", callback, dependencies, "/")
+    listener._engine = FakeEngine()
+    listener._error_handler = ErrorHandler()
+    return listener.compile()
+
+
+class Auth:
+    async def __call__(self, ctx: SIOContext) -> str:
+        await asyncio.sleep(0)
+        return f"user:{ctx.session_id}"
+
+
+def test_instance_with_async_call_is_awaited_dependency():
+    async def on_message(user: str = Depends(Auth())):
+        return user
+
+    listener = listener_of(on_message)
+
+    assert listener.plan.dependencies[0].plan.is_coroutine
+    assert listener.plan.dependencies[0].plan.execution == "loop"
+    assert asyncio.run(listener("s1", None)) == "user:s1"
+
+
+def test_sync_callable_returning_awaitable_is_awaited():
+    async def current_user(ctx: SIOContext) -> str:
+        return ctx.session_id
+
+    class Lazy:
+        def __call__(self, ctx: SIOContext):
+            return current_user(ctx)
+
+    async def on_message(user: str = Depends(Lazy())):
+        return user
+
+    assert asyncio.run(listener_of(on_message)("s1", None)) == "s1"
+
+
+def test_dependency_with_single_dependant_is_awaited_inline():
+    tasks = []
+
+    async def current_user(ctx: SIOContext) -> str:
+        tasks.append(asyncio.current_task())
+        return ctx.session_id
+
+    async def on_message(user: str = Depends(current_user)):
+        tasks.append(asyncio.current_task())
+        return user
+
+    assert asyncio.run(listener_of(on_message)("s1", None)) == "s1"
+    assert tasks[0] is tasks[1]
+
+
+def test_shared_dependency_is_executed_once_per_event():
+    calls = []
+
+    async def current_user(ctx: SIOContext) -> str:
+        calls.append(ctx.session_id)
+        await asyncio.sleep(0)
+        return ctx.session_id
+
+    async def permissions(user: str = Depends(current_user)) -> list:
+        return [user]
+
+    async def on_message(user: str = Depends(current_user), allowed: list = Depends(permissions)):
+        return user, allowed
+
+    listener = listener_of(on_message)
+
+    assert listener.plan.concurrent
+    assert asyncio.run(listener("s1", None)) == ("s1", ["s1"])
+    assert asyncio.run(listener("s2", None)) == ("s2", ["s2"])
+    assert calls == ["s1", "s2"]
+
+
+def test_dependency_without_cache_is_executed_for_every_dependant():
+    calls = []
+
+    def counter() -> int:
+        calls.append(None)
+        return len(calls)
+
+    async def on_message(first: int = Depends(counter, use_cache=False), second: int = Depends(counter, use_cache=False)):
+        return first + second
+
+    assert asyncio.run(listener_of(on_message)("s1", None)) == 3
@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from plugins.liveapi.engines.local_cluster import ClusterMembership, LocalBus, pack_frame, read_frame
+
+
+def reader_of(data: bytes, eof: bool = True) -> asyncio.StreamReader:
+    reader = asyncio.StreamReader()
+    reader.feed_data(data)
+    if eof:
+        reader.feed_eof()
+    return reader
+
+
+def test_frames_round_trip_with_and_without_targets():
+    async def main():
+        targeted, broadcast = pack_frame(b"body", ["a", "b"]), pack_frame(b"{}")
+        reader = reader_of(targeted + broadcast)
+
+        assert await read_frame(reader) == (targeted, ["a", "b"], b"body")
+        assert await read_frame(reader) == (broadcast, [], b"{}")
+
+    asyncio.run(main())
+
+
+def test_truncated_frame_raises_incomplete_read():
+    async def main():
+        with pytest.raises(asyncio.IncompleteReadError):
+            await read_frame(reader_of(pack_frame(b"body", ["a"])[:-1]))
+
+    asyncio.run(main())
+
+
+def test_membership_tracks_rooms_and_hosts_of_clients():
+    membership = ClusterMembership("w1")
+
+    assert membership.update("w1", "/", None, "s1", True)
+    assert not membership.update("w1", "/", None, "s1", True)
+    membership.update("w1", "/", "room", "s1", True)
+    membership.update("w2", "/", None, "s2", True)
+    membership.update("w2", "/", "room", "s2", True)
+
+    assert membership.members("room") == {"s1": "w1", "s2": "w2"}
+    assert membership.hosts("room") == {"w1", "w2"}
+    assert membership.rooms() == {"room"}
+    assert membership.host_of("s2") == "w2"
+    assert membership.online_count() == 2
+    assert not membership.is_online("s1", "/chat")
+
+    assert membership.update("w2", "/", "room", "s2", False)
+    assert not membership.update("w2", "/", "room", "s2", False)
+    assert membership.hosts("room") == {"w1"}
+
+
+def test_membership_state_of_worker_is_replaced_and_dropped():
+    membership = ClusterMembership("w1")
+    membership.update("w1", "/", None, "s1", True)
+    membership.update("w2", "/", None, "s2", True)
+    membership.update("w2", "/", "room", "s2", True)
+
+    membership.replace("w2", [["/", None, "s3"]])
+    assert membership.members(None) == {"s1": "w1", "s3": "w2"}
+    assert membership.rooms() == set()
+
+    membership.drop("w2")
+    assert membership.entries_of("w2") == []
+
+    membership.update("w3", "/", None, "s4", True)
+    membership.reset()
+    assert membership.members(None) == {"s1": "w1"}
+
+
+async def until(condition):
+    async def wait():
+        while not condition():
+            await asyncio.sleep(0.01)
+    await asyncio.wait_for(wait(), 2)
+
+
+def test_bus_relays_broadcast_and_targeted_frames(tmp_path):
+    async def receive(bus: LocalBus) -> bytes:
+        return await asyncio.wait_for(bus.inbox.get(), 2)
+
+    async def main():
+        path = str(tmp_path / "bus.sock")
+        hub, first, second = (LocalBus(path, host_id, retry_interval=0.01) for host_id in ("hub", "w1", "w2"))
+        hub.start()
+        await until(lambda: hub.is_hub)
+        first.start()
+        second.start()
+        # NOTE: Hub registers worker once it's first frame is read
+        await until(lambda: first._writer and second._writer and len(hub._peers) == 2)
+
+        try:
+            first.send(b"everyone")
+            assert await receive(hub) == b"everyone"
+            assert await receive(second) == b"everyone"
+
+            hub.send(b"only-w1", ["w1"])
+            second.send(b"only-hub", ["hub"])
+            assert await receive(first) == b"only-w1"
+            assert await receive(hub) == b"only-hub"
+            assert first.inbox.empty() and second.inbox.empty()
+        finally:
+            for bus in (first, second, hub):
+                await bus.close()
+
+    asyncio.run(main())
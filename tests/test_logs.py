@@ -0,0 +1,96 @@
+import logging
+
+from plugins.liveapi import logs
+from plugins.liveapi.logs import ErrorLogLimiter, LogSampler, LogSampling, QueueLogging
+
+
+class Records(logging.Handler):
+    def __init__(self) -> None:
+        super().__init__()
+        self.messages: list[str] = []
+
+    def emit(self, record: logging.LogRecord) -> None:
+        self.messages.append(record.getMessage())
+
+
+def test_sampler_logs_every_nth_event():
+    sampler, disabled, every = LogSampler(0.25), LogSampler(0), LogSampler(5)
+
+    assert [sampler() for _ in range(8)] == [False, False, False, True] * 2
+    assert not any(disabled() for _ in range(10))
+    assert all(every() for _ in range(3))
+
+
+def test_sampling_rate_of_event_falls_back_to_default():
+    sampling = LogSampling(0.5, {"typing": 0.1, "message": 1})
+
+    assert sampling.sampler("message") is None
+    assert sampling.sampler("typing").every == 10
+    assert sampling.sampler("other").every == 2
+    assert LogSampling().sampler("any") is None
+
+
+def test_error_limiter_counts_suppressed_errors(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(logs, "monotonic", lambda: now[0])
+    limiter = ErrorLogLimiter(interval=1.0)
+
+    assert limiter.allow("key") == 0
+    assert limiter.allow("key") is None
+    assert limiter.allow("key") is None
+    assert limiter.allow("other") == 0
+
+    now[0] += 1.0
+    assert limiter.allow("key") == 2
+    assert limiter.allow("key") is None
+
+
+def test_error_limiter_drops_the_oldest_key(monkeypatch):
+    monkeypatch.setattr(logs, "monotonic", lambda: 100.0)
+    limiter = ErrorLogLimiter(max_keys=2)
+
+    for key in ("a", "b", "c"):
+        limiter.allow(key)
+
+    assert list(limiter._keys) == ["b", "c"]
+    # NOTE: Dropped key is logged again as if it was never seen
+    assert limiter.allow("a") == 0
+
+
+def test_queue_logging_moves_own_handlers_and_keeps_propagation():
+    parent, logger = logging.getLogger("liveapi-test"), logging.getLogger("liveapi-test.queue")
+    inherited, own = Records(), Records()
+    parent.addHandler(inherited)
+    logger.addHandler(own)
+    logger.setLevel(logging.INFO)
+
+    queue_logging = QueueLogging(logger)
+    queue_logging.start()
+    try:
+        assert logger.propagate
+        assert own not in logger.handlers
+        logger.info("hello")
+    finally:
+        queue_logging.stop()
+        parent.removeHandler(inherited)
+
+    assert logger.handlers == [own]
+    assert own.messages == ["hello"]
+    assert inherited.messages == ["hello"]
+
+
+def test_queue_logging_leaves_logger_without_handlers_untouched():
+    parent, logger = logging.getLogger("liveapi-test"), logging.getLogger("liveapi-test.inherited")
+    inherited = Records()
+    parent.addHandler(inherited)
+
+    queue_logging = QueueLogging(logger)
+    queue_logging.start()
+    try:
+        assert logger.handlers == [] and logger.propagate
+        logger.warning("hello")
+    finally:
+        queue_logging.stop()
+        parent.removeHandler(inherited)
+
+    assert inherited.messages == ["hello"]
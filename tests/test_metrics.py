@@ -0,0 +1,49 @@
+from plugins.liveapi.metrics import Histogram, MetricsRegistry, emit_time
+
+
+def test_histogram_places_values_into_upper_bound_buckets():
+    histogram = Histogram((0.1, 1.0))
+
+    for value in (0.05, 0.1, 0.5, 5.0):
+        histogram.observe(value)
+
+    assert histogram.counts == [2, 1, 1]
+    assert (histogram.count, histogram.sum) == (4, 5.65)
+
+
+def test_emit_time_is_attributed_to_inbound_event():
+    registry = MetricsRegistry()
+    spent = [0.0]
+
+    token = emit_time.set(spent)
+    try:
+        registry.emitted("/", "update", 10, 0.5)
+    finally:
+        emit_time.reset(token)
+    registry.emitted("/", "update", 5, 0.25)
+
+    assert spent == [0.5]
+    outbound = registry.outbound[("/", "update")]
+    assert (outbound.messages, outbound.bytes, outbound.latency.count) == (2, 15, 2)
+
+
+def test_render_escapes_labels_and_includes_gauges():
+    registry = MetricsRegistry(buckets=(1.0,))
+    metrics = registry.event("/", 'say "hi"')
+    metrics.invocations += 1
+    metrics.errors["validation"] += 1
+    metrics.phases["total"].observe(0.5)
+    registry.gauges.append(lambda: {"liveapi_clients": ("Connected clients", {(("namespace", "/"),): 3}),
+                                    "liveapi_rooms": ("Rooms", {(): 1}),
+                                    "liveapi_drops_total": ("Drops", {(): 2}, "counter")})
+
+    text = registry.render()
+
+    assert 'liveapi_events_total{namespace="/",event="say \\"hi\\""} 1' in text
+    assert 'liveapi_event_errors_total{namespace="/",event="say \\"hi\\"",error="validation"} 1' in text
+    assert 'liveapi_event_duration_seconds_bucket{namespace="/",event="say \\"hi\\"",phase="total",le="1.0"} 1' in text
+    assert 'liveapi_event_duration_seconds_bucket{namespace="/",event="say \\"hi\\"",phase="total",le="+Inf"} 1' in text
+    assert 'liveapi_clients{namespace="/"} 3' in text
+    assert "liveapi_rooms 1" in text
+    assert "# TYPE liveapi_drops_total counter" in text
+    assert text.endswith("\n")
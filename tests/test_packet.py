@@ -0,0 +1,31 @@
+import json
+
+import pytest
+
+from plugins.liveapi.engines.packet import EncodedPacket
+
+socketio = pytest.importorskip("socketio")
+
+
+def event_arguments(packet: EncodedPacket, event_name: str = "ev", namespace: str = "/") -> list:
+    [eio_packet] = packet.eio_packets(socketio.AsyncServer(), event_name, namespace)
+    # NOTE: Text socket.io packet is type digit followed by JSON of event name and it's arguments
+    return json.loads(eio_packet.data[1:])
+
+
+@pytest.mark.parametrize("payload, expected", [
+    (None, ["ev"]),
+    ({"a": 1}, ["ev", {"a": 1}]),
+    (("a", 1), ["ev", "a", 1]),
+    ([1, 2], ["ev", [1, 2]]),
+])
+def test_event_arguments_match_server_emit(payload, expected):
+    assert event_arguments(EncodedPacket(payload)) == expected
+
+
+def test_packets_are_encoded_once_per_event_and_namespace():
+    packet = EncodedPacket({"a": 1})
+    server = socketio.AsyncServer()
+
+    assert packet.eio_packets(server, "ev", "/") is packet.eio_packets(server, "ev", "/")
+    assert packet.eio_packets(server, "ev", "/") is not packet.eio_packets(server, "ev", "/chat")
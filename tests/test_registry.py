@@ -0,0 +1,100 @@
+import asyncio
+
+from plugins.liveapi.engines.registry import ClusterRegistry, MemoryRedis
+
+
+def test_nodes_share_rooms_and_online_clients():
+    async def main():
+        redis = MemoryRedis()
+        first, second = ClusterRegistry.in_memory("n1", redis), ClusterRegistry.in_memory("n2", redis)
+
+        first.connect("s1")
+        first.join("s1", "room")
+        second.connect("s2")
+        second.join("s2", "room")
+        await first.sync()
+        await second.sync()
+
+        assert await first.members("room") == {"s1", "s2"}
+        assert await second.rooms() == {"room"}
+        assert await first.online_count() == 2
+        assert await second.is_online("s1")
+        assert not await second.is_online("s1", "/chat")
+
+    asyncio.run(main())
+
+
+def test_room_is_dropped_with_its_last_member():
+    async def main():
+        registry = ClusterRegistry.in_memory()
+        registry.join("s1", "room")
+        registry.join("s2", "room")
+        registry.leave("s1", "room")
+        await registry.sync()
+        assert await registry.rooms() == {"room"}
+
+        registry.leave("s2", "room")
+        await registry.sync()
+        assert await registry.rooms() == set()
+        assert await registry.room_count() == 0
+
+    asyncio.run(main())
+
+
+def test_cached_queries_are_invalidated_by_other_nodes():
+    async def main():
+        redis = MemoryRedis()
+        messages = []
+
+        async def publish(message):
+            messages.append(message)
+
+        first = ClusterRegistry.in_memory("n1", redis, publish=publish)
+        second = ClusterRegistry.in_memory("n2", redis)
+        assert await second.members("room") == set()
+
+        first.join("s1", "room")
+        await first.sync()
+        # NOTE: Second node serves stale cached members until invalidation message of the first one arrives
+        assert await second.members("room") == set()
+        second.invalidate(messages[-1]["keys"])
+        assert await second.members("room") == {"s1"}
+        assert messages[-1]["host_id"] == "n1"
+
+    asyncio.run(main())
+
+
+def test_purge_removes_clients_of_stopped_node():
+    async def main():
+        redis = MemoryRedis()
+        stopped, alive = ClusterRegistry.in_memory("n1", redis), ClusterRegistry.in_memory("n2", redis)
+        for registry, sid in ((stopped, "s1"), (alive, "s2")):
+            registry.connect(sid)
+            registry.join(sid, "shared")
+        stopped.join("s1", "only-n1")
+        await stopped.sync()
+        await alive.sync()
+
+        await alive.purge_host("n1")
+
+        assert await alive.members("shared") == {"s2"}
+        assert await alive.rooms() == {"shared"}
+        assert not await alive.is_online("s1")
+        await alive.purge_host("unknown")
+
+    asyncio.run(main())
+
+
+def test_failed_write_does_not_stop_writer(caplog):
+    async def main():
+        registry = ClusterRegistry.in_memory()
+
+        async def broken(*args):
+            raise ConnectionError("redis is gone")
+        registry._submit(broken)
+        registry.join("s1", "room")
+        await registry.sync()
+        return await registry.members("room")
+
+    assert asyncio.run(main()) == {"s1"}
+    assert "redis is gone" in caplog.text
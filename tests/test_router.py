@@ -0,0 +1,76 @@
+import asyncio
+from types import SimpleNamespace
+
+from plugins.liveapi.router import EventRouter
+
+
+def router_of(*patterns: str) -> tuple[EventRouter, dict[str, SimpleNamespace]]:
+    router = EventRouter("/")
+    listeners = {pattern: SimpleNamespace(event_name=pattern) for pattern in patterns}
+    for listener in listeners.values():
+        router.add(listener)
+    return router, listeners
+
+
+def test_is_pattern_checks_whole_segments():
+    assert EventRouter.is_pattern("*")
+    assert EventRouter.is_pattern("orders.*.added")
+    assert not EventRouter.is_pattern("orders")
+    assert not EventRouter.is_pattern("orders.a*")
+
+
+def test_trailing_wildcard_matches_one_or_more_segments():
+    router, listeners = router_of("orders.*")
+
+    assert router.match("orders.created") is listeners["orders.*"]
+    assert router.match("orders.item.added") is listeners["orders.*"]
+    assert router.match("orders") is None
+    assert router.match("users.created") is None
+
+
+def test_literal_segments_and_longer_patterns_take_precedence():
+    router, listeners = router_of("*", "orders.*", "orders.*.added", "orders.item.*")
+
+    assert router.match("orders.item.added") is listeners["orders.item.*"]
+    assert router.match("orders.box.added") is listeners["orders.*.added"]
+    assert router.match("orders.box.removed") is listeners["orders.*"]
+    assert router.match("users") is listeners["*"]
+
+
+def test_middle_wildcard_falls_back_when_rest_does_not_match():
+    router, listeners = router_of("a.*.c", "a.b.*")
+
+    assert router.match("a.b.c") is listeners["a.b.*"]
+    assert router.match("a.x.c") is listeners["a.*.c"]
+    assert router.match("a.x.d") is None
+
+
+def test_cache_is_bounded_and_cleared_by_new_pattern():
+    router, listeners = router_of("orders.*")
+    router.cache_size = 2
+
+    for name in ("orders.a", "orders.b", "orders.c"):
+        router.match(name)
+    assert list(router._cache) == ["orders.b", "orders.c"]
+
+    # NOTE: Misses are cached too, new pattern has to invalidate them
+    assert router.match("users.created") is None
+    users = SimpleNamespace(event_name="users.*")
+    router.add(users)
+    assert router.match("users.created") is users
+
+
+def test_dispatch_passes_received_event_name_to_listener():
+    calls = []
+
+    async def listener(sid, *args, event_name=None):
+        calls.append((sid, args, event_name))
+        return "ok"
+
+    router = EventRouter("/")
+    listener.event_name = "orders.*"
+    router.add(listener)
+
+    assert asyncio.run(router.dispatch("orders.created", "s1", {"id": 1})) == "ok"
+    assert asyncio.run(router.dispatch("users.created", "s1")) is None
+    assert calls == [("s1", ({"id": 1},), "orders.created")]
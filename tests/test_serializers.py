@@ -0,0 +1,69 @@
+import json
+
+import pytest
+from pydantic import BaseModel
+
+from plugins.liveapi.serializers.base import RawJSON
+from plugins.liveapi.serializers.json_serializer import JSONSerializer
+
+
+class Message(BaseModel):
+    text: str
+
+
+def serializers():
+    yield JSONSerializer()
+    try:
+        from plugins.liveapi.serializers.orjson_serializer import ORJSONSerializer
+    except ImportError:
+        return
+    yield ORJSONSerializer()
+
+
+@pytest.fixture(params=list(serializers()), ids=lambda serializer: serializer.name)
+def serializer(request):
+    return request.param
+
+
+def test_models_and_documents_are_encoded_once(serializer):
+    encoded = serializer.encode(Message(text="hi"))
+
+    assert isinstance(encoded, RawJSON)
+    assert json.loads(encoded.value) == {"text": "hi"}
+    assert serializer.encode(encoded) is encoded
+    assert json.loads(serializer.encode({"a": [1, 2]}).value) == {"a": [1, 2]}
+
+
+def test_none_tuples_and_binary_data_are_left_for_packet_encoder(serializer):
+    assert serializer.encode(None) is None
+    assert serializer.encode(("a", 1)) == ("a", 1)
+    assert serializer.encode(b"\x00\x01") == b"\x00\x01"
+
+
+def test_encoded_documents_are_spliced_into_packets(serializer):
+    packet = ["event", serializer.encode(Message(text="hi")), {"n": 1}]
+
+    assert json.loads(serializer.dumps(packet)) == ["event", {"text": "hi"}, {"n": 1}]
+    # NOTE: Documents nested deeper than arguments of packet are decoded back
+    assert json.loads(serializer.dumps({"nested": serializer.encode({"a": 1})})) == {"nested": {"a": 1}}
+
+
+def test_batch_is_single_json_array_or_list_of_prepared_items(serializer):
+    batch = serializer.encode_batch([Message(text="a"), {"b": 1}])
+    assert json.loads(batch.value) == [{"text": "a"}, {"b": 1}]
+
+    mixed = serializer.encode_batch([b"\x00", Message(text="a")])
+    assert isinstance(mixed, list) and mixed[0] == b"\x00"
+
+
+def test_msgpack_serializer_leaves_encoding_to_socketio():
+    msgpack = pytest.importorskip("msgpack")
+    from plugins.liveapi.serializers.msgpack_serializer import MsgPackSerializer
+
+    serializer = MsgPackSerializer()
+
+    assert serializer.encode(Message(text="hi")) == {"text": "hi"}
+    assert serializer.encode_batch([Message(text="hi"), 1]) == [{"text": "hi"}, 1]
+    assert serializer.loads(msgpack.packb({"a": 1})) == {"a": 1}
+    assert serializer.loads('{"a":1}') == {"a": 1}
+    assert serializer.server_options() == {"serializer": "msgpack"}
@@ -0,0 +1,138 @@
+import json
+from contextlib import ExitStack
+
+import pytest
+
+pytest.importorskip("httpx")
+
+from starlette.applications import Starlette
+from starlette.testclient import TestClient
+
+from plugins.liveapi.engines.websocket import ACK, CONNECT, CONNECT_ERROR, DISCONNECT, EVENT, WebSocketEngine
+
+
+class Server:
+    def __init__(self, stack: ExitStack) -> None:
+        app = Starlette()
+        self.engine = WebSocketEngine(app)
+        self.client = stack.enter_context(TestClient(app))
+        self.stack = stack
+
+    def call(self, function, *args):
+        return self.client.portal.call(function, *args)
+
+    def open(self):
+        return self.stack.enter_context(self.client.websocket_connect("/ws"))
+
+    def connect(self, namespace: str = "/", websocket=None):
+        websocket = websocket or self.open()
+        websocket.send_text(json.dumps([CONNECT, namespace]))
+        kind, _, sid = websocket.receive_json()
+        assert kind == CONNECT
+        return websocket, sid
+
+
+@pytest.fixture
+def server():
+    with ExitStack() as stack:
+        yield Server(stack)
+
+
+def test_event_to_many_rooms_is_delivered_once_per_client(server):
+    first, first_sid = server.connect()
+    second, second_sid = server.connect()
+
+    server.call(server.engine.subscribe, first_sid, "a")
+    server.call(server.engine.subscribe, first_sid, "b")
+    server.call(server.engine.subscribe, second_sid, "b")
+    server.call(server.engine.send_event, "update", {"n": 1}, ["a", "b"])
+    server.call(server.engine.send_event, "done", None, ["a", "b"])
+
+    for websocket in (first, second):
+        assert websocket.receive_json() == [EVENT, "/", "update", {"n": 1}]
+        assert websocket.receive_json() == [EVENT, "/", "done"]
+
+
+def test_event_to_many_rooms_skips_client_only_where_it_excluded_event(server):
+    first, first_sid = server.connect()
+    second, second_sid = server.connect()
+
+    server.call(server.engine.subscribe, first_sid, "a", None, ["update"])
+    server.call(server.engine.subscribe, first_sid, "b")
+    server.call(server.engine.subscribe, second_sid, "a", None, ["update"])
+    server.call(server.engine.send_event, "update", {"n": 1}, ["a", "b"])
+    server.call(server.engine.send_event, "done", None, ["a", "b"])
+
+    # NOTE: First client still receives the event through room `b`, second one excluded it in the only room it's member of
+    assert first.receive_json() == [EVENT, "/", "update", {"n": 1}]
+    assert first.receive_json() == [EVENT, "/", "done"]
+    assert second.receive_json() == [EVENT, "/", "done"]
+
+
+def test_connect_to_unknown_namespace_or_refused_connection_is_reported(server):
+    def refuse(sid, environ, auth):
+        raise ConnectionRefusedError(f"bad token {auth['token']}")
+
+    server.engine.receive_event("connect", refuse, "/private")
+    websocket = server.open()
+
+    websocket.send_text(json.dumps([CONNECT, "/unknown"]))
+    assert websocket.receive_json() == [CONNECT_ERROR, "/unknown", {"message": "Unable to connect"}]
+
+    websocket.send_text(json.dumps([CONNECT, "/private", {"token": "x"}]))
+    assert websocket.receive_json() == [CONNECT_ERROR, "/private", {"message": "bad token x"}]
+    assert server.engine._manager.rooms.get("/private", {}) == {}
+
+
+def test_event_with_ack_id_is_answered_and_malformed_frames_are_dropped(server):
+    received = []
+
+    async def on_message(sid, data):
+        received.append((sid, data))
+        return {"echo": data}
+
+    server.engine.receive_event("message", on_message, "/")
+    websocket, sid = server.connect()
+
+    websocket.send_text("not a frame")
+    websocket.send_text(json.dumps([EVENT, "/", "message", "hi", 7]))
+    assert websocket.receive_json() == [ACK, "/", 7, {"echo": "hi"}]
+    assert received == [(sid, "hi")]
+
+
+def test_event_without_handler_goes_to_catch_all_handler(server):
+    received = []
+
+    def catch_all(event_name, sid, *args):
+        received.append((event_name, sid, args))
+        return "ok"
+
+    server.engine.receive_event("*", catch_all, "/")
+    websocket, sid = server.connect()
+
+    websocket.send_text(json.dumps([EVENT, "/", "orders.created", {"id": 1}, 1]))
+    assert websocket.receive_json() == [ACK, "/", 1, "ok"]
+    assert received == [("orders.created", sid, ({"id": 1},))]
+
+
+def test_request_to_response_waits_for_ack_of_client(server):
+    websocket, sid = server.connect()
+
+    response = server.client.portal.start_task_soon(server.engine.send_r2r, "question", {"q": 1}, sid)
+    kind, namespace, event_name, data, ack_id = websocket.receive_json()
+    assert (kind, namespace, event_name, data) == (EVENT, "/", "question", {"q": 1})
+
+    websocket.send_text(json.dumps([ACK, "/", ack_id, "answer"]))
+    assert response.result(2) == "answer"
+
+
+def test_server_disconnect_notifies_client_and_handler(server):
+    reasons = []
+    server.engine.receive_event("disconnect", lambda sid, reason: reasons.append((sid, reason)), "/")
+    websocket, sid = server.connect()
+
+    server.call(server.engine.disconnect, sid)
+
+    assert websocket.receive_json() == [DISCONNECT, "/"]
+    assert reasons == [(sid, "server disconnect")]
+    assert not server.engine.is_connected(sid)
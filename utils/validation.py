@@ -1,18 +1,64 @@
-from typing import Any, TypeVar
+from functools import lru_cache
+from typing import Any, TypeVar, get_origin
 
 from pydantic import PydanticUserError, TypeAdapter
 
 T = TypeVar("T")
 
-def isvalid(type_to_check: type, value: T) -> bool:
+# NOTE: Maximal amount of type adapters kept in cache, least recently used adapters are dropped when it's exceeded
+ADAPTER_CACHE_SIZE = 1024
+
+DEFAULT_ADAPTER_CONFIG = (("arbitrary_types_allowed", True),)
+
+# Annotations which don't need pydantic when value already has exactly the same type
+PRIMITIVE_TYPES = (str, int, float, bool, bytes, dict, list)
+
+
+def _build_type_adapter(type_to_check: type, config: tuple[tuple[str, Any], ...]) -> TypeAdapter:
     try:
-        type_adapter = TypeAdapter(type_to_check,
-                                config={"arbitrary_types_allowed": True})
+        return TypeAdapter(type_to_check, config=dict(config))
     except PydanticUserError:
-        type_adapter = TypeAdapter(type_to_check)
-    
+        return TypeAdapter(type_to_check)
+
+
+_cached_type_adapter = lru_cache(maxsize=ADAPTER_CACHE_SIZE)(_build_type_adapter)
+
+
+def get_type_adapter(type_to_check: type,
+                     config: tuple[tuple[str, Any], ...] = DEFAULT_ADAPTER_CONFIG) -> TypeAdapter:
+    """
+    Returns shared type adapter for the annotation, building pydantic-core schema only once per annotation and config.
+
+    Args:
+        type_to_check (type): Annotation of the value
+        config (tuple[tuple[str, Any], ...], optional): Config of type adapter as hashable pairs. Defaults to `arbitrary_types_allowed`.
+    """
     try:
-        type_adapter.validate_python(value)
+        return _cached_type_adapter(type_to_check, config)
+    except TypeError:
+        # NOTE: Unhashable annotations (e.g. with unhashable metadata) can't be cached
+        return _build_type_adapter(type_to_check, config)
+
+
+def isinstance_of(type_to_check: type, value: Any) -> bool:
+    """
+    Plain `isinstance` check for annotations which are classes, returns `False` for annotations which can't be checked this way.
+    """
+    if not isinstance(type_to_check, type) or get_origin(type_to_check) is not None:
+        return False
+    try:
+        return isinstance(value, type_to_check)
+    except TypeError:
+        return False
+
+
+def isvalid(type_to_check: type, value: T) -> bool:
+    # NOTE: Fast paths, instance of the class is always valid for pydantic so schema isn't needed
+    if type_to_check is Any or isinstance_of(type_to_check, value):
+        return True
+
+    try:
+        get_type_adapter(type_to_check).validate_python(value)
         return True
     
     except Exception as e:
@@ -20,13 +66,7 @@ def isvalid(type_to_check: type, value: T) -> bool:
 
 def isvalid_json(type_to_check: type, value: T) -> bool:
     try:
-        type_adapter = TypeAdapter(type_to_check,
-                                config={"arbitrary_types_allowed": True})
-    except PydanticUserError:
-        type_adapter = TypeAdapter(type_to_check)
-    
-    try:
-        type_adapter.validate_json(value)
+        get_type_adapter(type_to_check).validate_json(value)
         return True
     
     except Exception as e:
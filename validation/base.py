@@ -3,5 +3,11 @@ from typing import Any
 
 
 class ValidationStrategy:
+    def prepare(self, param: Parameter) -> None:
+        """
+        Called once when listener is registered, allows strategy to warm up everything it needs for the parameter.
+        """
+        ...
+
     def validate(self, param: Parameter, data: Any) -> Any:
-        raise NotImplementedError("Subclasses should implement this method.")
\ No newline at end of file
+        raise NotImplementedError("Subclasses should implement this method.")
@@ -1,14 +1,27 @@
-from inspect import Parameter
 from typing import Any, Callable
 from fastapi.params import Depends
 
 
-class ValidationDepends(Depends):
-    def __init__(
-            self, 
-            param: Parameter, 
-            dependency: Callable[..., Any] | None = None, 
-            *, use_cache: bool = True
-        ):
-        super().__init__(dependency, use_cache=use_cache)
-        self.param = param
\ No newline at end of file
+class ConnectionDepends(Depends):
+    """
+    ## Connection Depends
+
+    Dependency which is resolved once per connection instead of once per event.
+
+    It's resolved during `connect` event (or on first event of the connection), stored in socket.io session of the client
+    and injected into subsequent events without re-execution. Result is dropped when client disconnects or when `SIOContext.refresh_dependencies` is called.
+    """
+    session_prefix: str = "liveapi:dependency:"
+
+    @classmethod
+    def session_key(cls, dependency: Callable[..., Any]) -> str:
+        return f"{cls.session_prefix}{getattr(dependency, '__module__', '')}.{getattr(dependency, '__qualname__', repr(dependency))}"
+
+
+def dependency_scope(depends: Depends) -> str:
+    """
+    Scope of dependency, `connection` for `ConnectionDepends` and `event` for every other one.
+
+    NOTE: `Depends` of FastAPI (>= 0.121) has `scope` field of it's own, so scope is determined by type of dependency
+    """
+    return "connection" if isinstance(depends, ConnectionDepends) else "event"
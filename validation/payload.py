@@ -0,0 +1,69 @@
+import json
+from typing import Any, Callable
+
+
+class EventPayload:
+    """
+    ## Event Payload
+
+    Payload of a single inbound event, shared by every validation strategy, parameter dependency and listener-level dependency.
+
+    Encoded payloads (`str`, `bytes`, `bytearray`) are decoded lazily and at most once,
+    already decoded payloads (socket.io delivers JSON objects as Python objects) are used as is.
+    """
+    __slots__ = ("raw", "_loads", "_decoded", "_is_json")
+
+    def __init__(self, raw: Any, loads: Callable[[str | bytes | bytearray], Any] = json.loads) -> None:
+        self.raw = raw
+        self._loads = loads
+        self._decoded = None
+        self._is_json: bool | None = None
+
+    @classmethod
+    def of(cls, data: Any) -> "EventPayload":
+        """
+        Wraps data into payload, if it's already a payload then returns it as is
+        """
+        if isinstance(data, EventPayload):
+            return data
+        return cls(data)
+
+    @property
+    def is_encoded(self) -> bool:
+        return isinstance(self.raw, (str, bytes, bytearray))
+
+    @property
+    def is_json(self) -> bool:
+        """
+        Whether payload is encoded JSON document which was successfully decoded
+        """
+        if self._is_json is None:
+            self._decode()
+        return self._is_json
+
+    @property
+    def decoded(self) -> Any:
+        """
+        Decoded Python object of payload, if payload isn't a valid JSON document then raw payload is returned
+        """
+        if self._is_json is None:
+            self._decode()
+        return self._decoded if self._is_json else self.raw
+
+    def get(self, key: str, default: Any = None) -> Any:
+        decoded = self.decoded
+        if isinstance(decoded, dict):
+            return decoded.get(key, default)
+        return default
+
+    def _decode(self):
+        if not self.is_encoded:
+            self._is_json = False
+            return
+
+        try:
+            self._decoded = self._loads(self.raw)
+            self._is_json = True
+        except (ValueError, TypeError):
+            # NOTE: `json.JSONDecodeError` is subclass of `ValueError`
+            self._is_json = False
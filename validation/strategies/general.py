@@ -1,34 +1,29 @@
 from inspect import Parameter
-import json
 from typing import Any
 
-from pydantic import PydanticUserError, RootModel, TypeAdapter, ValidationError
-from plugins.liveapi.utils.validation import isvalid, isvalid_json
+from pydantic import ValidationError
+from plugins.liveapi.utils.validation import PRIMITIVE_TYPES, get_type_adapter
 from plugins.liveapi.validation.base import ValidationStrategy
+from plugins.liveapi.validation.payload import EventPayload
 
 
 class GeneralValidationStrategy(ValidationStrategy):
     recursion: int = 0
 
-    def is_json(self, data: str | bytes | bytearray):
-        try:
-            json.loads(data)
-            return True
-        except:
-            return False
+    def prepare(self, param: Parameter) -> None:
+        if param.annotation is not Any and param.annotation not in PRIMITIVE_TYPES:
+            get_type_adapter(param.annotation)
+
+    def validate(self, param: Parameter, data: EventPayload) -> Any:
+        # NOTE: JSON documents are validated straight from the already decoded Python object
+        value = data.decoded
+
+        # NOTE: Fast path, values of primitive types are returned as is
+        if param.annotation is Any or (param.annotation in PRIMITIVE_TYPES and type(value) is param.annotation):
+            return value
 
-    def validate(self, param: Parameter, data: Any) -> Any:
         try:
-            try:
-                type_adapter = TypeAdapter(param.annotation,
-                            config={"arbitrary_types_allowed": True})
-            except PydanticUserError:
-                type_adapter = TypeAdapter(param.annotation)
-            
-            if self.is_json(data):
-                return type_adapter.validate_json(data)
-            else:
-                return type_adapter.validate_python(data)
+            return get_type_adapter(param.annotation).validate_python(value)
 
         except ValidationError as e:
             raise e
@@ -2,14 +2,16 @@ from inspect import Parameter
 from typing import Any
 
 from fastapi import HTTPException
+from plugins.liveapi.validation.payload import EventPayload
 from ..base import ValidationStrategy
 
 
 class HeaderValidationStrategy(ValidationStrategy):
-    def validate(self, param: Parameter, data: dict[str, str]) -> Any:
-        if not (data := data.get(param.default.alias.lower())):
+    def validate(self, param: Parameter, data: EventPayload) -> Any:
+        alias = param.default.alias or param.name.replace("_", "-")
+        if not (value := data.get(alias.lower())):
             if param.default.is_required():
                 raise HTTPException(422, "Header is not present")
             else:
-                data = param.default.default
-        return data
+                value = param.default.default
+        return value
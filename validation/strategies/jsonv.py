@@ -1,29 +1,36 @@
 from inspect import Parameter
-import json
 from typing import Any
 
 from pydantic import ValidationError
+from plugins.liveapi.validation.payload import EventPayload
 from ..base import ValidationStrategy
 
 
 class JSONValidationStrategy(ValidationStrategy):
     recursion_limit: int
-    recursion: int
 
     def __init__(self, recursion_limit: int = 1) -> None:
         super().__init__()
         self.recursion_limit = recursion_limit
-        self.recursion = 0
 
-    def validate(self, param: Parameter, data: Any) -> Any:
+    def validate(self, param: Parameter, data: EventPayload) -> Any:
+        # NOTE: Encoded payload which isn't valid JSON is passed to pydantic to raise it's own validation error
+        if data.is_encoded and not data.is_json:
+            return param.annotation.model_validate_json(data.raw)
+
+        value = data.decoded
         try:
-            return param.annotation.model_validate_json(data)
+            return param.annotation.model_validate(value)
         except ValidationError as e:
-            if self.recursion >= self.recursion_limit:
-                raise e
-            
-            self.recursion += 1
-            try:
-                return self.validate(param, json.loads(data)[param.name])
-            except (json.JSONDecodeError, KeyError):
-                raise e
\ No newline at end of file
+            # NOTE: Model may be wrapped into the object under the name of parameter, e.g. `{"message": {...}}`
+            for _ in range(self.recursion_limit):
+                if not isinstance(value, dict) or param.name not in value:
+                    raise e
+
+                value = value[param.name]
+                try:
+                    return param.annotation.model_validate(value)
+                except ValidationError:
+                    continue
+
+            raise e
@@ -1,11 +1,15 @@
 from inspect import Parameter
 from typing import Any
 from .base import ValidationStrategy
+from .payload import EventPayload
 
 
 class Validator:
     def __init__(self, validation_strategy: ValidationStrategy) -> None:
         self.validation_strategy = validation_strategy
 
+    def prepare(self, param: Parameter) -> None:
+        return self.validation_strategy.prepare(param)
+
     def validate(self, param: Parameter, data: Any) -> Any:
-        return self.validation_strategy.validate(param, data)
\ No newline at end of file
+        return self.validation_strategy.validate(param, EventPayload.of(data))